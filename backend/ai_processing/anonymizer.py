@@ -1,28 +1,86 @@
 import re
 import hashlib
-from typing import Dict, Any, Union
+from bisect import bisect_left
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple, Union
+
+# A detector returns (start, end) spans of PII in the text
+Detector = Callable[[str], Iterable[Tuple[int, int]]]
+Span = Tuple[int, int, str]
 
 class Anonymizer:
+    """
+    Single-pass PII redaction.
+
+    The regex patterns are compiled into one alternation with a named group per
+    label, so one scan finds every email, id, phone and name. Pluggable detectors
+    (callables returning spans, e.g. an NER model) add their own spans; overlaps
+    are resolved by priority, then length, and the text is rewritten once.
+    """
+
     def __init__(self):
+        # Earlier labels win where two patterns could match at the same position. Each
+        # pattern leads with a cheap lookahead so the combined scan rejects most positions
+        # on their first character
         self.patterns = {
-            'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            'phone': r'\b(?:\+?(\d{1,3}))?[-. (]*(\d{3})[-. )]*(\d{3})[-. ]*(\d{4})\b',
-            'id': r'\b(?:[A-Z]{2}\d{4,}[A-Z]{2}|\d{4}-\d{4}-\d{4}-\d{4})\b',
-            'name': r'\b(Mr\.|Mrs\.|Ms\.|Dr\.)?\s*([A-Z][a-z]+)\s+([A-Z][a-z]+)\b'
+            'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b',
+            'id': r'(?=[A-Za-z\d])\b(?:[A-Za-z]{2}\d{4,}[A-Za-z]{2}|\d{4}-\d{4}-\d{4}-\d{4})\b',
+            'phone': r'(?=[+(\d])(?:(?<![\w+])\+?\d{1,3}[-. ]*)?(?:\(\d{3}\)|\b\d{3})[-. ]*\d{3}[-. ]*\d{4}\b',
+            # Case-sensitive: capitalized word pairs, optionally after a title
+            'name': r'(?=[A-Z])\b(?:(?:Mr|Mrs|Ms|Dr)\.[ \t]*)?[A-Z][a-z]+[ \t]+[A-Z][a-z]+\b'
         }
+        # These all start at a word boundary or at "+"/"(", so the scan only tries them there
+        self._boundary_labels = set(self.patterns)
+        self.detectors: List[Tuple[str, Detector, int]] = []
+        self._compile()
+
+    def _compile(self):
+        groups = {label: f"(?P<{label}>{pattern})" for label, pattern in self.patterns.items()}
+        boundary = "|".join(group for label, group in groups.items() if label in self._boundary_labels)
+        others = [group for label, group in groups.items() if label not in self._boundary_labels]
+        self._pattern = re.compile("|".join([rf"(?:\b|(?=[+(]))(?:{boundary})"] * bool(boundary) + others))
+        # Regex labels rank by their order; detectors carry their own priority
+        self._priority = {label: len(self.patterns) - index for index, label in enumerate(self.patterns)}
+
+    def add_pattern(self, label: str, pattern: str):
+        """Add (or replace) a regex label; it becomes part of the single combined scan"""
+        self.patterns[label] = pattern
+        self._boundary_labels.discard(label)
+        self._compile()
+
+    def add_detector(self, label: str, detector: Detector, priority: int = 0):
+        """
+        Add a callable detector. Regex labels rank from len(patterns) (first) down to 1
+        (last), so priority decides which regex spans an overlapping detector span beats.
+        """
+        self.detectors.append((label, detector, priority))
 
     def process(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Main anonymization entry point. It hashes top-level string fields 
+        Main anonymization entry point. It hashes top-level string fields
         and redacts sensitive information from the raw resume text.
         """
         anonymized_data = self._anonymize_top_level(data)
         anonymized_data["resume_text"] = self._anonymize_text(data.get("raw_text", ""))
         return anonymized_data
 
+    def process_batch(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """process() for many parsed resumes"""
+        return [self.process(record) for record in records]
+
+    def anonymize_texts(self, texts: List[Optional[str]]) -> List[str]:
+        """Redact many texts; repeated texts are redacted once"""
+        redacted: Dict[str, str] = {}
+        results = []
+        for text in texts:
+            text = text or ""
+            if text not in redacted:
+                redacted[text] = self._anonymize_text(text)
+            results.append(redacted[text])
+        return results
+
     def _anonymize_top_level(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Anonymizes top-level fields, correctly skipping non-string values 
+        Anonymizes top-level fields, correctly skipping non-string values
         like the 'entities' dictionary.
         """
         result = {}
@@ -30,7 +88,7 @@ class Anonymizer:
             # Skip keys that contain non-PII complex objects or are handled separately
             if key in ["raw_text", "entities"]:
                 continue
-            
+
             # Only attempt to hash string values
             if isinstance(value, str):
                 result[key] = self._hash_value(value)
@@ -47,12 +105,61 @@ class Anonymizer:
             return None
         return f"ANON_{hashlib.sha256(value.encode('utf-8')).hexdigest()[:8]}"
 
-    def _anonymize_text(self, text: str) -> str:
-        """Redacts sensitive patterns from a block of text using regex."""
-        for label, pattern in self.patterns.items():
-            text = re.sub(pattern, f"[{label.upper()}_REDACTED]", text, flags=re.IGNORECASE)
-        return text
+    def find_spans(self, text: str, known: Optional[Dict[str, Optional[str]]] = None) -> List[Span]:
+        """
+        Non-overlapping (start, end, label) PII spans in text order. known maps labels
+        to values already extracted for this text (the parsed name, email, ...); every
+        case-insensitive, whole-word occurrence is redacted, ahead of any other span. A
+        known name is also matched word by word ("MARIA" in a header, a lone surname).
+        """
+        spans = [(match.start(), match.end(), match.lastgroup) for match in self._pattern.finditer(text)]
+        if not self.detectors and not any(known.values() if known else ()):
+            return spans  # One finditer never overlaps itself
+
+        # (start, end, label, priority)
+        candidates = [(start, end, label, self._priority[label]) for start, end, label in spans]
+        for label, detector, priority in self.detectors:
+            candidates.extend((start, end, label, priority) for start, end in detector(text) if start < end)
+        top = max([priority for *_, priority in candidates] + [len(self.patterns)]) + 1
+        for label, value in (known or {}).items():
+            if not value or not value.strip():
+                continue
+            values = [value.strip()]
+            if label == "name":
+                values += [word for word in re.findall(r"[^\W\d_][\w'-]*", value) if len(word) > 1]
+            pattern = r"(?<!\w)(?:" + "|".join(map(re.escape, values)) + r")(?!\w)"
+            candidates.extend(
+                (match.start(), match.end(), label, top) for match in re.finditer(pattern, text, re.IGNORECASE)
+            )
+
+        # Highest priority first, then longest; keep spans that do not touch a kept one
+        candidates.sort(key=lambda span: (-span[3], span[0] - span[1], span[0]))
+        starts: List[int] = []
+        kept: List[Span] = []
+        for start, end, label, _ in candidates:
+            position = bisect_left(starts, start)
+            if position > 0 and kept[position - 1][1] > start:
+                continue
+            if position < len(kept) and kept[position][0] < end:
+                continue
+            starts.insert(position, start)
+            kept.insert(position, (start, end, label))
+        return kept
+
+    def redact(self, text: str, known: Optional[Dict[str, Optional[str]]] = None) -> str:
+        """Redact text, including every occurrence of the known values (see find_spans)"""
+        return self._anonymize_text(text or "", known)
+
+    def _anonymize_text(self, text: str, known: Optional[Dict[str, Optional[str]]] = None) -> str:
+        """Redacts sensitive patterns from a block of text in a single rewrite."""
+        parts = []
+        position = 0
+        for start, end, label in self.find_spans(text, known):
+            parts.append(text[position:start])
+            parts.append(f"[{label.upper()}_REDACTED]")
+            position = end
+        parts.append(text[position:])
+        return "".join(parts)
 
 # Create a singleton instance for easy, consistent importing
 anonymizer = Anonymizer()
-
@@ -0,0 +1,166 @@
+import json
+import os
+import zlib
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# Deterministic stand-in for the old random.uniform(-0.05, 0.05) match score jitter:
+# the same candidate always gets the same offset, and changing the seed reshuffles it.
+# SCORE_JITTER=0 turns the jitter off.
+JITTER_AMPLITUDE = float(os.getenv("SCORE_JITTER", "0.05"))
+JITTER_SEED = int(os.getenv("SCORE_JITTER_SEED", "0"))
+
+UNKNOWN_NAME = "Unknown Candidate"
+
+EDUCATION_NONE, EDUCATION_OTHER, EDUCATION_BACHELOR, EDUCATION_ADVANCED = 0, 1, 2, 3
+EDUCATION_BONUS = {EDUCATION_OTHER: 0.03, EDUCATION_BACHELOR: 0.07, EDUCATION_ADVANCED: 0.10}
+
+# (minimum, score) steps of the profile-quality match score, highest first
+SKILL_STEPS = ((20, 0.50), (15, 0.42), (10, 0.35), (7, 0.28), (5, 0.22), (3, 0.15))
+SKILL_FLOOR = 0.05
+EXPERIENCE_STEPS = ((15, 0.30), (10, 0.26), (7, 0.22), (5, 0.18), (3, 0.14), (1, 0.10))
+EXPERIENCE_FLOOR = 0.02
+
+ADVANCED_DEGREES = ('master', 'phd', 'doctorate', 'mba')
+BACHELOR_DEGREES = ('bachelor', 'bs', 'ba', 'university')
+
+def education_level(education: Optional[str]) -> int:
+    """Education bucket used by the match score (substring checks, as the parser always did)"""
+    if not education or len(education) <= 10:
+        return EDUCATION_NONE
+    lowered = education.lower()
+    if any(degree in lowered for degree in ADVANCED_DEGREES):
+        return EDUCATION_ADVANCED
+    if any(degree in lowered for degree in BACHELOR_DEGREES):
+        return EDUCATION_BACHELOR
+    return EDUCATION_OTHER
+
+def _jitter_key(name: Optional[str], email: Optional[str]) -> str:
+    """Name and email without whitespace, case-folded; the "Unknown Candidate" placeholder counts as no name"""
+    name = "" if name == UNKNOWN_NAME else name or ""
+    return "".join(f"{name}|{email or ''}".split()).casefold()
+
+def score_jitter(candidate_data: Dict, seed: Optional[int] = None, amplitude: Optional[float] = None) -> float:
+    """
+    Offset in [-amplitude, amplitude) from a CRC-32 of the seed and the candidate's
+    name and email, ignoring case and whitespace. A stored candidate gets the same
+    offset as its raw parse only if validation kept the name and email (it can drop
+    or reformat an invalid email).
+    """
+    amplitude = JITTER_AMPLITUDE if amplitude is None else amplitude
+    if amplitude <= 0:
+        return 0.0
+    seed = JITTER_SEED if seed is None else seed
+    digest = zlib.crc32(f"{seed}:{_jitter_key(candidate_data.get('name'), candidate_data.get('email'))}".encode())
+    return (digest / 2 ** 32 * 2 - 1) * amplitude
+
+class ScoringColumns(NamedTuple):
+    """Columnar scoring inputs, one entry per candidate"""
+    name_words: np.ndarray  # 0 for a missing or "Unknown Candidate" name
+    has_email: np.ndarray
+    has_phone: np.ndarray
+    skills_count: np.ndarray
+    experience_years: np.ndarray
+    education_level: np.ndarray
+    has_education: np.ndarray  # Truthy education (contact bonus)
+    education_text: np.ndarray  # Non-blank education (education score)
+    match_score: np.ndarray  # Existing match scores, used by overall scores
+    jitter: np.ndarray
+
+def _skills(candidate_data: Dict) -> list:
+    skills = candidate_data.get('skills') or []
+    return json.loads(skills) if isinstance(skills, str) else skills
+
+def columns_from_candidates(
+    candidates: Sequence[Dict],
+    seed: Optional[int] = None,
+    amplitude: Optional[float] = None
+) -> ScoringColumns:
+    """Build ScoringColumns from parsed-candidate dicts (skills as a list or its JSON string)"""
+    names = [candidate.get('name') for candidate in candidates]
+    emails = [candidate.get('email') for candidate in candidates]
+    phones = [candidate.get('phone') for candidate in candidates]
+    educations = [candidate.get('education') for candidate in candidates]
+    return ScoringColumns(
+        name_words=np.array(
+            [len(name.split()) if name and name != UNKNOWN_NAME else 0 for name in names], dtype=np.int64
+        ),
+        has_email=np.array([bool(email) for email in emails], dtype=bool),
+        has_phone=np.array([bool(phone) for phone in phones], dtype=bool),
+        skills_count=np.array([len(_skills(candidate)) for candidate in candidates], dtype=np.int64),
+        experience_years=np.array([candidate.get('experience_years') or 0 for candidate in candidates], dtype=np.float64),
+        education_level=np.array([education_level(education) for education in educations], dtype=np.int8),
+        has_education=np.array([bool(education) for education in educations], dtype=bool),
+        education_text=np.array([bool(education and education.strip()) for education in educations], dtype=bool),
+        match_score=np.array([candidate.get('match_score') or 0.0 for candidate in candidates], dtype=np.float64),
+        jitter=np.array([score_jitter(candidate, seed, amplitude) for candidate in candidates], dtype=np.float64)
+    )
+
+def _steps(values: np.ndarray, steps: Tuple[Tuple[int, float], ...], floor: float) -> np.ndarray:
+    return np.select([values >= minimum for minimum, _ in steps], [score for _, score in steps], default=floor)
+
+def batch_match_scores(columns: ScoringColumns, job_description: Union[str, Sequence[str]] = "") -> np.ndarray:
+    """
+    EnhancedResumeParser.calculate_enhanced_match_score for every candidate at once,
+    against one job description or one per candidate. Terms are added in the scalar
+    order so the float results are bit-identical.
+    """
+    count = len(columns.jitter)
+    if isinstance(job_description, str):
+        if job_description:
+            return np.full(count, 0.75)
+        described = np.zeros(count, dtype=bool)
+    else:
+        described = np.array([bool(description) for description in job_description], dtype=bool)
+
+    score = np.zeros(count)
+    score = score + np.where(columns.name_words >= 2, 0.10 + np.minimum(columns.name_words, 4) * 0.025, 0.0)
+    score = score + (np.where(columns.has_email, 0.15, 0.05) + np.where(columns.has_phone, 0.10, 0.02))
+    score = score + _steps(columns.skills_count, SKILL_STEPS, SKILL_FLOOR)
+    score = score + _steps(columns.experience_years, EXPERIENCE_STEPS, EXPERIENCE_FLOOR)
+    bonus = np.zeros(count)
+    for level, value in EDUCATION_BONUS.items():
+        bonus[columns.education_level == level] = value
+    score = score + bonus
+    score = score + columns.jitter
+    return np.where(described, 0.75, np.minimum(np.maximum(score, 0.1), 0.95))
+
+def batch_overall_scores(columns: ScoringColumns, match_scores: Optional[np.ndarray] = None) -> np.ndarray:
+    """candidate_router.calculate_overall_score for every candidate at once (ints in 20-95)"""
+    match_score = columns.match_score if match_scores is None else match_scores
+    experience_score = np.minimum(columns.experience_years / 15, 1)
+    skills_score = np.minimum(columns.skills_count / 12, 1)
+    contact_score = columns.has_email.astype(np.int64) + columns.has_phone.astype(np.int64)
+    education_score = columns.education_text.astype(np.int64)
+
+    raw_score = (
+        match_score * 0.35 +
+        experience_score * 0.25 +
+        skills_score * 0.20 +
+        (contact_score / 2) * 0.10 +
+        education_score * 0.10
+    )
+    final_score = 20 + (raw_score * 75)
+    final_score = final_score + np.where((columns.experience_years >= 8) & (columns.skills_count >= 15), 5, 0)
+    final_score = final_score + np.where(columns.has_email & columns.has_phone & columns.has_education, 3, 0)
+    final_score = final_score - np.where(~columns.has_email & ~columns.has_phone, 8, 0)
+    # np.rint rounds half to even, like round()
+    return np.clip(np.rint(final_score), 20, 95).astype(np.int64)
+
+def score_candidates(
+    parsed: Sequence[Dict],
+    validated: Sequence[Dict],
+    job_description: Union[str, Sequence[str]] = ""
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (match scores, overall scores) for a batch, as the one-at-a-time path computes them:
+    match scores from the parser's fields (parse_text(score=False) output), overall
+    scores from the validated ones. A match score the parser already set (its fallback
+    after an extraction error) is kept.
+    """
+    match_scores = batch_match_scores(columns_from_candidates(parsed), job_description)
+    preset = np.array([candidate.get('match_score') is not None for candidate in parsed], dtype=bool)
+    if preset.any():
+        match_scores = np.where(preset, [candidate.get('match_score') or 0.0 for candidate in parsed], match_scores)
+    return match_scores, batch_overall_scores(columns_from_candidates(validated), match_scores)
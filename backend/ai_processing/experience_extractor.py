@@ -0,0 +1,110 @@
+# ai_processing/experience_extractor.py - COMPILED SINGLE-PASS EXPERIENCE EXTRACTOR
+import re
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+MONTHS = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3, "apr": 4, "april": 4,
+    "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7, "aug": 8, "august": 8,
+    "sep": 9, "sept": 9, "september": 9, "oct": 10, "october": 10, "nov": 11, "november": 11,
+    "dec": 12, "december": 12,
+}
+
+MIN_YEAR = 1970
+MAX_YEARS = 50
+
+# "5 years of experience", "5+ yrs exp", "experience: 5 years"
+MENTION_PATTERN = re.compile(
+    r"(\d{1,2})\+?\s*(?:years?|yrs?)\s*(?:of\s*)?(?:experience|exp)\b"
+    r"|experience\s*[:\-]?\s*(\d{1,2})\+?\s*years?",
+    re.IGNORECASE
+)
+
+# One date: optional month name ("Jan", "January", "Sept.") or number ("03/"), then a year
+_DATE = r"(?:(?P<{0}_name>[a-z]{{3,9}})\.?\s+|(?P<{0}_num>\d{{1,2}})\s*/\s*)?(?P<{0}_year>(?:19|20)\d{{2}})\b"
+
+# "2019 - 2023", "Jan 2019 – Present", "03/2019 to 05/2021", "from 2018 to current"
+# (not inside longer digit runs such as phone numbers: "555-1990-2020-11")
+RANGE_PATTERN = re.compile(
+    r"(?<![\w/.-])" + _DATE.format("start") +
+    r"\s*(?:[-–—]+|\bto\b|\buntil\b|\btill\b)\s*"
+    r"(?:" + _DATE.format("end") + r"(?![-/]?\d)|(?P<ongoing>present|current|now|today)\b)",
+    re.IGNORECASE
+)
+
+# Ranges after these words on the same line are study periods, not employment
+EDUCATION_CONTEXT = re.compile(
+    r"\b(?:university|college|school|academy|bachelor'?s?|master'?s?|b\.?sc|m\.?sc|ph\.?d|mba|degree|"
+    r"diploma|graduat\w*|gpa|education)\b",
+    re.IGNORECASE
+)
+EDUCATION_WINDOW = 60
+
+def _month(name: Optional[str], number: Optional[str], default: int) -> int:
+    if name:
+        return MONTHS.get(name.lower(), default)
+    if number and 1 <= int(number) <= 12:
+        return int(number)
+    return default
+
+def merge_intervals(intervals: List[Tuple[int, int]]) -> int:
+    """Total length of the union of [start, end) month intervals"""
+    total = 0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+class ExperienceExtractor:
+    """
+    Years of experience from resume text.
+
+    Patterns are compiled once at import. A single scan finds every date range
+    (years, month names, MM/YYYY, "present"); months come from a lookup table
+    rather than a generic date parser. Ranges become month intervals which are
+    merged, so overlapping jobs count once and separate jobs add up. The result
+    is the larger of that total tenure and any explicit "N years of experience".
+    """
+
+    def employment_intervals(self, text: str, now: Optional[datetime] = None) -> List[Tuple[int, int]]:
+        """[start, end) intervals in months since year 0, education ranges excluded"""
+        now = now or datetime.now()
+        current = now.year * 12 + now.month - 1
+        intervals = []
+        for match in RANGE_PATTERN.finditer(text):
+            start_year = int(match.group("start_year"))
+            if not MIN_YEAR <= start_year <= now.year:
+                continue
+            # Look back on the range's own line only: a degree line above must not hide the next job
+            line_start = text.rfind("\n", 0, match.start()) + 1
+            if EDUCATION_CONTEXT.search(text, max(line_start, match.start() - EDUCATION_WINDOW), match.start()):
+                continue
+            # A year on its own counts from January: "2019 - 2023" is 4 years
+            start = start_year * 12 + _month(match.group("start_name"), match.group("start_num"), 1) - 1
+            if match.group("ongoing"):
+                end = current
+            else:
+                # "Jan 2019 - Dec 2019" includes December; a bare end year stops at its January
+                end_month = _month(match.group("end_name"), match.group("end_num"), 0)
+                end = min(int(match.group("end_year")) * 12 + end_month, current)
+            if start < end:
+                intervals.append((start, end))
+        return intervals
+
+    def mentioned_years(self, text: str) -> int:
+        """Largest explicit "N years of experience" in the text"""
+        years = [int(first or second) for first, second in MENTION_PATTERN.findall(text)]
+        return max(years, default=0)
+
+    def years(self, text: str, now: Optional[datetime] = None) -> int:
+        tenure = merge_intervals(self.employment_intervals(text, now)) // 12
+        return min(max(self.mentioned_years(text), tenure), MAX_YEARS)
+
+experience_extractor = ExperienceExtractor()
@@ -1,34 +1,71 @@
-from sentence_transformers import SentenceTransformer
-from sentence_transformers.util import cos_sim
+from functools import lru_cache
+from typing import List
+
+import numpy as np
+
+from ai_processing.model_registry import model_registry
 
 # --- THE NEW, STABLE MATCHING ENGINE ---
-# Load a top-tier, powerful model directly through the stable sentence-transformers library.
-# This model is excellent for semantic matching tasks.
-print("Loading sentence-transformer model: BAAI/bge-large-en-v1.5...")
-model = SentenceTransformer("BAAI/bge-large-en-v1.5")
-print("Matching service model loaded successfully.")
+# A top-tier, powerful model loaded directly through the stable sentence-transformers library.
+# This model is excellent for semantic matching tasks. It is loaded on first use so that
+# importing this module (e.g. in parser worker processes) stays cheap.
+MODEL_NAME = "BAAI/bge-large-en-v1.5"
+
+# For this model, it's recommended to add a prefix to differentiate
+# the query (job description) from the passage (resume).
+JOB_DESCRIPTION_PREFIX = "Represent this job description for retrieving relevant resumes: "
+
+def _load_model():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(MODEL_NAME)
+
+model_registry.register("sentence_encoder", _load_model)
+
+def get_model():
+    """The shared sentence-transformer, loaded once per process by the model registry"""
+    return model_registry.get("sentence_encoder")
 # --- END OF NEW ENGINE ---
 
+def encode_resumes(resume_texts: List[str], batch_size: int = 16) -> np.ndarray:
+    """Encode resumes into L2-normalized float32 vectors, one row per resume"""
+    embeddings = get_model().encode(
+        resume_texts, batch_size=batch_size, normalize_embeddings=True, convert_to_numpy=True
+    )
+    return np.asarray(embeddings, dtype=np.float32)
+
+@lru_cache(maxsize=128)
+def encode_job_description(job_desc: str) -> np.ndarray:
+    """Encode a job description once; repeated rankings for the same job reuse the vector"""
+    embedding = get_model().encode(
+        JOB_DESCRIPTION_PREFIX + job_desc, normalize_embeddings=True, convert_to_numpy=True
+    )
+    embedding = np.asarray(embedding, dtype=np.float32)
+    embedding.setflags(write=False)
+    return embedding
+
+def embedding_to_blob(embedding: np.ndarray) -> bytes:
+    """Store vectors as compact float16 blobs (2 bytes per dimension)"""
+    return np.asarray(embedding, dtype=np.float16).tobytes()
+
+def blob_to_embedding(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+
+def similarity_to_score(similarity):
+    """(score + 1) / 2 maps the cosine [-1, 1] range to [0, 1]; works on scalars and arrays"""
+    return (similarity + 1) / 2
+
 def calculate_similarity(job_desc: str, resume_text: str) -> float:
     """
     Calculates a fine-tuned match score between a job description and a resume
     using a powerful and stable sentence-transformer model.
     """
-    # For this model, it's recommended to add a prefix to differentiate
-    # the query (job description) from the passage (resume).
-    job_desc_with_prefix = "Represent this job description for retrieving relevant resumes: " + job_desc
-    
     # Encode both texts into vector embeddings.
-    job_emb = model.encode(job_desc_with_prefix, normalize_embeddings=True)
-    resume_emb = model.encode(resume_text, normalize_embeddings=True)
-    
-    # Calculate the cosine similarity between the two embeddings.
+    job_emb = encode_job_description(job_desc)
+    resume_emb = encode_resumes([resume_text])[0]
+
+    # Both vectors are normalized, so the dot product is the cosine similarity.
     # The result is a score between -1 and 1 (typically 0 to 1 for this task).
-    similarity_score = cos_sim(job_emb, resume_emb).item()
-    
-    # We can scale it to be strictly between 0 and 1 for consistency.
-    # (score + 1) / 2 maps the [-1, 1] range to [0, 1].
-    final_score = (similarity_score + 1) / 2
-    
-    return float(final_score)
+    similarity_score = float(np.dot(job_emb, resume_emb))
 
+    # We can scale it to be strictly between 0 and 1 for consistency.
+    return float(similarity_to_score(similarity_score))
@@ -0,0 +1,134 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+SKILL_NER_MODEL = os.getenv("SKILL_NER_MODEL", "Nucha/Nucha_ITSkillNER_BERT")
+
+def _current_rss_bytes() -> int:
+    """Resident set size of this process (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        try:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except ImportError:
+            return 0
+
+class ModelRegistry:
+    """
+    Loads each heavy model lazily, at most once per process.
+
+    Modules register a loader under a name and call get(name) wherever they
+    need the model, instead of loading at import time. Load time and the RSS
+    growth seen during the load are recorded per model. A failed load is
+    remembered and re-raised rather than retried on every call.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._models: Dict[str, Any] = {}
+        self._errors: Dict[str, Exception] = {}
+        self._stats: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        with self._lock:
+            self._loaders[name] = loader
+            self._load_locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str) -> Any:
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        if name not in self._loaders:
+            raise KeyError(f"No model registered under '{name}'")
+
+        # One lock per model, so loading spaCy does not block a request that needs the encoder
+        with self._load_locks[name]:
+            if name in self._models:
+                return self._models[name]
+            if name in self._errors:
+                raise self._errors[name]
+
+            rss_before = _current_rss_bytes()
+            started = time.perf_counter()
+            try:
+                model = self._loaders[name]()
+            except Exception as e:
+                self._errors[name] = e
+                self._stats[name] = {"status": "failed", "error": str(e)}
+                logger.warning(f"Loading model '{name}' failed: {str(e)}")
+                raise
+            load_seconds = time.perf_counter() - started
+            self._models[name] = model
+            self._stats[name] = {
+                "status": "loaded",
+                "load_seconds": round(load_seconds, 3),
+                "rss_delta_mb": round((_current_rss_bytes() - rss_before) / (1024 * 1024), 1),
+                "loaded_at": time.time()
+            }
+            logger.info(f"Loaded model '{name}' in {load_seconds:.2f}s")
+            return model
+
+    def get_optional(self, name: str) -> Optional[Any]:
+        """Like get, but returns None when the model cannot be loaded"""
+        try:
+            return self.get(name)
+        except Exception:
+            return None
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def warm_up(self, names: Optional[Iterable[str]] = None) -> List[str]:
+        """Load the given models (all registered ones by default); returns those that loaded"""
+        loaded = []
+        for name in (names if names is not None else list(self._loaders)):
+            if self.get_optional(name) is not None:
+                loaded.append(name)
+        return loaded
+
+    def stats(self) -> dict:
+        return {
+            "process_rss_mb": round(_current_rss_bytes() / (1024 * 1024), 1),
+            "models": {
+                name: self._stats.get(name, {"status": "not_loaded"})
+                for name in self._loaders
+            }
+        }
+
+def _load_spacy():
+    import spacy
+    return spacy.load(SPACY_MODEL)
+
+def _load_skill_ner():
+    from transformers import pipeline
+    return pipeline("ner", model=SKILL_NER_MODEL, aggregation_strategy="simple")
+
+# Shared per-process registry; the sentence encoder registers itself in matching_service
+model_registry = ModelRegistry()
+model_registry.register("spacy", _load_spacy)
+model_registry.register("skill_ner", _load_skill_ner)
+
+def parse_warmup_list(value: Optional[str]) -> Optional[List[str]]:
+    """'all' -> every registered model, 'a,b' -> those names, empty -> nothing"""
+    value = (value or "").strip()
+    if not value:
+        return []
+    if value.lower() == "all":
+        return None
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+def warm_up_parser_worker():
+    """Process-pool initializer: preload the models named in PARSER_MODEL_WARMUP"""
+    names = parse_warmup_list(os.getenv("PARSER_MODEL_WARMUP"))
+    if names != []:
+        model_registry.warm_up(names)
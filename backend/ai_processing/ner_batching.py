@@ -0,0 +1,155 @@
+import os
+import re
+from typing import Any, Dict, List, Sequence, Tuple
+
+from ai_processing.model_registry import model_registry
+
+# BERT-style NER models see at most 512 tokens including special tokens
+NER_MAX_TOKENS = int(os.getenv("NER_MAX_TOKENS", "448"))
+NER_CHUNK_OVERLAP = int(os.getenv("NER_CHUNK_OVERLAP", "64"))
+NER_BATCH_SIZE = int(os.getenv("NER_BATCH_SIZE", "16"))
+SPACY_CHUNK_CHARS = int(os.getenv("SPACY_CHUNK_CHARS", "100000"))
+
+SKILL_ENTITY_GROUPS = {"HSKILL", "SSKILL"}
+
+_WORD = re.compile(r"\S+")
+
+def _token_offsets(text: str, tokenizer: Any) -> List[Tuple[int, int]]:
+    """Character span of every model token; falls back to whitespace words without a fast tokenizer"""
+    if tokenizer is not None and getattr(tokenizer, "is_fast", False):
+        encoding = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+        return [tuple(span) for span in encoding["offset_mapping"]]
+    return [match.span() for match in _WORD.finditer(text)]
+
+def chunk_text(
+    text: str,
+    tokenizer: Any = None,
+    max_tokens: int = NER_MAX_TOKENS,
+    overlap: int = NER_CHUNK_OVERLAP
+) -> List[Tuple[int, str]]:
+    """
+    Split text into windows of at most max_tokens tokens, consecutive windows
+    sharing `overlap` tokens. Returns (character offset, chunk text) pairs.
+    Without a tokenizer words are counted instead, at half the budget since a
+    word is often several word pieces.
+    """
+    offsets = _token_offsets(text, tokenizer)
+    if tokenizer is None or not getattr(tokenizer, "is_fast", False):
+        max_tokens = max(1, max_tokens // 2)
+        overlap = overlap // 2
+    if len(offsets) <= max_tokens:
+        return [(0, text)] if text.strip() else []
+
+    step = max(1, max_tokens - overlap)
+    chunks = []
+    for first in range(0, len(offsets), step):
+        last = min(first + max_tokens, len(offsets)) - 1
+        start, end = offsets[first][0], offsets[last][1]
+        chunks.append((start, text[start:end]))
+        if last == len(offsets) - 1:
+            break
+    return chunks
+
+def merge_spans(text: str, entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Merge entities found in overlapping chunks: duplicates collapse, and spans of
+    the same group that overlap or touch (an entity cut at a chunk edge) are joined.
+    """
+    merged: List[Dict[str, Any]] = []
+    for entity in sorted(entities, key=lambda e: (e["start"], -e["end"])):
+        previous = merged[-1] if merged else None
+        if (
+            previous is not None
+            and previous["entity_group"] == entity["entity_group"]
+            and entity["start"] <= previous["end"]
+        ):
+            previous["end"] = max(previous["end"], entity["end"])
+            previous["score"] = max(previous["score"], entity["score"])
+            previous["word"] = text[previous["start"]:previous["end"]]
+            continue
+        merged.append(dict(entity))
+    return merged
+
+def run_ner(texts: Sequence[str], ner: Any = None, batch_size: int = NER_BATCH_SIZE) -> List[List[Dict[str, Any]]]:
+    """
+    Token-classify many documents at once. Every document is chunked, all chunks
+    go through the pipeline in batches, and spans are shifted back to document
+    offsets and merged per document.
+    """
+    ner = ner if ner is not None else model_registry.get("skill_ner")
+    tokenizer = getattr(ner, "tokenizer", None)
+
+    owners, starts, chunks = [], [], []
+    for doc_index, text in enumerate(texts):
+        for start, chunk in chunk_text(text or "", tokenizer):
+            owners.append(doc_index)
+            starts.append(start)
+            chunks.append(chunk)
+
+    found: List[List[Dict[str, Any]]] = [[] for _ in texts]
+    if not chunks:
+        return found
+
+    outputs = ner(chunks, batch_size=batch_size)
+    for doc_index, start, chunk_entities in zip(owners, starts, outputs):
+        for entity in chunk_entities:
+            shifted = dict(entity)
+            shifted["start"] = entity["start"] + start
+            shifted["end"] = entity["end"] + start
+            shifted["score"] = float(entity.get("score", 0.0))
+            found[doc_index].append(shifted)
+
+    return [merge_spans(text or "", entities) for text, entities in zip(texts, found)]
+
+def _spacy_chunks(text: str, limit: int) -> List[str]:
+    """Split very long text on line breaks so each piece fits spaCy's max_length"""
+    if len(text) <= limit:
+        return [text]
+    pieces, start = [], 0
+    while start < len(text):
+        end = min(start + limit, len(text))
+        if end < len(text):
+            newline = text.rfind("\n", start, end)
+            if newline > start:
+                end = newline + 1
+        pieces.append(text[start:end])
+        start = end
+    return pieces
+
+def run_spacy(texts: Sequence[str], nlp: Any = None, batch_size: int = NER_BATCH_SIZE) -> List[List[Tuple[str, str]]]:
+    """(entity text, label) pairs per document, with every chunk streamed through nlp.pipe"""
+    nlp = nlp if nlp is not None else model_registry.get("spacy")
+    limit = min(SPACY_CHUNK_CHARS, getattr(nlp, "max_length", SPACY_CHUNK_CHARS))
+
+    owners, pieces = [], []
+    for doc_index, text in enumerate(texts):
+        for piece in _spacy_chunks(text or "", limit):
+            owners.append(doc_index)
+            pieces.append(piece)
+
+    found: List[List[Tuple[str, str]]] = [[] for _ in texts]
+    for doc_index, doc in zip(owners, nlp.pipe(pieces, batch_size=batch_size)):
+        found[doc_index].extend((ent.text, ent.label_) for ent in doc.ents)
+    return found
+
+def extract_resume_entities(texts: Sequence[str], batch_size: int = NER_BATCH_SIZE) -> List[Dict[str, List[str]]]:
+    """Skills (skill NER), experience dates and education organisations (spaCy) for each resume"""
+    nlp = model_registry.get("spacy")
+    stop_words = nlp.Defaults.stop_words
+    skill_entities = run_ner(texts, batch_size=batch_size)
+    spacy_entities = run_spacy(texts, nlp, batch_size=batch_size)
+
+    results = []
+    for entities, doc_ents in zip(skill_entities, spacy_entities):
+        cleaned_skills = [
+            entity["word"].strip(" ·,")
+            for entity in entities
+            if entity["entity_group"].upper() in SKILL_ENTITY_GROUPS
+            and len(entity["word"]) > 2 and entity["word"].lower() not in stop_words
+        ]
+        results.append({
+            "skills": list(dict.fromkeys(cleaned_skills)),
+            "experience": [text for text, label in doc_ents if label == "DATE"],
+            "education": [text for text, label in doc_ents if label == "ORG"]
+        })
+    return results
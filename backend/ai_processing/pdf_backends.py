@@ -0,0 +1,192 @@
+# ai_processing/pdf_backends.py - PLUGGABLE PDF TEXT EXTRACTION ENGINES
+import io
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+import pdfplumber
+from pdfminer.converter import TextConverter
+from pdfminer.layout import LAParams
+from pdfminer.pdfdocument import PDFDocument as MinerDocument
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdftypes import resolve1
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # Optional: without it the fast path is pdfminer
+    pdfium = None
+
+# PDFium is not thread-safe, even across documents; thread-pool parsers take turns
+_PDFIUM_LOCK = threading.Lock()
+
+# Fast-path output below this many characters per page (scans, text drawn as
+# curves) or with more than this share of unmapped glyphs is redone with pdfplumber
+MIN_CHARS_PER_PAGE = int(os.getenv("PDF_MIN_CHARS_PER_PAGE", "200"))
+MAX_GARBLED_RATIO = float(os.getenv("PDF_MAX_GARBLED_RATIO", "0.05"))
+
+# U+FFFD, C0 controls other than whitespace, private-use code points and pdfminer's "(cid:123)"
+_GARBLED = re.compile(r"\(cid:\d+\)|[\ufffd\x00-\x08\x0b\x0e-\x1f\ue000-\uf8ff]")
+
+PageText = Tuple[int, Callable[[], str]]
+
+class PDFDocument(ABC):
+    """
+    One open PDF. iter_pages() yields (page_number, extract) lazily, where extract()
+    returns that page's text: callers can stop before paying for a page, and a page
+    that fails to extract only raises for itself.
+    """
+    page_count: Optional[int] = None
+
+    @abstractmethod
+    def iter_pages(self) -> Iterator[PageText]:
+        ...
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> "PDFDocument":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class PDFBackend(ABC):
+    """Text extraction engine; subclasses register themselves in PDF_BACKENDS by name"""
+    name = ""
+
+    @abstractmethod
+    def open(self, file_bytes: bytes) -> PDFDocument:
+        ...
+
+def _page_tree_count(doc) -> Optional[int]:
+    try:
+        return int(resolve1(resolve1(doc.catalog["Pages"])["Count"]))
+    except Exception:
+        return None
+
+def iter_pdf_pages(pdf) -> Iterator[Tuple[int, pdfplumber.page.Page]]:
+    """
+    Yield (page_number, page) one page at a time. pdf.pages would build every Page
+    up front; here each one is created on demand and its caches flushed once the
+    caller moves on, so memory stays flat however long the document is.
+    """
+    doctop = 0
+    for index, page_obj in enumerate(PDFPage.create_pages(pdf.doc)):
+        page = pdfplumber.page.Page(pdf, page_obj, page_number=index + 1, initial_doctop=doctop)
+        try:
+            yield index + 1, page
+        finally:
+            doctop += page.height
+            page.flush_cache()
+
+class _PdfplumberDocument(PDFDocument):
+    def __init__(self, file_bytes: bytes):
+        self.pdf = pdfplumber.open(io.BytesIO(file_bytes))
+        self.page_count = _page_tree_count(self.pdf.doc)
+
+    def iter_pages(self) -> Iterator[PageText]:
+        for page_number, page in iter_pdf_pages(self.pdf):
+            yield page_number, lambda page=page: page.extract_text() or ""
+
+    def close(self):
+        self.pdf.close()
+
+class PdfplumberBackend(PDFBackend):
+    """Per-character layout analysis: slowest, but the most robust on unusual layouts"""
+    name = "pdfplumber"
+
+    def open(self, file_bytes: bytes) -> PDFDocument:
+        return _PdfplumberDocument(file_bytes)
+
+class _PdfminerDocument(PDFDocument):
+    def __init__(self, file_bytes: bytes):
+        self.stream = io.BytesIO(file_bytes)
+        self.doc = MinerDocument(PDFParser(self.stream))
+        self.resources = PDFResourceManager(caching=True)
+        self.page_count = _page_tree_count(self.doc)
+
+    def iter_pages(self) -> Iterator[PageText]:
+        for index, page in enumerate(PDFPage.create_pages(self.doc)):
+            def extract(page=page) -> str:
+                output = io.StringIO()
+                device = TextConverter(self.resources, output, laparams=LAParams())
+                try:
+                    PDFPageInterpreter(self.resources, device).process_page(page)
+                finally:
+                    device.close()
+                return output.getvalue().replace("\x0c", "")
+            yield index + 1, extract
+
+    def close(self):
+        self.stream.close()
+
+class PdfminerBackend(PDFBackend):
+    """pdfminer's plain text converter, without pdfplumber's per-character objects"""
+    name = "pdfminer"
+
+    def open(self, file_bytes: bytes) -> PDFDocument:
+        return _PdfminerDocument(file_bytes)
+
+class _PdfiumDocument(PDFDocument):
+    def __init__(self, file_bytes: bytes):
+        with _PDFIUM_LOCK:
+            self.pdf = pdfium.PdfDocument(file_bytes)
+            self.page_count = len(self.pdf)
+
+    def iter_pages(self) -> Iterator[PageText]:
+        for index in range(self.page_count):
+            def extract(index=index) -> str:
+                with _PDFIUM_LOCK:
+                    page = self.pdf[index]
+                    textpage = page.get_textpage()
+                    try:
+                        text = textpage.get_text_bounded()
+                    finally:
+                        textpage.close()
+                        page.close()
+                # PDFium marks soft hyphens at line ends with \x02 and uses CRLF line breaks
+                return text.replace("\x02\r\n", "").replace("\x02", "").replace("\r\n", "\n")
+            yield index + 1, extract
+
+    def close(self):
+        with _PDFIUM_LOCK:
+            self.pdf.close()
+
+class PdfiumBackend(PDFBackend):
+    """PDFium's native text layer: an order of magnitude faster than pdfplumber"""
+    name = "pdfium"
+
+    def open(self, file_bytes: bytes) -> PDFDocument:
+        return _PdfiumDocument(file_bytes)
+
+PDF_BACKENDS: Dict[str, PDFBackend] = {
+    backend.name: backend for backend in (PdfplumberBackend(), PdfminerBackend(), PdfiumBackend())
+    if backend.name != "pdfium" or pdfium is not None
+}
+
+# "auto" tries FAST_BACKEND first and falls back to pdfplumber on degraded output
+FAST_BACKEND = "pdfium" if pdfium is not None else "pdfminer"
+FALLBACK_BACKEND = "pdfplumber"
+
+def get_backend(name: str) -> PDFBackend:
+    if name not in PDF_BACKENDS:
+        raise ValueError(f"Unknown PDF backend {name!r}; available: auto, {', '.join(PDF_BACKENDS)}")
+    return PDF_BACKENDS[name]
+
+def garbled_ratio(text: str) -> float:
+    """Share of characters that are unmapped glyphs or control characters"""
+    if not text:
+        return 0.0
+    return sum(len(match) for match in _GARBLED.findall(text)) / len(text)
+
+def degradation(text: str, pages_read: int) -> Optional[str]:
+    """Why fast-path output should be redone with pdfplumber, or None if it looks fine"""
+    if pages_read and len(text.strip()) / pages_read < MIN_CHARS_PER_PAGE:
+        return "too little text"
+    if garbled_ratio(text) > MAX_GARBLED_RATIO:
+        return "garbled text"
+    return None
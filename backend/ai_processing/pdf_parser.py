@@ -1,23 +1,131 @@
-import io
-import pdfplumber
-import spacy
+import logging
+import os
 import re
-from transformers import pipeline
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, NamedTuple, Optional
 
-nlp = spacy.load("en_core_web_sm")
-hf_ner = pipeline("ner", model="Nucha/Nucha_ITSkillNER_BERT", aggregation_strategy="simple")
+from ai_processing.ner_batching import extract_resume_entities
+from ai_processing.pdf_backends import FALLBACK_BACKEND, FAST_BACKEND, degradation, get_backend
+
+logger = logging.getLogger(__name__)
 
 # Improved regex patterns for PII extraction
 EMAIL_REGEX = r"[\w\.-]+@[\w\.-]+\.\w+"
 PHONE_REGEX = r"\+?\d{1,3}?[-.\s]?\(?\d{1,4}?\)?[-.\s]?\d{1,4}[-.\s]?\d{1,4}[-.\s]?\d{1,9}(?: x\d+)?"
 NAME_REGEX = r"\b([A-Z][a-z]+(?:\s[A-Z][a-z]+)+)\b"
 
+class PageBudget:
+    """
+    Limits for one PDF: pages read, characters kept and seconds spent (0 = no limit).
+    The defaults only stop runaway files; real resumes are read in full. The time
+    budget is checked between pages, so one slow page can still overrun it.
+    """
+
+    def __init__(self, max_pages: int = 1000, max_chars: int = 5_000_000, max_seconds: float = 60.0):
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.max_seconds = max_seconds
+
+    @classmethod
+    def from_env(cls) -> "PageBudget":
+        return cls(
+            max_pages=int(os.getenv("PDF_MAX_PAGES", "1000")),
+            max_chars=int(os.getenv("PDF_MAX_CHARS", "5000000")),
+            max_seconds=float(os.getenv("PDF_MAX_SECONDS", "60"))
+        )
+
+class PDFText(NamedTuple):
+    text: str
+    page_count: Optional[int]  # None when the page tree does not say
+    pages_read: int
+    skipped_pages: List[int]  # 1-based: pages past the budget and pages that failed to extract
+    stopped_by: Optional[str]  # "pages", "chars" or "time" when a budget ended extraction early
+    backend: str = ""
+    fallback_reason: Optional[str] = None  # Why the fast backend's output was replaced
+
+    def report(self) -> Optional[Dict[str, Any]]:
+        """Summary for ai_metadata, or None when every page was read"""
+        if not self.skipped_pages and self.stopped_by is None:
+            return None
+        return {
+            "page_count": self.page_count,
+            "pages_read": self.pages_read,
+            "skipped_pages": self.skipped_pages,
+            "stopped_by": self.stopped_by,
+            "backend": self.backend
+        }
+
+def read_pdf_pages(file_bytes: bytes, backend_name: str, budget: PageBudget, started: float) -> PDFText:
+    """Stream page text from one backend into one string until a budget runs out"""
+    parts: List[str] = []
+    chars = 0
+    pages_read = 0
+    skipped: List[int] = []
+    stopped_by = None
+    last_page = 0
+
+    with get_backend(backend_name).open(file_bytes) as document:
+        page_count = document.page_count
+        for page_number, extract in document.iter_pages():
+            last_page = page_number
+            if budget.max_pages and pages_read >= budget.max_pages:
+                stopped_by = "pages"
+            elif budget.max_seconds and time.perf_counter() - started >= budget.max_seconds:
+                stopped_by = "time"
+            if stopped_by:
+                skipped.append(page_number)
+                break
+            try:
+                page_text = extract()
+            except Exception as e:
+                logger.warning(f"Skipping PDF page {page_number}: {str(e)}")
+                skipped.append(page_number)
+                continue
+            pages_read += 1
+            if budget.max_chars and chars + len(page_text) > budget.max_chars:
+                parts.append(page_text[:budget.max_chars - chars])
+                stopped_by = "chars"
+                break
+            parts.append(page_text)
+            chars += len(page_text)
+
+    if stopped_by and page_count:
+        skipped.extend(range(last_page + 1, page_count + 1))
+    return PDFText("\n".join(parts), page_count, pages_read, skipped, stopped_by, backend_name)
+
+def extract_pdf_text(file_bytes: bytes, budget: Optional[PageBudget] = None, backend: Optional[str] = None) -> PDFText:
+    """
+    PDF text within the page budget. backend "auto" (PDF_BACKEND, the default) reads
+    with the fast backend and redoes the file with pdfplumber, in whatever time is
+    left, when the fast output has too little text per page or looks garbled.
+    """
+    budget = budget or pdf_budget
+    backend = backend or PDF_BACKEND
+    started = time.perf_counter()
+    if backend != "auto":
+        return read_pdf_pages(file_bytes, backend, budget, started)
+
+    try:
+        result = read_pdf_pages(file_bytes, FAST_BACKEND, budget, started)
+        reason = degradation(result.text, result.pages_read)
+    except Exception as e:
+        result, reason = None, f"{FAST_BACKEND} failed: {str(e)}"
+    if reason is None:
+        return result
+    if result is not None and budget.max_seconds and time.perf_counter() - started >= budget.max_seconds:
+        return result
+
+    logger.info(f"Falling back to {FALLBACK_BACKEND} for PDF text ({reason})")
+    fallback = read_pdf_pages(file_bytes, FALLBACK_BACKEND, budget, started)
+    if result is not None and degradation(fallback.text, fallback.pages_read):
+        if len(fallback.text.strip()) <= len(result.text.strip()):
+            return result  # pdfplumber did no better (e.g. a scan with no text layer)
+    return fallback._replace(fallback_reason=reason)
+
 def extract_text_from_pdf(file_bytes: bytes) -> str:
     """Robust PDF text extraction with error handling"""
     try:
-        with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-            return "\n".join(page.extract_text() or "" for page in pdf.pages)
+        return extract_pdf_text(file_bytes).text
     except Exception as e:
         raise ValueError(f"PDF processing failed: {str(e)}")
 
@@ -39,26 +147,25 @@ def extract_pii(text: str):
     }
 
 def parse_pdf_resume(text: str) -> Dict[str, Any]:
-    pii = extract_pii(text)
-    doc = nlp(text)
-    hf_results = hf_ner(text)
-    raw_skills = [
-        ent["word"] for ent in hf_results 
-        if ent["entity_group"].upper() in ["HSKILL", "SSKILL"]
-    ]
-    cleaned_skills = [
-        skill.strip(" ·,")
-        for skill in raw_skills
-        if len(skill) > 2 and skill.lower() not in nlp.Defaults.stop_words
-    ]
-    return {
-        "name": pii["name"],
-        "email": pii["email"],
-        "phone": pii["phone"],
-        "raw_text": text,
-        "entities": {
-            "skills": list(set(cleaned_skills)),
-            "experience": [ent.text for ent in doc.ents if ent.label_ == "DATE"],
-            "education": [ent.text for ent in doc.ents if ent.label_ == "ORG"]
-        }
-    }
+    return parse_pdf_resumes([text])[0]
+
+def parse_pdf_resumes(texts: List[str]) -> List[Dict[str, Any]]:
+    """Parse many resumes at once; NER runs over token-bounded chunks of all of them in batches"""
+    entities = extract_resume_entities(texts)
+    results = []
+    for text, doc_entities in zip(texts, entities):
+        pii = extract_pii(text)
+        results.append({
+            "name": pii["name"],
+            "email": pii["email"],
+            "phone": pii["phone"],
+            "raw_text": text,
+            "entities": doc_entities
+        })
+    return results
+
+# Budget from PDF_MAX_PAGES, PDF_MAX_CHARS and PDF_MAX_SECONDS
+pdf_budget = PageBudget.from_env()
+
+# "auto", or a name from pdf_backends.PDF_BACKENDS to always use one engine
+PDF_BACKEND = os.getenv("PDF_BACKEND", "auto")
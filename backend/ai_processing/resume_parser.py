@@ -1,98 +1,51 @@
 # ai_processing/resume_parser.py - ENHANCED VERSION WITH VARIABLE MATCH SCORES
 import re
 import json
-import spacy
 from typing import Dict, List, Any, Optional
-import pdfplumber
 from docx import Document
 from io import BytesIO
 import logging
-from datetime import datetime
 import phonenumbers
 from phonenumbers import geocoder, carrier
-import dateutil.parser as date_parser
-import random
+
+from ai_processing.skill_matcher import SkillMatcher
+from ai_processing.experience_extractor import experience_extractor
+from ai_processing.pdf_parser import extract_pdf_text
+from ai_processing.skills_taxonomy import load_skill_index
+from ai_processing.model_registry import model_registry
+from ai_processing.batch_scoring import EDUCATION_BONUS, education_level, score_jitter
 
 logger = logging.getLogger(__name__)
 
 class EnhancedResumeParser:
-    def __init__(self):
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            logger.warning("spaCy model not found. Install with: python -m spacy download en_core_web_sm")
-            self.nlp = None
+    def __init__(self, taxonomy_path: Optional[str] = None, index_path: Optional[str] = None):
+        self._warned_missing_spacy = False
         
-        # ENHANCED: Comprehensive skills database (100+ skills)
-        self.skills_database = {
-            'programming_languages': [
-                'Python', 'JavaScript', 'Java', 'C++', 'C#', 'PHP', 'Ruby', 'Go', 'Rust', 'Swift',
-                'Kotlin', 'TypeScript', 'Scala', 'R', 'MATLAB', 'Perl', 'Shell', 'Bash', 'PowerShell'
-            ],
-            'web_technologies': [
-                'HTML', 'CSS', 'React', 'Angular', 'Vue.js', 'Node.js', 'Express', 'Django', 'Flask',
-                'Spring Boot', 'Laravel', 'ASP.NET', 'jQuery', 'Bootstrap', 'Sass', 'Less', 'Webpack',
-                'Next.js', 'Nuxt.js', 'Svelte', 'FastAPI'
-            ],
-            'databases': [
-                'MySQL', 'PostgreSQL', 'MongoDB', 'Redis', 'Oracle', 'SQL Server', 'SQLite', 'Cassandra',
-                'DynamoDB', 'Firebase', 'Elasticsearch', 'Neo4j', 'CouchDB', 'InfluxDB'
-            ],
-            'cloud_devops': [
-                'AWS', 'Azure', 'Google Cloud', 'Docker', 'Kubernetes', 'Jenkins', 'GitLab CI', 'CircleCI',
-                'Terraform', 'Ansible', 'Chef', 'Puppet', 'Nagios', 'Prometheus', 'Grafana', 'Helm'
-            ],
-            'data_analytics': [
-                'SQL', 'Excel', 'Tableau', 'Power BI', 'Pandas', 'NumPy', 'Matplotlib', 'Seaborn',
-                'Apache Spark', 'Hadoop', 'Kafka', 'Airflow', 'Jupyter', 'TensorFlow', 'PyTorch'
-            ],
-            'design_tools': [
-                'Figma', 'Adobe XD', 'Photoshop', 'Illustrator', 'Sketch', 'InVision', 'Canva',
-                'After Effects', 'Premiere Pro', 'Blender', 'Maya', 'AutoCAD'
-            ],
-            'project_management': [
-                'Agile', 'Scrum', 'Kanban', 'JIRA', 'Trello', 'Asana', 'Monday.com', 'Slack', 'Teams',
-                'Confluence', 'Notion', 'Linear', 'ClickUp', 'Basecamp'
-            ],
-            'soft_skills': [
-                'Leadership', 'Communication', 'Problem Solving', 'Team Management', 'Critical Thinking',
-                'Project Management', 'Time Management', 'Analytical Skills', 'Creative Thinking',
-                'Adaptability', 'Collaboration', 'Negotiation', 'Public Speaking', 'Mentoring',
-                'Strategic Planning', 'Decision Making', 'Conflict Resolution', 'Customer Service'
-            ],
-            'operating_systems': [
-                'Linux', 'Windows', 'macOS', 'Ubuntu', 'CentOS', 'Unix', 'Debian', 'Red Hat'
-            ],
-            'mobile_development': [
-                'iOS', 'Android', 'React Native', 'Flutter', 'Xamarin', 'Ionic', 'Cordova'
-            ]
-        }
+        # ENHANCED: Skills taxonomy loaded from SKILLS_TAXONOMY_PATH (JSON/YAML/CSV) and
+        # memory-mapped from its prebuilt index, so workers share one copy
+        self.skill_index = load_skill_index(taxonomy_path, index_path)
+        self.skills_database = self.skill_index.skills_by_category()
+        self.all_skills = list(self.skill_index.skills)
         
-        # Flatten all skills for easy searching
-        self.all_skills = []
-        for category in self.skills_database.values():
-            self.all_skills.extend(category)
+        # Finds every skill and synonym in a single pass per resume
+        self.skill_matcher = SkillMatcher(self.skill_index)
         
-        # ENHANCED: Experience calculation patterns
-        self.experience_patterns = [
-            r'(\d{1,2})\+?\s*years?\s*(?:of\s*)?(?:experience|exp)',
-            r'(\d{1,2})\+?\s*yrs?\s*(?:of\s*)?(?:experience|exp)',
-            r'experience\s*[:\-]?\s*(\d{1,2})\+?\s*years?',
-            r'(\d{4})\s*[-–]\s*(\d{4}|present|current)',  # Date ranges like 2020-2024
-            r'(\w+\s+\d{4})\s*[-–]\s*(\w+\s+\d{4}|present|current)',  # Jan 2020 - Dec 2024
-            r'from\s+(\d{4})\s+to\s+(\d{4}|present|current)',
-            r'worked\s+(?:at|in|for)\s+.+?(?:from\s+)?(\d{4})\s*[-–]\s*(\d{4}|present|current)',
-        ]
+        # ENHANCED: Experience from merged employment date ranges, patterns compiled once
+        self.experience_extractor = experience_extractor
+
+    @property
+    def nlp(self):
+        """spaCy pipeline from the shared model registry (None when the model is not installed)"""
+        nlp = model_registry.get_optional("spacy")
+        if nlp is None and not self._warned_missing_spacy:
+            logger.warning("spaCy model not found. Install with: python -m spacy download en_core_web_sm")
+            self._warned_missing_spacy = True
+        return nlp
 
     def parse_pdf(self, pdf_content: bytes) -> Dict[str, Any]:
         """Parse PDF resume content"""
         try:
-            with pdfplumber.open(BytesIO(pdf_content)) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    text += page.extract_text() or ""
-            
-            return self.parse_text(text)
+            return self.parse_text(extract_pdf_text(pdf_content).text)
         except Exception as e:
             logger.error(f"PDF parsing error: {str(e)}")
             raise Exception(f"Failed to parse PDF: {str(e)}")
@@ -188,102 +141,12 @@ class EnhancedResumeParser:
         return matches[0] if matches else None
 
     def calculate_experience_years(self, text: str) -> int:
-        """ENHANCED: Calculate experience from multiple sources"""
-        max_experience = 0
-        current_year = datetime.now().year
-        
-        # Strategy 1: Direct experience mentions
-        for pattern in self.experience_patterns[:3]:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                try:
-                    years = int(match)
-                    max_experience = max(max_experience, years)
-                except:
-                    continue
-        
-        # Strategy 2: Date range calculations
-        date_ranges = []
-        
-        # Pattern: 2020-2024, 2020-Present, etc.
-        year_ranges = re.findall(r'(\d{4})\s*[-–]\s*(\d{4}|present|current)', text, re.IGNORECASE)
-        for start_year, end_year in year_ranges:
-            try:
-                start = int(start_year)
-                end = current_year if end_year.lower() in ['present', 'current'] else int(end_year)
-                if 1990 <= start <= current_year and start <= end:
-                    date_ranges.append(end - start)
-            except:
-                continue
-        
-        # Pattern: Jan 2020 - Dec 2024
-        month_ranges = re.findall(r'(\w+\s+\d{4})\s*[-–]\s*(\w+\s+\d{4}|present|current)', text, re.IGNORECASE)
-        for start_date, end_date in month_ranges:
-            try:
-                start = date_parser.parse(start_date)
-                if end_date.lower() in ['present', 'current']:
-                    end = datetime.now()
-                else:
-                    end = date_parser.parse(end_date)
-                
-                years_diff = (end - start).days / 365.25
-                if 0 <= years_diff <= 50:
-                    date_ranges.append(int(years_diff))
-            except:
-                continue
-        
-        # Take the maximum experience found
-        if date_ranges:
-            max_experience = max(max_experience, max(date_ranges))
-        
-        # Strategy 3: Company tenure analysis
-        company_patterns = [
-            r'(?:worked|employed|served)\s+(?:at|in|for|with)\s+([^,\n]+?)(?:from\s+)?(\d{4})\s*[-–]\s*(\d{4}|present)',
-            r'([A-Z][a-z\s&]+(?:Inc|LLC|Corp|Ltd|Company))\s*[,\-]\s*(\d{4})\s*[-–]\s*(\d{4}|present)',
-        ]
-        
-        for pattern in company_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                try:
-                    if len(match) == 3:
-                        start_year = int(match[1])
-                        end_year = current_year if match[2].lower() in ['present', 'current'] else int(match[2])
-                        if 1990 <= start_year <= current_year and start_year <= end_year:
-                            years_exp = end_year - start_year
-                            max_experience = max(max_experience, years_exp)
-                except:
-                    continue
-        
-        return min(max_experience, 50)  # Cap at 50 years
+        """ENHANCED: Total tenure from merged date ranges, or an explicit "N years of experience" if larger"""
+        return self.experience_extractor.years(text)
 
     def extract_skills(self, text: str) -> List[str]:
-        """ENHANCED: Extract skills with better matching"""
-        found_skills = set()
-        text_lower = text.lower()
-        
-        # Direct skill matching with word boundaries
-        for skill in self.all_skills:
-            skill_lower = skill.lower()
-            # Use word boundaries for exact matches
-            pattern = r'\b' + re.escape(skill_lower) + r'\b'
-            if re.search(pattern, text_lower):
-                found_skills.add(skill)
-        
-        # Additional patterns for common skill formats
-        skill_sections = re.findall(r'(?:skills?|technologies?|tools?|expertise)[:\-\s]*([^\n]+)', text, re.IGNORECASE)
-        for section in skill_sections:
-            # Split by common delimiters
-            items = re.split(r'[,;|•\-\n]', section)
-            for item in items:
-                item = item.strip()
-                if 2 <= len(item) <= 30:
-                    # Check if it matches any skill (fuzzy matching)
-                    for skill in self.all_skills:
-                        if skill.lower() in item.lower() or item.lower() in skill.lower():
-                            found_skills.add(skill)
-        
-        return list(found_skills)
+        """ENHANCED: Extract skills and aliases in one pass with the precompiled matcher"""
+        return self.skill_matcher.find(text)
 
     def extract_education(self, text: str) -> str:
         """ENHANCED: Extract education information"""
@@ -370,26 +233,23 @@ class EnhancedResumeParser:
                 score += 0.02
             
             # Education bonus (0-10%)
-            education = candidate_data.get('education', '')
-            if education and len(education) > 10:
-                if any(degree in education.lower() for degree in ['master', 'phd', 'doctorate', 'mba']):
-                    score += 0.10
-                elif any(degree in education.lower() for degree in ['bachelor', 'bs', 'ba', 'university']):
-                    score += 0.07
-                else:
-                    score += 0.03
+            level = education_level(candidate_data.get('education', ''))
+            if level in EDUCATION_BONUS:
+                score += EDUCATION_BONUS[level]
             
-            # Add randomness for natural variation (±5%)
-            variation = random.uniform(-0.05, 0.05)
-            score += variation
+            # Deterministic variation (±5%, SCORE_JITTER / SCORE_JITTER_SEED), stable across reparses
+            score += score_jitter(candidate_data)
             
             return min(max(score, 0.1), 0.95)  # Clamp between 10% and 95%
         
         # Job description matching logic here...
         return 0.75
 
-    def parse_text(self, text: str, job_description: str = "") -> Dict[str, Any]:
-        """Main parsing function with enhanced extraction"""
+    def parse_text(self, text: str, job_description: str = "", score: bool = True) -> Dict[str, Any]:
+        """
+        Main parsing function with enhanced extraction. With score=False the match score
+        is left as None for the caller to compute in bulk (batch_scoring.score_candidates).
+        """
         try:
             # Clean text
             cleaned_text = self._clean_text(text)
@@ -399,7 +259,7 @@ class EnhancedResumeParser:
             email = self.extract_email(cleaned_text)
             phone = self.extract_phone(cleaned_text)
             skills = self.extract_skills(cleaned_text)
-            experience_years = self.calculate_experience_years(cleaned_text)
+            experience_years = self.calculate_experience_years(text)  # Raw text keeps "–" and "/" in date ranges
             education = self.extract_education(cleaned_text)
             
             # Calculate match score
@@ -412,7 +272,7 @@ class EnhancedResumeParser:
                 'education': education
             }
             
-            match_score = self.calculate_enhanced_match_score(candidate_data, job_description)
+            match_score = self.calculate_enhanced_match_score(candidate_data, job_description) if score else None
             
             return {
                 'raw_text': text,
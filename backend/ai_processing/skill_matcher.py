@@ -0,0 +1,240 @@
+# ai_processing/skill_matcher.py - COMPILED SINGLE-PASS SKILL MATCHER
+import mmap
+import os
+import re
+import struct
+import tempfile
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Tokens keep the characters that are part of skill names ("c++", "c#", "node.js",
+# "asp.net") while trailing punctuation like "python," or "sql." is dropped.
+TOKEN_PATTERN = re.compile(r"\w[\w+#]*(?:\.\w[\w+#]*)*")
+
+# On-disk index layout (little endian):
+#   header | category names | skill names | skill category ids | hash slots | phrase bytes
+INDEX_MAGIC = b"PIPSKIX1"
+_HEADER = struct.Struct("<8s32sIIIQQQQQ")
+_SLOT = struct.Struct("<IIIiI")  # hash, phrase offset, phrase length, skill id, extends flag
+_OFFSET = struct.Struct("<I")
+_CATEGORY_ID = struct.Struct("<H")
+
+def tokenize(text: str) -> List[str]:
+    """Split text into case-folded tokens using the same rules for skills and resumes"""
+    return TOKEN_PATTERN.findall(text.casefold())
+
+def _phrase_hash(phrase: bytes) -> int:
+    return zlib.crc32(phrase)
+
+class SkillIndex:
+    """
+    In-memory phrase table built from a skills taxonomy.
+
+    Each skill name and synonym is stored as a space-joined token phrase that maps
+    to (canonical skill id, has longer continuation). Every proper prefix of a
+    multi-word phrase is registered with skill id -1 so the matcher knows when
+    extending a phrase can still produce a match.
+    """
+
+    def __init__(self, categories: Dict[str, List[str]], synonyms: Optional[Dict[str, Iterable[str]]] = None):
+        self.category_names: List[str] = list(categories)
+        self.skills: List[str] = []
+        self.skill_categories: List[int] = []
+        self.table: Dict[str, Tuple[int, bool]] = {}
+
+        skill_ids: Dict[str, int] = {}
+        for category_id, category in enumerate(self.category_names):
+            for skill in categories[category]:
+                if skill in skill_ids:
+                    continue
+                skill_ids[skill] = len(self.skills)
+                self.skills.append(skill)
+                self.skill_categories.append(category_id)
+
+        for skill, skill_id in skill_ids.items():
+            self._add_phrase(skill, skill_id)
+        for canonical, names in (synonyms or {}).items():
+            if canonical not in skill_ids:
+                continue
+            for name in names:
+                self._add_phrase(name, skill_ids[canonical])
+
+    def _add_phrase(self, name: str, skill_id: int):
+        tokens = tokenize(name)
+        if not tokens:
+            return
+
+        for end in range(1, len(tokens)):
+            prefix = " ".join(tokens[:end])
+            existing_id, _ = self.table.get(prefix, (-1, False))
+            self.table[prefix] = (existing_id, True)
+
+        phrase = " ".join(tokens)
+        existing_id, extends = self.table.get(phrase, (-1, False))
+        # The first registration wins so canonical names are never shadowed by synonyms
+        self.table[phrase] = (existing_id if existing_id >= 0 else skill_id, extends)
+
+    def get(self, phrase: str) -> Optional[Tuple[int, bool]]:
+        return self.table.get(phrase)
+
+    def skills_by_category(self) -> Dict[str, List[str]]:
+        result = {category: [] for category in self.category_names}
+        for skill, category_id in zip(self.skills, self.skill_categories):
+            result[self.category_names[category_id]].append(skill)
+        return result
+
+    def save(self, path: str, fingerprint: bytes = b""):
+        """Serialize the index to a file that MappedSkillIndex can memory-map"""
+        slot_count = 1
+        while slot_count < len(self.table) * 2:
+            slot_count *= 2
+        mask = slot_count - 1
+
+        phrase_blob = bytearray()
+        slots = [None] * slot_count
+        for phrase, (skill_id, extends) in self.table.items():
+            encoded = phrase.encode("utf-8")
+            phrase_hash = _phrase_hash(encoded)
+            position = phrase_hash & mask
+            while slots[position] is not None:
+                position = (position + 1) & mask
+            slots[position] = (phrase_hash, len(phrase_blob), len(encoded), skill_id, int(extends))
+            phrase_blob.extend(encoded)
+
+        categories_blob = _pack_strings(self.category_names)
+        skills_blob = _pack_strings(self.skills)
+        skill_category_blob = b"".join(_CATEGORY_ID.pack(category_id) for category_id in self.skill_categories)
+        slots_blob = b"".join(_SLOT.pack(*slot) if slot else _SLOT.pack(0, 0, 0, -1, 0) for slot in slots)
+
+        categories_offset = _HEADER.size
+        skills_offset = categories_offset + len(categories_blob)
+        skill_category_offset = skills_offset + len(skills_blob)
+        slots_offset = skill_category_offset + len(skill_category_blob)
+        phrases_offset = slots_offset + len(slots_blob)
+        header = _HEADER.pack(
+            INDEX_MAGIC, fingerprint.ljust(32, b"\0")[:32],
+            len(self.category_names), len(self.skills), slot_count,
+            categories_offset, skills_offset, skill_category_offset, slots_offset, phrases_offset
+        )
+
+        # Write to a temporary file first so concurrent workers never map a partial index
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                for blob in (header, categories_blob, skills_blob, skill_category_blob, slots_blob, phrase_blob):
+                    handle.write(blob)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+class MappedSkillIndex:
+    """
+    Read-only SkillIndex backed by a memory-mapped file.
+
+    Lookups probe an open-addressing hash table directly in the mapping, so every
+    worker process shares the same pages through the OS cache instead of holding
+    its own copy of the taxonomy.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            (magic, fingerprint, category_count, skill_count, slot_count, categories_offset,
+             skills_offset, skill_category_offset, slots_offset, phrases_offset) = _HEADER.unpack_from(self._map, 0)
+            if magic != INDEX_MAGIC:
+                raise ValueError(f"{path} is not a skills index")
+        except Exception:
+            self._map.close()
+            raise
+
+        self.fingerprint = fingerprint.rstrip(b"\0")
+        self.category_names = _unpack_strings(self._map, categories_offset, category_count)
+        self.skills = _unpack_strings(self._map, skills_offset, skill_count)
+        self.skill_categories = [
+            _CATEGORY_ID.unpack_from(self._map, skill_category_offset + i * _CATEGORY_ID.size)[0]
+            for i in range(skill_count)
+        ]
+        self._slots_offset = slots_offset
+        self._phrases_offset = phrases_offset
+        self._mask = slot_count - 1
+
+    def get(self, phrase: str) -> Optional[Tuple[int, bool]]:
+        encoded = phrase.encode("utf-8")
+        phrase_hash = _phrase_hash(encoded)
+        position = phrase_hash & self._mask
+        data = self._map
+        while True:
+            slot_hash, offset, length, skill_id, extends = _SLOT.unpack_from(
+                data, self._slots_offset + position * _SLOT.size
+            )
+            if length == 0:
+                return None
+            if slot_hash == phrase_hash:
+                start = self._phrases_offset + offset
+                if data[start:start + length] == encoded:
+                    return skill_id, bool(extends)
+            position = (position + 1) & self._mask
+
+    def skills_by_category(self) -> Dict[str, List[str]]:
+        result = {category: [] for category in self.category_names}
+        for skill, category_id in zip(self.skills, self.skill_categories):
+            result[self.category_names[category_id]].append(skill)
+        return result
+
+    def close(self):
+        self._map.close()
+
+def _pack_strings(values: List[str]) -> bytes:
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = [0]
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    return b"".join(_OFFSET.pack(offset) for offset in offsets) + b"".join(encoded)
+
+def _unpack_strings(data, offset: int, count: int) -> List[str]:
+    offsets = [_OFFSET.unpack_from(data, offset + i * _OFFSET.size)[0] for i in range(count + 1)]
+    base = offset + (count + 1) * _OFFSET.size
+    return [data[base + offsets[i]:base + offsets[i + 1]].decode("utf-8") for i in range(count)]
+
+class SkillMatcher:
+    """
+    Finds every known skill (and synonym) in one left-to-right pass over the text.
+
+    Matching walks the resume tokens once and only extends a phrase while the
+    index says a longer skill could still match, so the cost grows with the
+    length of the text rather than the size of the taxonomy.
+    """
+
+    def __init__(self, index):
+        self.index = index
+
+    def find(self, text: str) -> List[str]:
+        """Return the canonical skills found in the text, in order of first appearance"""
+        tokens = tokenize(text)
+        lookup = self.index.get
+        found: Dict[int, None] = {}
+        token_count = len(tokens)
+
+        for start in range(token_count):
+            phrase = tokens[start]
+            end = start + 1
+            while True:
+                entry = lookup(phrase)
+                if entry is None:
+                    break
+                skill_id, extends = entry
+                if skill_id >= 0:
+                    found[skill_id] = None
+                if not extends or end >= token_count:
+                    break
+                phrase = f"{phrase} {tokens[end]}"
+                end += 1
+
+        skills = self.index.skills
+        return [skills[skill_id] for skill_id in found]
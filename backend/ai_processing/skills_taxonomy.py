@@ -0,0 +1,132 @@
+# ai_processing/skills_taxonomy.py - EXTERNALLY LOADED SKILLS TAXONOMY
+import csv
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, List, Optional
+
+from ai_processing.skill_matcher import SkillIndex, MappedSkillIndex
+
+logger = logging.getLogger(__name__)
+
+AI_PROCESSING_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_TAXONOMY_PATH = os.path.join(AI_PROCESSING_DIR, "skills_taxonomy.json")
+
+class SkillTaxonomy:
+    """Skills grouped by category, with synonyms keyed by canonical skill name"""
+
+    def __init__(self, categories: Dict[str, List[str]], synonyms: Optional[Dict[str, List[str]]] = None):
+        self.categories = categories
+        self.synonyms = synonyms or {}
+
+    @classmethod
+    def from_mapping(cls, data: dict) -> "SkillTaxonomy":
+        """
+        Build from the JSON/YAML shape:
+        {"categories": {"<category>": {"<canonical name>": ["<synonym>", ...]}}}
+        A category may also be a plain list of names when it has no synonyms.
+        """
+        categories = {}
+        synonyms = {}
+        for category, skills in (data.get("categories") or {}).items():
+            if isinstance(skills, dict):
+                categories[category] = list(skills)
+                for name, names in skills.items():
+                    if names:
+                        synonyms.setdefault(name, []).extend(names)
+            else:
+                categories[category] = list(skills)
+        return cls(categories, synonyms)
+
+    @classmethod
+    def from_csv(cls, path: str) -> "SkillTaxonomy":
+        """Rows of category,name,synonyms where synonyms are separated by '|'"""
+        categories = {}
+        synonyms = {}
+        with open(path, newline="", encoding="utf-8") as handle:
+            for row in csv.DictReader(handle):
+                name = (row.get("name") or "").strip()
+                if not name:
+                    continue
+                category = (row.get("category") or "uncategorized").strip()
+                categories.setdefault(category, []).append(name)
+                names = [value.strip() for value in (row.get("synonyms") or "").split("|") if value.strip()]
+                if names:
+                    synonyms.setdefault(name, []).extend(names)
+        return cls(categories, synonyms)
+
+def load_taxonomy(path: str) -> SkillTaxonomy:
+    """Load a taxonomy from a .json, .yaml/.yml or .csv file"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        with open(path, encoding="utf-8") as handle:
+            return SkillTaxonomy.from_mapping(json.load(handle))
+    if extension in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("PyYAML is required to load YAML taxonomies. Install with: pip install pyyaml")
+        with open(path, encoding="utf-8") as handle:
+            return SkillTaxonomy.from_mapping(yaml.safe_load(handle) or {})
+    if extension == ".csv":
+        return SkillTaxonomy.from_csv(path)
+    raise ValueError(f"Unsupported taxonomy format: {extension}")
+
+def taxonomy_fingerprint(path: str) -> bytes:
+    """SHA-256 of the taxonomy file, stored in the index to detect stale builds"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(65536), b""):
+            digest.update(block)
+    return digest.digest()
+
+def build_skill_index(taxonomy_path: str, index_path: str) -> SkillIndex:
+    """Build the index from a taxonomy file and serialize it to index_path"""
+    taxonomy = load_taxonomy(taxonomy_path)
+    index = SkillIndex(taxonomy.categories, taxonomy.synonyms)
+    index.save(index_path, taxonomy_fingerprint(taxonomy_path))
+    return index
+
+def load_skill_index(taxonomy_path: Optional[str] = None, index_path: Optional[str] = None):
+    """
+    Return a skill index for the taxonomy, memory-mapping a prebuilt index when it is
+    up to date and rebuilding (and re-serializing) it only when the taxonomy changed.
+    """
+    taxonomy_path = taxonomy_path or os.getenv("SKILLS_TAXONOMY_PATH") or DEFAULT_TAXONOMY_PATH
+    index_path = index_path or os.getenv("SKILLS_INDEX_PATH") or os.path.splitext(taxonomy_path)[0] + ".idx"
+    fingerprint = taxonomy_fingerprint(taxonomy_path)
+
+    if os.path.exists(index_path):
+        try:
+            mapped = MappedSkillIndex(index_path)
+            if mapped.fingerprint == fingerprint:
+                logger.info(f"Memory-mapped skills index {index_path} ({len(mapped.skills)} skills)")
+                return mapped
+            mapped.close()
+            logger.info(f"Skills index {index_path} is stale, rebuilding")
+        except Exception as e:
+            logger.warning(f"Could not open skills index {index_path}: {str(e)}")
+
+    taxonomy = load_taxonomy(taxonomy_path)
+    index = SkillIndex(taxonomy.categories, taxonomy.synonyms)
+    try:
+        index.save(index_path, fingerprint)
+        logger.info(f"Built skills index {index_path} ({len(index.skills)} skills)")
+        return MappedSkillIndex(index_path)
+    except OSError as e:
+        # Read-only deployments still work, each process just keeps its own copy
+        logger.warning(f"Could not write skills index {index_path}: {str(e)}")
+        return index
+
+if __name__ == "__main__":
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Prebuild the memory-mapped skills index")
+    arg_parser.add_argument("taxonomy", nargs="?", default=DEFAULT_TAXONOMY_PATH)
+    arg_parser.add_argument("index", nargs="?", default=None)
+    args = arg_parser.parse_args()
+
+    output_path = args.index or os.path.splitext(args.taxonomy)[0] + ".idx"
+    built = build_skill_index(args.taxonomy, output_path)
+    print(f"Wrote {len(built.skills)} skills ({len(built.table)} phrases) to {output_path}")
@@ -1,13 +1,10 @@
 import io
 import re
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from docx import Document
-import spacy
-from transformers import pipeline
 
-nlp = spacy.load("en_core_web_sm")
-hf_ner = pipeline("ner", model="Nucha/Nucha_ITSkillNER_BERT", aggregation_strategy="simple")
+from ai_processing.ner_batching import extract_resume_entities
 
 EMAIL_REGEX = r"[\w\.-]+@[\w\.-]+\.\w+"
 PHONE_REGEX = r"\+?\d{1,3}?[-.\s]?\(?\d{1,4}?\)?[-.\s]?\d{1,4}[-.\s]?\d{1,4}[-.\s]?\d{1,9}(?: x\d+)?"
@@ -39,26 +36,19 @@ def extract_pii(text: str):
     }
 
 def parse_docx_resume(text: str) -> Dict[str, Any]:
-    pii = extract_pii(text)
-    doc = nlp(text)
-    hf_results = hf_ner(text)
-    raw_skills = [
-        ent["word"] for ent in hf_results
-        if ent["entity_group"].upper() in ["HSKILL", "SSKILL"]
-    ]
-    cleaned_skills = [
-        skill.strip(" ·,")
-        for skill in raw_skills
-        if len(skill) > 2 and skill.lower() not in nlp.Defaults.stop_words
-    ]
-    return {
-        "name": pii["name"],
-        "email": pii["email"],
-        "phone": pii["phone"],
-        "raw_text": text,
-        "entities": {
-            "skills": list(set(cleaned_skills)),
-            "experience": [ent.text for ent in doc.ents if ent.label_ == "DATE"],
-            "education": [ent.text for ent in doc.ents if ent.label_ == "ORG"]
-        }
-    }
+    return parse_docx_resumes([text])[0]
+
+def parse_docx_resumes(texts: List[str]) -> List[Dict[str, Any]]:
+    """Parse many resumes at once; NER runs over token-bounded chunks of all of them in batches"""
+    entities = extract_resume_entities(texts)
+    results = []
+    for text, doc_entities in zip(texts, entities):
+        pii = extract_pii(text)
+        results.append({
+            "name": pii["name"],
+            "email": pii["email"],
+            "phone": pii["phone"],
+            "raw_text": text,
+            "entities": doc_entities
+        })
+    return results
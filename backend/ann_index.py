@@ -0,0 +1,481 @@
+import logging
+import os
+import tempfile
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from database import BACKEND_DIR, Candidate
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory file locks, so every process saves (each write is still atomic)
+    fcntl = None
+from ai_processing.matching_service import MODEL_NAME, blob_to_embedding
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+
+def _quantize(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric int8 scalar quantization with one scale per vector"""
+    vectors = np.atleast_2d(vectors).astype(np.float32)
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+def _spherical_kmeans(vectors: np.ndarray, k: int, iterations: int = 8, seed: int = 0) -> np.ndarray:
+    """k-means on the unit sphere (cosine similarity), returning normalized centroids"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=k)
+        non_empty = np.flatnonzero(counts)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[non_empty]
+        centroids[non_empty] = np.add.reduceat(vectors[order], starts, axis=0)
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            centroids[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids /= norms
+    return centroids
+
+class _InvertedList:
+    """Growable block of int8 codes for the vectors assigned to one centroid"""
+
+    def __init__(self, dim: int, capacity: int = 64):
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.codes = np.zeros((capacity, dim), dtype=np.int8)
+        self.scales = np.zeros(capacity, dtype=np.float32)
+        self.size = 0
+
+    def append(self, candidate_id: int, code: np.ndarray, scale: float) -> int:
+        if self.size == len(self.ids):
+            self.ids = np.concatenate([self.ids, np.zeros_like(self.ids)])
+            self.codes = np.concatenate([self.codes, np.zeros_like(self.codes)])
+            self.scales = np.concatenate([self.scales, np.zeros_like(self.scales)])
+        position = self.size
+        self.ids[position] = candidate_id
+        self.codes[position] = code
+        self.scales[position] = scale
+        self.size += 1
+        return position
+
+    def remove(self, position: int) -> Optional[int]:
+        """Remove by moving the last entry into the hole; returns the id that moved"""
+        last = self.size - 1
+        moved_id = None
+        if position != last:
+            moved_id = int(self.ids[last])
+            self.ids[position] = self.ids[last]
+            self.codes[position] = self.codes[last]
+            self.scales[position] = self.scales[last]
+        self.size -= 1
+        return moved_id
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest-neighbour index over resume embeddings.
+
+    Vectors are clustered with spherical k-means into nlist cells and stored as
+    int8 codes in per-cell inverted lists. A query scores the centroids, scans
+    only the nprobe closest cells, and the resulting shortlist is reranked with
+    the exact float vectors from the database. Adds and deletes update the lists
+    in place; once the index grows well past its training size it is retrained on
+    a background thread into new lists that are swapped in when ready. The index
+    is periodically written to disk (and reconciled with the database on load).
+    With several worker processes only the one holding the lock file next to the
+    index writes it; the others keep their copy in memory.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        nlist: Optional[int] = None,
+        nprobe: int = 16,
+        rerank_factor: int = 4,
+        save_delay: float = 5.0
+    ):
+        self.path = path
+        self.fixed_nlist = nlist
+        self.nprobe = nprobe
+        self.rerank_factor = rerank_factor
+        self.save_delay = save_delay
+
+        self._lock = threading.RLock()
+        self._ready = False
+        self._dim: Optional[int] = None
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[_InvertedList] = []
+        self._locations: Dict[int, Tuple[int, int]] = {}  # candidate id -> (list, position)
+        self._trained_size = 0
+        self._save_timer: Optional[threading.Timer] = None
+        self._lock_file = None  # Open while this process holds the writer lock
+        self._generation = 0  # Bumped by _reset, so a retrain started before a clear is discarded
+        self._retraining: Optional[threading.Thread] = None
+        self._pending: Optional[List[Tuple[int, Optional[np.ndarray]]]] = None  # Adds/removes made while retraining
+
+    @classmethod
+    def from_env(cls) -> "IVFIndex":
+        nlist = os.getenv("ANN_NLIST")
+        return cls(
+            path=os.getenv("ANN_INDEX_PATH", os.path.join(BACKEND_DIR, "ann_index.npz")),
+            nlist=int(nlist) if nlist else None,
+            nprobe=int(os.getenv("ANN_NPROBE", "16")),
+            rerank_factor=int(os.getenv("ANN_RERANK_FACTOR", "4")),
+            save_delay=float(os.getenv("ANN_SAVE_DELAY", "5"))
+        )
+
+    @property
+    def size(self) -> int:
+        return len(self._locations)
+
+    @property
+    def nlist(self) -> int:
+        return len(self._lists)
+
+    def _target_nlist(self, count: int) -> int:
+        if self.fixed_nlist:
+            return max(1, min(self.fixed_nlist, count))
+        # Rule of thumb: about 4 * sqrt(N) cells, single cell for tiny collections
+        return max(1, min(4096, int(4 * np.sqrt(count)))) if count >= 256 else 1
+
+    # --- lifecycle ---
+    def ensure_ready(self, db: Session):
+        """Load the index from disk (or build it) and reconcile it with the database"""
+        if self._ready:
+            return
+        with self._lock:
+            if self._ready:
+                return
+            if os.path.exists(self.path):
+                try:
+                    self._load()
+                except Exception as e:
+                    logger.warning(f"Could not load ANN index {self.path}, rebuilding: {str(e)}")
+                    self._reset()
+            self._reconcile(db)
+            self._ready = True
+            logger.info(f"ANN index ready: {self.size} vectors in {self.nlist} lists")
+
+    def _reset(self):
+        self._generation += 1
+        self._pending = None
+        self._dim = None
+        self._centroids = None
+        self._lists = []
+        self._locations = {}
+        self._trained_size = 0
+
+    def _reconcile(self, db: Session):
+        indexed = set(self._locations)
+        stored = {
+            candidate_id for (candidate_id,) in
+            db.query(Candidate.id).filter(
+                Candidate.resume_embedding.isnot(None), Candidate.embedding_model == MODEL_NAME
+            )
+        }
+        stale = indexed - stored
+        if stale:
+            self._remove_locked(stale)
+
+        missing = sorted(stored - indexed)
+        if not missing:
+            return
+        ids, vectors = [], []
+        for start in range(0, len(missing), 1000):
+            chunk = missing[start:start + 1000]
+            for candidate_id, blob in db.query(Candidate.id, Candidate.resume_embedding).filter(Candidate.id.in_(chunk)):
+                ids.append(candidate_id)
+                vectors.append(blob_to_embedding(blob))
+
+        if not self._lists and len(ids):
+            self._train(np.array(ids, dtype=np.int64), np.vstack(vectors))
+        else:
+            for candidate_id, vector in zip(ids, vectors):
+                self._add_locked(candidate_id, vector)
+        self._schedule_save()
+
+    def _train(self, ids: np.ndarray, vectors: np.ndarray):
+        """(Re)build centroids from the given vectors and assign every vector to a list"""
+        self._install(*self._build(ids, vectors))
+
+    def _install(self, centroids: np.ndarray, lists: List[_InvertedList], locations: Dict[int, Tuple[int, int]], trained_size: int):
+        self._dim = centroids.shape[1]
+        self._centroids = centroids
+        self._lists = lists
+        self._locations = locations
+        self._trained_size = trained_size
+
+    def _build(self, ids: np.ndarray, vectors: np.ndarray) -> tuple:
+        """New centroids, lists and locations for the vectors; touches no index state, so it can run unlocked"""
+        count = len(ids)
+        nlist = self._target_nlist(count)
+        if nlist > 1:
+            # Centroids only need a sample; ~16 points per cell keeps training to seconds
+            rng = np.random.default_rng(0)
+            sample = vectors[rng.choice(count, min(count, max(nlist * 16, 5000)), replace=False)]
+            centroids = _spherical_kmeans(sample, nlist)
+        else:
+            centroids = np.zeros((1, vectors.shape[1]), dtype=np.float32)
+
+        centroids = centroids.astype(np.float32)
+        lists = [_InvertedList(vectors.shape[1]) for _ in range(nlist)]
+        locations = {}
+
+        assignments = np.argmax(vectors @ centroids.T, axis=1) if nlist > 1 else np.zeros(count, dtype=np.int64)
+        codes, scales = _quantize(vectors)
+        for candidate_id, list_id, code, scale in zip(ids, assignments, codes, scales):
+            position = lists[list_id].append(int(candidate_id), code, scale)
+            locations[int(candidate_id)] = (int(list_id), position)
+        return centroids, lists, locations, count
+
+    def _dequantized(self) -> Tuple[np.ndarray, np.ndarray]:
+        ids, vectors = [], []
+        for inverted in self._lists:
+            if inverted.size:
+                ids.append(inverted.ids[:inverted.size])
+                vectors.append(inverted.codes[:inverted.size].astype(np.float32) * inverted.scales[:inverted.size, None])
+        if not ids:
+            return np.empty(0, dtype=np.int64), np.empty((0, self._dim or 0), dtype=np.float32)
+        vectors = np.vstack(vectors)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return np.concatenate(ids), vectors
+
+    # --- updates ---
+    def add(self, candidate_id: int, embedding: np.ndarray):
+        with self._lock:
+            if not self._ready:
+                return  # picked up by reconciliation when the index is first used
+            embedding = np.asarray(embedding, dtype=np.float32)
+            self._add_locked(candidate_id, embedding)
+            if self._pending is not None:
+                self._pending.append((candidate_id, embedding))
+            elif self._target_nlist(self.size) > 2 * max(1, self.nlist) and self.size >= 4 * max(1, self._trained_size):
+                self._start_retrain()
+            self._schedule_save()
+
+    def _start_retrain(self):
+        """Retrain on a snapshot in a background thread; searches and adds keep using the current lists meanwhile"""
+        ids, vectors = self._dequantized()
+        logger.info(f"Retraining ANN index for {len(ids)} vectors in the background")
+        self._pending = []
+        self._retraining = threading.Thread(
+            target=self._retrain, args=(ids, vectors, self._generation), name="ann-retrain", daemon=True
+        )
+        self._retraining.start()
+
+    def _retrain(self, ids: np.ndarray, vectors: np.ndarray, generation: int):
+        try:
+            built = self._build(ids, vectors)
+        except Exception as e:
+            logger.error(f"Retraining ANN index failed: {str(e)}", exc_info=True)
+            built = None
+        with self._lock:
+            self._retraining = None
+            pending, self._pending = self._pending, None
+            if built is None or generation != self._generation:
+                return  # Failed, or the index was cleared meanwhile
+            self._install(*built)
+            # Replay what changed after the snapshot was taken, in order
+            for candidate_id, embedding in pending:
+                if embedding is None:
+                    self._remove_locked([candidate_id])
+                else:
+                    self._add_locked(candidate_id, embedding)
+            self._schedule_save()
+        logger.info(f"ANN index retrained: {self.size} vectors in {self.nlist} lists")
+
+    def _add_locked(self, candidate_id: int, embedding: np.ndarray):
+        if not self._lists:
+            self._train(np.array([candidate_id], dtype=np.int64), embedding[None, :])
+            return
+        if embedding.shape[0] != self._dim:
+            logger.warning(f"Skipping ANN vector for candidate {candidate_id}: dimension {embedding.shape[0]}")
+            return
+        if candidate_id in self._locations:
+            self._remove_locked([candidate_id])
+        list_id = int(np.argmax(self._centroids @ embedding)) if self.nlist > 1 else 0
+        code, scale = _quantize(embedding)
+        position = self._lists[list_id].append(candidate_id, code[0], scale[0])
+        self._locations[candidate_id] = (list_id, position)
+
+    def remove(self, candidate_ids: Iterable[int]):
+        with self._lock:
+            candidate_ids = list(candidate_ids)
+            if self._pending is not None:
+                self._pending.extend((candidate_id, None) for candidate_id in candidate_ids)
+            if self._remove_locked(candidate_ids):
+                self._schedule_save()
+
+    def _remove_locked(self, candidate_ids: Iterable[int]) -> bool:
+        removed = False
+        for candidate_id in candidate_ids:
+            location = self._locations.pop(candidate_id, None)
+            if location is None:
+                continue
+            list_id, position = location
+            moved_id = self._lists[list_id].remove(position)
+            if moved_id is not None:
+                self._locations[moved_id] = (list_id, position)
+            removed = True
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+            self._schedule_save()
+
+    # --- search ---
+    def search(
+        self,
+        db: Session,
+        query: np.ndarray,
+        k: int,
+        nprobe: Optional[int] = None,
+        rerank: bool = True,
+        rerank_factor: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Top-k (candidate id, cosine similarity). nprobe trades recall for latency;
+        with rerank the shortlist of k * rerank_factor approximate hits is rescored
+        exactly from the stored float vectors.
+        """
+        self.ensure_ready(db)
+        query = np.asarray(query, dtype=np.float32)
+        shortlist_size = k * (rerank_factor or self.rerank_factor) if rerank else k
+
+        with self._lock:
+            if not self._locations or k <= 0:
+                return []
+            probes = min(nprobe or self.nprobe, self.nlist)
+            if self.nlist > 1:
+                centroid_scores = self._centroids @ query
+                probe_lists = np.argpartition(-centroid_scores, probes - 1)[:probes]
+            else:
+                probe_lists = [0]
+
+            ids, scores = [], []
+            for list_id in probe_lists:
+                inverted = self._lists[list_id]
+                if inverted.size:
+                    ids.append(inverted.ids[:inverted.size].copy())
+                    scores.append((inverted.codes[:inverted.size] @ query) * inverted.scales[:inverted.size])
+
+        if not ids:
+            return []
+        ids = np.concatenate(ids)
+        scores = np.concatenate(scores)
+        top = min(shortlist_size, len(ids))
+        best = np.argpartition(-scores, top - 1)[:top]
+        shortlist = [(int(ids[i]), float(scores[i])) for i in best]
+
+        if rerank:
+            shortlist = self._rerank(db, query, [candidate_id for candidate_id, _ in shortlist])
+        shortlist.sort(key=lambda item: item[1], reverse=True)
+        return shortlist[:k]
+
+    def _rerank(self, db: Session, query: np.ndarray, candidate_ids: List[int]) -> List[Tuple[int, float]]:
+        rows = db.query(Candidate.id, Candidate.resume_embedding).filter(
+            Candidate.id.in_(candidate_ids), Candidate.resume_embedding.isnot(None)
+        )
+        return [(candidate_id, float(blob_to_embedding(blob) @ query)) for candidate_id, blob in rows]
+
+    # --- persistence ---
+    def _is_writer(self) -> bool:
+        """Take the writer lock if no other process holds it; retried on every save, so a writer that exits is replaced"""
+        if fcntl is None or self._lock_file is not None:
+            return True
+        handle = open(self.path + ".lock", "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._lock_file = handle
+        logger.info(f"This process now writes the ANN index to {self.path}")
+        return True
+
+    def _schedule_save(self):
+        if self.save_delay < 0 or self._save_timer is not None or not self._is_writer():
+            return
+        self._save_timer = threading.Timer(self.save_delay, self.save)
+        self._save_timer.daemon = True
+        self._save_timer.start()
+
+    def save(self):
+        """Atomically write the index to self.path"""
+        with self._lock:
+            self._save_timer = None
+            ids, list_ids, codes, scales = [], [], [], []
+            for list_id, inverted in enumerate(self._lists):
+                ids.append(inverted.ids[:inverted.size])
+                list_ids.append(np.full(inverted.size, list_id, dtype=np.int32))
+                codes.append(inverted.codes[:inverted.size])
+                scales.append(inverted.scales[:inverted.size])
+            dim = self._dim or 0
+            arrays = {
+                "meta": np.array([INDEX_FORMAT_VERSION, dim, self.nlist, self._trained_size], dtype=np.int64),
+                "centroids": self._centroids if self._centroids is not None else np.zeros((0, dim), dtype=np.float32),
+                "ids": np.concatenate(ids) if ids else np.empty(0, dtype=np.int64),
+                "list_ids": np.concatenate(list_ids) if list_ids else np.empty(0, dtype=np.int32),
+                "codes": np.vstack(codes) if codes else np.empty((0, dim), dtype=np.int8),
+                "scales": np.concatenate(scales) if scales else np.empty(0, dtype=np.float32)
+            }
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                np.savez(handle, **arrays)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Saving ANN index failed: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _load(self):
+        with np.load(self.path) as data:
+            version, dim, nlist, trained_size = (int(value) for value in data["meta"])
+            if version != INDEX_FORMAT_VERSION:
+                raise ValueError(f"unsupported index version {version}")
+            self._reset()
+            if nlist == 0:
+                return
+            self._dim = dim
+            self._centroids = data["centroids"].astype(np.float32)
+            self._lists = [_InvertedList(dim) for _ in range(nlist)]
+            self._trained_size = trained_size
+            for candidate_id, list_id, code, scale in zip(data["ids"], data["list_ids"], data["codes"], data["scales"]):
+                position = self._lists[list_id].append(int(candidate_id), code, scale)
+                self._locations[int(candidate_id)] = (int(list_id), position)
+
+    def close(self):
+        """Flush pending changes to disk and release the writer lock (called on shutdown)"""
+        timer = self._save_timer
+        if timer is not None:
+            timer.cancel()
+            self.save()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def stats(self) -> dict:
+        return {
+            "vectors": self.size,
+            "nlist": self.nlist,
+            "nprobe": self.nprobe,
+            "rerank_factor": self.rerank_factor,
+            "trained_size": self._trained_size,
+            "retraining": self._retraining is not None,
+            "path": self.path
+        }
+
+# Shared index for the API process
+ann_index = IVFIndex.from_env()
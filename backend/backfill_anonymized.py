@@ -0,0 +1,49 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import logging
+from database import SessionLocal, Candidate
+from ai_processing.anonymizer import anonymizer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+def backfill_anonymized():
+    """Store the redacted resume text for candidates ingested before anonymized_text existed"""
+    db = SessionLocal()
+    try:
+        last_id = 0
+        total = 0
+        while True:
+            batch = (
+                db.query(Candidate.id, Candidate.resume_text, Candidate.name, Candidate.email, Candidate.phone)
+                .filter(Candidate.id > last_id, Candidate.anonymized_text.is_(None))
+                .order_by(Candidate.id.asc())
+                .limit(BATCH_SIZE)
+                .all()
+            )
+            if not batch:
+                break
+
+            db.bulk_update_mappings(Candidate, [
+                {
+                    "id": candidate_id,
+                    "anonymized_text": anonymizer.redact(resume_text or "", {"name": name, "email": email, "phone": phone})
+                }
+                for candidate_id, resume_text, name, email, phone in batch
+            ])
+            db.commit()
+
+            last_id = batch[-1][0]
+            total += len(batch)
+            logger.info(f"Anonymized {total} candidates (last id {last_id})")
+
+        print(f"✅ Backfilled anonymized text for {total} candidates")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    backfill_anonymized()
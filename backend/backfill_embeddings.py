@@ -0,0 +1,51 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import logging
+from database import SessionLocal, Candidate
+from ai_processing.matching_service import MODEL_NAME, encode_resumes, embedding_to_blob
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 64
+
+def backfill_embeddings():
+    """Compute resume embeddings for candidates ingested before embeddings existed (or with another model)"""
+    db = SessionLocal()
+    try:
+        last_id = 0
+        total = 0
+        while True:
+            batch = (
+                db.query(Candidate.id, Candidate.resume_text)
+                .filter(
+                    Candidate.id > last_id,
+                    (Candidate.resume_embedding.is_(None)) | (Candidate.embedding_model != MODEL_NAME)
+                )
+                .order_by(Candidate.id.asc())
+                .limit(BATCH_SIZE)
+                .all()
+            )
+            if not batch:
+                break
+            
+            embeddings = encode_resumes([resume_text or "" for _, resume_text in batch])
+            for (candidate_id, _), embedding in zip(batch, embeddings):
+                db.query(Candidate).filter(Candidate.id == candidate_id).update(
+                    {"resume_embedding": embedding_to_blob(embedding), "embedding_model": MODEL_NAME},
+                    synchronize_session=False
+                )
+            db.commit()
+            
+            last_id = batch[-1][0]
+            total += len(batch)
+            logger.info(f"Embedded {total} candidates (last id {last_id})")
+        
+        print(f"✅ Backfilled embeddings for {total} candidates")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    backfill_embeddings()
@@ -0,0 +1,134 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import random
+import re
+import time
+from collections import Counter
+from datetime import datetime
+from typing import List
+
+import dateutil.parser as date_parser
+
+from ai_processing.experience_extractor import experience_extractor
+from database import Candidate, SessionLocal
+
+ROUNDS = 5
+
+def legacy_experience_years(text: str) -> int:
+    """calculate_experience_years as it was before the compiled extractor, for comparison"""
+    max_experience = 0
+    current_year = datetime.now().year
+    for pattern in [
+        r'(\d{1,2})\+?\s*years?\s*(?:of\s*)?(?:experience|exp)',
+        r'(\d{1,2})\+?\s*yrs?\s*(?:of\s*)?(?:experience|exp)',
+        r'experience\s*[:\-]?\s*(\d{1,2})\+?\s*years?',
+    ]:
+        for match in re.findall(pattern, text, re.IGNORECASE):
+            try:
+                max_experience = max(max_experience, int(match))
+            except:
+                continue
+
+    date_ranges = []
+    for start_year, end_year in re.findall(r'(\d{4})\s*[-–]\s*(\d{4}|present|current)', text, re.IGNORECASE):
+        try:
+            start = int(start_year)
+            end = current_year if end_year.lower() in ['present', 'current'] else int(end_year)
+            if 1990 <= start <= current_year and start <= end:
+                date_ranges.append(end - start)
+        except:
+            continue
+    for start_date, end_date in re.findall(r'(\w+\s+\d{4})\s*[-–]\s*(\w+\s+\d{4}|present|current)', text, re.IGNORECASE):
+        try:
+            start = date_parser.parse(start_date)
+            end = datetime.now() if end_date.lower() in ['present', 'current'] else date_parser.parse(end_date)
+            years_diff = (end - start).days / 365.25
+            if 0 <= years_diff <= 50:
+                date_ranges.append(int(years_diff))
+        except:
+            continue
+    if date_ranges:
+        max_experience = max(max_experience, max(date_ranges))
+
+    for pattern in [
+        r'(?:worked|employed|served)\s+(?:at|in|for|with)\s+([^,\n]+?)(?:from\s+)?(\d{4})\s*[-–]\s*(\d{4}|present)',
+        r'([A-Z][a-z\s&]+(?:Inc|LLC|Corp|Ltd|Company))\s*[,\-]\s*(\d{4})\s*[-–]\s*(\d{4}|present)',
+    ]:
+        for match in re.findall(pattern, text, re.IGNORECASE):
+            try:
+                if len(match) == 3:
+                    start_year = int(match[1])
+                    end_year = current_year if match[2].lower() in ['present', 'current'] else int(match[2])
+                    if 1990 <= start_year <= current_year and start_year <= end_year:
+                        max_experience = max(max_experience, end_year - start_year)
+            except:
+                continue
+    return min(max_experience, 50)
+
+COMPANIES = ["Acme Inc", "Globex Corp", "Initech LLC", "Umbrella Ltd", "Stark Industries", "Wayne Enterprises"]
+TITLES = ["Software Engineer", "Sales Associate", "Project Manager", "Data Analyst", "Nurse", "Accountant"]
+MONTH_NAMES = ["Jan", "February", "Mar", "April", "May", "Jun", "July", "Aug", "Sept", "October", "Nov", "December"]
+FILLER = (
+    "Responsible for delivering projects on time, coordinating with stakeholders and improving "
+    "processes across teams. Tools: Python, Excel, SQL, Salesforce. Call 555-123-4567. "
+)
+
+def synthetic_resume(rng: random.Random) -> str:
+    lines = [f"{rng.choice(['Jane', 'John', 'Ana', 'Wei'])} {rng.choice(['Doe', 'Smith', 'Silva', 'Chen'])}"]
+    if rng.random() < 0.3:
+        lines.append(f"Summary: {rng.randint(1, 20)}+ years of experience in {rng.choice(TITLES).lower()} roles.")
+    year = rng.randint(1995, 2020)
+    lines.append("Experience")
+    for _ in range(rng.randint(1, 5)):
+        end = min(year + rng.randint(1, 6), 2026)
+        if rng.random() < 0.5:
+            dates = f"{rng.choice(MONTH_NAMES)} {year} {rng.choice(['-', '–', 'to'])} {rng.choice(MONTH_NAMES)} {end}"
+        else:
+            dates = f"{year} - {'Present' if end >= 2026 else end}"
+        lines.append(f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)}, {dates}")
+        lines.append(FILLER * rng.randint(1, 6))
+        year = end - rng.randint(0, 1)
+    lines.append("Education")
+    lines.append(f"Bachelor of Science, State University, {year - 25} - {year - 21}")
+    return "\n".join(lines)
+
+def load_corpus(synthetic: int = 2000) -> List[str]:
+    db = SessionLocal()
+    try:
+        stored = [row.resume_text for row in db.query(Candidate.resume_text) if row.resume_text]
+    finally:
+        db.close()
+    rng = random.Random(21)
+    return stored + [synthetic_resume(rng) for _ in range(synthetic)]
+
+def timed(function, corpus: List[str]):
+    best, results = float("inf"), None
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        results = [function(text) for text in corpus]
+        best = min(best, time.perf_counter() - started)
+    return best, results
+
+def benchmark_experience():
+    corpus = load_corpus()
+    total_chars = sum(len(text) for text in corpus)
+    print(f"Corpus: {len(corpus)} resumes, {total_chars / 1e6:.1f}M characters (best of {ROUNDS} runs)")
+
+    legacy_seconds, legacy = timed(legacy_experience_years, corpus)
+    compiled_seconds, compiled = timed(experience_extractor.years, corpus)
+    print(f"legacy    {legacy_seconds * 1000:8.1f}ms  {legacy_seconds / len(corpus) * 1e6:7.1f}µs/resume")
+    print(f"compiled  {compiled_seconds * 1000:8.1f}ms  {compiled_seconds / len(corpus) * 1e6:7.1f}µs/resume")
+    print(f"speedup   {legacy_seconds / compiled_seconds:.1f}x")
+
+    # The compiled extractor adds up separate jobs instead of taking the longest one,
+    # so its totals are expected to be higher on multi-job resumes
+    differences = Counter(new - old for old, new in zip(legacy, compiled))
+    same = differences.pop(0, 0)
+    print(f"Same result for {same}/{len(corpus)} resumes")
+    for difference, count in sorted(differences.items()):
+        print(f"  {difference:+d} years: {count}")
+
+if __name__ == "__main__":
+    benchmark_experience()
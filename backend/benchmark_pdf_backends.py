@@ -0,0 +1,105 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import logging
+import re
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ai_processing.pdf_backends import FALLBACK_BACKEND, PDF_BACKENDS, degradation, garbled_ratio
+from ai_processing.pdf_parser import PageBudget, extract_pdf_text
+
+logging.basicConfig(level=logging.WARNING)
+
+# Word F1 is measured against a hand-checked "<name>.txt" next to the PDF when there is
+# one, otherwise against pdfplumber (what every upload used before), which is not ground
+# truth: it drops inter-word spaces on some layouts
+REFERENCE_BACKEND = FALLBACK_BACKEND
+NO_BUDGET = PageBudget(max_pages=0, max_chars=0, max_seconds=0)
+_WORD = re.compile(r"\w+")
+# Latin "words" this long are nearly always several words with the spaces lost
+_GLUED = re.compile(r"[A-Za-z]{21,}")
+
+def glued_ratio(text: str) -> float:
+    """Share of letters that sit in run-together words"""
+    letters = sum(character.isalpha() for character in text)
+    return sum(len(word) for word in _GLUED.findall(text)) / letters if letters else 0.0
+
+def word_f1(text: str, reference: str) -> float:
+    """Bag-of-words F1 against the reference text (1.0 = same words, any order)"""
+    words, expected = Counter(_WORD.findall(text.lower())), Counter(_WORD.findall(reference.lower()))
+    if not words and not expected:
+        return 1.0
+    overlap = sum((words & expected).values())
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / sum(words.values()), overlap / sum(expected.values())
+    return 2 * precision * recall / (precision + recall)
+
+def load_corpus(paths: List[str]) -> Dict[str, bytes]:
+    corpus = {}
+    for path in map(Path, paths):
+        files = sorted(path.rglob("*.pdf")) if path.is_dir() else [path]
+        for file in files:
+            corpus[str(file)] = file.read_bytes()
+    return corpus
+
+def ground_truth(path: str) -> Optional[str]:
+    truth = Path(path).with_suffix(".txt")
+    return truth.read_text(encoding="utf-8", errors="ignore") if truth.exists() else None
+
+def benchmark_pdf_backends(paths: List[str]):
+    corpus = load_corpus(paths)
+    if not corpus:
+        print("No PDFs found")
+        return
+    total_mb = sum(map(len, corpus.values())) / 1e6
+    print(f"Corpus: {len(corpus)} PDFs, {total_mb:.1f}MB")
+
+    backends = list(PDF_BACKENDS) + ["auto"]
+    reference: Dict[str, str] = {path: text for path in corpus if (text := ground_truth(path)) is not None}
+    print(f"Word F1 against {len(reference)} ground-truth .txt files and {REFERENCE_BACKEND} for the rest")
+    print(
+        f"{'backend':<11} {'docs/s':>8} {'pages/s':>8} {'ms/doc':>8} {'chars/page':>10} "
+        f"{'garbled':>8} {'glued':>7} {'word F1':>8} {'degraded':>9} {'failed':>7}"
+    )
+    for backend in [REFERENCE_BACKEND] + [name for name in backends if name != REFERENCE_BACKEND]:
+        seconds, pages, chars, garbled, glued, f1, degraded, failed, fallbacks = 0.0, 0, 0, 0.0, 0.0, 0.0, 0, 0, 0
+        for path, content in corpus.items():
+            started = time.perf_counter()
+            try:
+                result = extract_pdf_text(content, NO_BUDGET, backend)
+            except Exception as e:
+                failed += 1
+                logging.warning(f"{backend} failed on {path}: {str(e)}")
+                continue
+            seconds += time.perf_counter() - started
+            pages += result.pages_read
+            chars += len(result.text)
+            garbled += garbled_ratio(result.text)
+            glued += glued_ratio(result.text)
+            degraded += degradation(result.text, result.pages_read) is not None
+            fallbacks += result.fallback_reason is not None
+            if backend == REFERENCE_BACKEND:
+                reference.setdefault(path, result.text)
+            f1 += word_f1(result.text, reference.get(path, ""))
+
+        read = len(corpus) - failed
+        if not read:
+            print(f"{backend:<11} failed on every document")
+            continue
+        print(
+            f"{backend:<11} {read / seconds:8.1f} {pages / seconds:8.1f} {seconds / read * 1000:8.1f} "
+            f"{chars / max(pages, 1):10.0f} {garbled / read:8.2%} {glued / read:7.2%} {f1 / read:8.3f} {degraded:9d} {failed:7d}"
+            + (f"  ({fallbacks} fell back to {FALLBACK_BACKEND})" if backend == "auto" else "")
+        )
+
+if __name__ == "__main__":
+    # PDFs or directories of PDFs, e.g. a folder of anonymized sample resumes
+    if len(sys.argv) < 2:
+        print(f"Usage: python {os.path.basename(__file__)} <pdf or directory>...")
+        sys.exit(2)
+    benchmark_pdf_backends(sys.argv[1:])
@@ -1,23 +1,51 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import or_, select, func
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError, OperationalError
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Set, Tuple
 import re
+import string
 import logging
 import os
 import json
+import asyncio
+import zipfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from datetime import datetime
 from dotenv import load_dotenv
-import pdfplumber
 from docx import Document
 from io import BytesIO
 import phonenumbers
 from phonenumbers import geocoder, carrier
 import dateutil.parser as date_parser
 
-from database import Candidate, SessionLocal
+from database import Candidate, SessionLocal, get_async_db
+from write_batcher import write_batcher
 from ai_processing.resume_parser import enhanced_parser
+from ai_processing.pdf_parser import extract_pdf_text
+from ai_processing.batch_scoring import score_candidates
+from ai_processing.anonymizer import anonymizer
+from parsing_executor import parsing_executor, ExecutorSaturated
+from parse_cache import parse_cache, content_hash
+from embedding_store import embedding_store
+from ann_index import ann_index
+from ai_processing.model_registry import model_registry
+from stats_service import candidate_contribution, apply_stats_delta, reset_stats, rebuild_stats, read_stats
+from export_service import EXPORT_FORMATS, parquet_available, stream_export
+from pagination import SORT_COLUMNS, order_keyset, fetch_keyset_page, decode_cursor, next_cursor
+from search_index import fts_table, fts_match, bm25_rank, build_match_query, fts_enabled
+from candidate_skills import (
+    sync_candidate_skills, delete_candidate_skills, filter_by_skills, parse_skills_filter, candidates_with_skill
+)
+from ai_processing.matching_service import (
+    MODEL_NAME, encode_resumes, encode_job_description, embedding_to_blob, blob_to_embedding, similarity_to_score
+)
 
 load_dotenv()
 
@@ -25,6 +53,22 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Batch ingestion limits
+MAX_BATCH_FILES = int(os.getenv("MAX_BATCH_FILES", "1000"))
+MAX_BATCH_FILE_BYTES = int(os.getenv("MAX_BATCH_FILE_BYTES", str(25 * 1024 * 1024)))
+# Uncompressed size of all zip members in one batch, checked before anything is unpacked
+MAX_BATCH_UNZIPPED_BYTES = int(os.getenv("MAX_BATCH_UNZIPPED_BYTES", str(512 * 1024 * 1024)))
+
+# Resume embeddings are computed at ingest by one encoder thread (a single model copy)
+EMBEDDINGS_ENABLED = os.getenv("ENABLE_EMBEDDINGS", "true").lower() in ("1", "true", "yes")
+_embedding_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedder")
+
+# Columns that feed the materialized stats, loaded for rows about to be bulk-deleted
+STATS_COLUMNS = (
+    Candidate.match_score, Candidate.experience_years, Candidate.email, Candidate.phone,
+    Candidate.education, Candidate.skills, Candidate.created_at
+)
+
 class CandidateCreate(BaseModel):
     name: Optional[str] = None
     email: Optional[str] = None
@@ -44,6 +88,21 @@ class CandidateResponse(CandidateCreate):
     class Config:
         from_attributes = True
 
+class CandidateListItem(BaseModel):
+    """Candidate list entry; only the requested fields are present"""
+    id: int
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    resume_text: Optional[str] = None
+    skills: Optional[List[str]] = None
+    experience_years: Optional[int] = None
+    education: Optional[str] = None
+    job_description: Optional[str] = None
+    ai_metadata: Optional[dict] = None
+    created_at: Optional[datetime] = None
+    match_score: Optional[float] = None
+
 class CandidateUpdate(BaseModel):
     name: Optional[str] = None
     email: Optional[str] = None
@@ -56,11 +115,57 @@ class CandidateUpdate(BaseModel):
 class BulkDeleteRequest(BaseModel):
     candidate_ids: List[int]
 
+class BatchFileResult(BaseModel):
+    filename: str
+    status: str  # "created", "duplicate" or "failed"
+    candidate_id: Optional[int] = None
+    name: Optional[str] = None
+    overall_score: Optional[int] = None
+    error: Optional[str] = None
+
+class BatchUploadResponse(BaseModel):
+    total: int
+    created: int
+    failed: int
+    results: List[BatchFileResult]
+
+class RankRequest(BaseModel):
+    job_description: str
+    limit: int = 50
+
+class RankedCandidate(BaseModel):
+    id: int
+    name: str
+    email: Optional[str] = None
+    skills: List[str] = []
+    experience_years: Optional[int] = None
+    similarity: float
+    score: float  # similarity mapped to 0-1, same scale as match_score
+
+class RankResponse(BaseModel):
+    total_ranked: int
+    results: List[RankedCandidate]
+
+class TopKRequest(BaseModel):
+    job_description: str
+    k: int = 20
+    nprobe: Optional[int] = None  # more probed lists = better recall, slower
+    rerank: bool = True
+    rerank_factor: Optional[int] = None
+
+class TopKResponse(BaseModel):
+    indexed: int
+    nprobe: int
+    took_ms: float
+    results: List[RankedCandidate]
+
 class SearchRequest(BaseModel):
     query: str
     filters: Optional[dict] = {}
-    sort_by: Optional[str] = "match_score"
+    sort_by: Optional[str] = None  # relevance (default for text queries), match_score or created_at
     order: Optional[str] = "desc"
+    semantic: bool = False  # rank by embedding similarity through the ANN index
+    nprobe: Optional[int] = None
 
 def get_db():
     db = SessionLocal()
@@ -69,6 +174,15 @@ def get_db():
     finally:
         db.close()
 
+def index_embedding(candidate_id: int, embedding: np.ndarray):
+    """Keep the exact store and the ANN index in step with a new resume vector"""
+    embedding_store.add(candidate_id, embedding)
+    ann_index.add(candidate_id, embedding)
+
+def unindex_candidates(candidate_ids: List[int]):
+    embedding_store.remove(candidate_ids)
+    ann_index.remove(candidate_ids)
+
 def validate_file_type(filename: str):
     """Validate uploaded file type"""
     if not re.search(r"\.(pdf|docx|txt)$", filename, re.IGNORECASE):
@@ -76,15 +190,23 @@ def validate_file_type(filename: str):
 
 def extract_text_from_file(content: bytes, filename: str) -> str:
     """Extract text from uploaded file with enhanced support"""
+    return extract_file_text(content, filename)[0]
+
+def extract_file_text(content: bytes, filename: str) -> Tuple[str, Optional[dict]]:
+    """
+    Extract text from an uploaded file. PDFs are read page by page within the
+    PDF_MAX_* budgets; the second value reports skipped pages (None if complete).
+    """
     try:
         if filename.lower().endswith('.pdf'):
-            with pdfplumber.open(BytesIO(content)) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-                return text
+            extraction = extract_pdf_text(content)
+            report = extraction.report()
+            if report:
+                logger.warning(
+                    f"{filename}: read {extraction.pages_read} of {extraction.page_count or '?'} pages "
+                    f"(stopped by {extraction.stopped_by or 'page errors'}), skipped {extraction.skipped_pages}"
+                )
+            return extraction.text, report
         elif filename.lower().endswith('.docx'):
             doc = Document(BytesIO(content))
             text = ""
@@ -96,9 +218,9 @@ def extract_text_from_file(content: bytes, filename: str) -> str:
                     for cell in row.cells:
                         text += cell.text + " "
                     text += "\n"
-            return text
+            return text, None
         elif filename.lower().endswith('.txt'):
-            return content.decode('utf-8', errors='ignore')
+            return content.decode('utf-8', errors='ignore'), None
         else:
             raise ValueError("Unsupported file type")
     except Exception as e:
@@ -180,101 +302,579 @@ def calculate_overall_score(candidate_data: dict) -> int:
     
     return max(20, min(95, round(final_score)))
 
+def process_resume_content(content: bytes, filename: str, job_description: str = "") -> Tuple[str, dict, int]:
+    """Extract, parse, validate and score one resume. Returns (text, parsed_data, overall_score)"""
+    text, extraction_report = extract_file_text(content, filename)
+    
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="Could not extract text from file")
+    
+    parsed_data, overall_score = parse_resume_text(text, job_description)
+    if extraction_report:
+        parsed_data["pdf_extraction"] = extraction_report
+    return text, parsed_data, overall_score
+
+def parse_resume_text(text: str, job_description: str = "") -> Tuple[dict, int]:
+    """Parse, validate and score already extracted resume text"""
+    # Use enhanced parser
+    parsed_data = finish_parsed_data(text, enhanced_parser.parse_text(text, job_description or ""))
+    
+    # Calculate overall score
+    overall_score = calculate_overall_score(parsed_data)
+    
+    return parsed_data, overall_score
+
+def finish_parsed_data(text: str, parsed_data: dict) -> dict:
+    """Add the anonymized text to the parser output, then validate and clean it"""
+    # Blind-screening copy of the text, redacted with the contact details as the parser
+    # found them (validation may drop an email or phone that still appears in the text)
+    parsed_data["anonymized_text"] = anonymize_resume_text(
+        parsed_data.get("raw_text", text), parsed_data.get("name"), parsed_data.get("email"), parsed_data.get("phone")
+    )
+    
+    # Validate and clean data
+    return validate_candidate_data(parsed_data)
+
+def anonymize_resume_text(text: Optional[str], name: Optional[str], email: Optional[str], phone: Optional[str]) -> str:
+    """Resume text with PII redacted, including every occurrence of the candidate's own name, email and phone"""
+    return anonymizer.redact(text or "", {"name": name, "email": email, "phone": phone})
+
+def build_candidate(
+    text: str,
+    parsed_data: dict,
+    overall_score: int,
+    filename: str,
+    file_size: int,
+    job_description: Optional[str] = "",
+    embedding: Optional[np.ndarray] = None
+) -> Candidate:
+    """Create an unsaved Candidate row with AI metadata from parsed resume data"""
+    ai_metadata = {
+        "original_filename": filename,
+        "file_size": file_size,
+        "skills_extracted": parsed_data.get("skills", []),
+        "experience_years": parsed_data.get("experience_years", 0),
+        "education_level": parsed_data.get("education", ""),
+        "match_score": parsed_data.get("match_score", 0),
+        "overall_score": overall_score,
+        "job_description": job_description,
+        "parsing_confidence": parsed_data.get("confidence", 0.5),
+        "extraction_method": "enhanced_nlp",
+        "match_method": parsed_data.get("match_method", "profile_quality"),
+        "processed_at": datetime.utcnow().isoformat()
+    }
+    if parsed_data.get("pdf_extraction"):
+        ai_metadata["pdf_extraction"] = parsed_data["pdf_extraction"]
+    
+    return Candidate(
+        name=parsed_data.get("name") or "Unknown Candidate",
+        email=parsed_data.get("email"),
+        phone=parsed_data.get("phone"),
+        resume_text=parsed_data.get("raw_text", text),
+        anonymized_text=parsed_data.get("anonymized_text"),
+        skills=json.dumps(parsed_data.get("skills", [])),
+        experience_years=parsed_data.get("experience_years", 0),
+        education=parsed_data.get("education", ""),
+        ai_metadata=ai_metadata,
+        match_score=parsed_data.get("match_score", 0),
+        created_at=datetime.utcnow(),
+        resume_embedding=embedding_to_blob(embedding) if embedding is not None else None,
+        embedding_model=MODEL_NAME if embedding is not None else None
+    )
+
+async def insert_candidate_record(
+    text: str,
+    parsed_data: dict,
+    overall_score: int,
+    filename: str,
+    file_size: int,
+    job_description: Optional[str] = "",
+    embedding: Optional[np.ndarray] = None
+) -> Candidate:
+    """Insert a parsed resume as a new Candidate through the write batcher, rejecting duplicate emails with 409"""
+    db_candidate = build_candidate(text, parsed_data, overall_score, filename, file_size, job_description, embedding)
+    # Concurrent uploads are committed together in one transaction
+    db_candidate = await write_batcher.insert(db_candidate)
+    if embedding is not None:
+        index_embedding(db_candidate.id, embedding)
+    return db_candidate
+
+def anonymized_id(candidate_id: int) -> str:
+    """Stable 6-character pseudonym for a candidate (same as the frontend's generateAnonymizedId)"""
+    seed = candidate_id * 12345
+    result = ""
+    for _ in range(6):
+        result += ANONYMIZED_ID_CHARS[seed % len(ANONYMIZED_ID_CHARS)]
+        seed = seed // len(ANONYMIZED_ID_CHARS) + 7
+    return result
+
+def candidate_field(candidate: Candidate, name: str, anonymized: bool = False):
+    """One response field of a Candidate row; anonymized gives the blind-screening value"""
+    if name == "skills":
+        return json.loads(candidate.skills) if candidate.skills else []
+    if not anonymized:
+        return getattr(candidate, name)
+    if name == "name":
+        return anonymized_id(candidate.id)
+    if name in ("email", "phone"):
+        # Redacted rather than dropped, so "has contact details" is still visible
+        return f"[{name.upper()}_REDACTED]" if getattr(candidate, name) else None
+    if name == "resume_text":
+        if candidate.anonymized_text is None:
+            # Rows from before the column existed; backfill_anonymized.py fills them in
+            return anonymize_resume_text(candidate.resume_text, candidate.name, candidate.email, candidate.phone)
+        return candidate.anonymized_text
+    if name == "ai_metadata" and candidate.ai_metadata:
+        return {key: value for key, value in candidate.ai_metadata.items() if key not in IDENTIFYING_METADATA}
+    return getattr(candidate, name)
+
+def fill_missing_anonymized_text(db: Session, candidates: List[Candidate]):
+    """
+    Redact rows stored before anonymized_text existed with one query for the page,
+    rather than candidate_field lazy-loading resume_text and contact details per row
+    """
+    missing = {candidate.id: candidate for candidate in candidates if candidate.anonymized_text is None}
+    if not missing:
+        return
+    rows = db.query(Candidate.id, Candidate.resume_text, Candidate.name, Candidate.email, Candidate.phone).filter(
+        Candidate.id.in_(list(missing))
+    )
+    for candidate_id, resume_text, name, email, phone in rows:
+        # Not a change to the row: the session does not write it back
+        set_committed_value(missing[candidate_id], "anonymized_text", anonymize_resume_text(resume_text, name, email, phone))
+
+def candidate_to_response(candidate: Candidate, anonymized: bool = False) -> CandidateResponse:
+    """Convert a Candidate row to the API response model"""
+    return CandidateResponse(**{name: candidate_field(candidate, name, anonymized) for name in LIST_FIELDS})
+
+# Columns a list request can select with fields=; summary leaves out the heavy text/JSON columns
+LIST_FIELDS = {
+    "id": Candidate.id,
+    "name": Candidate.name,
+    "email": Candidate.email,
+    "phone": Candidate.phone,
+    "resume_text": Candidate.resume_text,
+    "skills": Candidate.skills,
+    "experience_years": Candidate.experience_years,
+    "education": Candidate.education,
+    "ai_metadata": Candidate.ai_metadata,
+    "match_score": Candidate.match_score,
+    "created_at": Candidate.created_at
+}
+SUMMARY_FIELDS = [name for name in LIST_FIELDS if name not in ("resume_text", "ai_metadata")]
+
+# Blind screening (anonymized=true): names become stable pseudonyms, contact details and
+# these metadata keys are hidden, and resume text comes from the stored redacted copy
+ANONYMIZED_ID_CHARS = string.ascii_uppercase + string.digits
+IDENTIFYING_METADATA = ("original_filename",)
+
+def select_list_fields(fields: Optional[str], view: str = "full") -> List[str]:
+    if fields:
+        requested = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in requested if name not in LIST_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        return list(dict.fromkeys(["id"] + requested))
+    if view == "summary":
+        return SUMMARY_FIELDS
+    return list(LIST_FIELDS)
+
+def candidate_list_item(candidate: Candidate, selected: List[str], anonymized: bool = False) -> dict:
+    """The full response for the default view, otherwise only the selected fields"""
+    if len(selected) == len(LIST_FIELDS):
+        return candidate_to_response(candidate, anonymized).model_dump()
+    return {name: candidate_field(candidate, name, anonymized) for name in selected}
+
+def run_resume_pipeline(content: bytes, filename: str, job_description: str = "") -> dict:
+    """
+    Executor entry point for process_resume_content. Errors are returned as plain
+    dicts because HTTPException cannot be pickled back from a worker process.
+    """
+    try:
+        text, parsed_data, overall_score = process_resume_content(content, filename, job_description)
+        return {"ok": True, "text": text, "parsed_data": parsed_data, "overall_score": overall_score}
+    except HTTPException as he:
+        return {"ok": False, "status_code": he.status_code, "error": he.detail}
+    except Exception as e:
+        logger.error(f"Resume parsing failed for {filename}: {str(e)}", exc_info=True)
+        return {"ok": False, "status_code": 500, "error": f"Resume parsing failed: {str(e)}"}
+
+async def run_off_loop(func, *args, wait_for_slot: bool = False):
+    """
+    Run heavy parsing work on the parsing executor, mapping a full queue to 503.
+    wait_for_slot makes the caller wait for queue space instead (batch work).
+    """
+    try:
+        if wait_for_slot:
+            return await parsing_executor.run(func, *args, queue_timeout=None)
+        return await parsing_executor.run(func, *args)
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+def run_text_pipeline(text: str, job_description: str = "") -> dict:
+    """Executor entry point for parse_resume_text when the extracted text is already known"""
+    try:
+        parsed_data, overall_score = parse_resume_text(text, job_description)
+        return {"ok": True, "text": text, "parsed_data": parsed_data, "overall_score": overall_score}
+    except Exception as e:
+        logger.error(f"Resume parsing failed: {str(e)}", exc_info=True)
+        return {"ok": False, "status_code": 500, "error": f"Resume parsing failed: {str(e)}"}
+
+def run_text_batch(items: List[Tuple[int, str, str]]) -> List[dict]:
+    """
+    Executor entry point for bulk reparsing: parse (candidate_id, text, job_description)
+    items in one worker call, so a chunk costs one round trip to the process pool, and
+    score the whole chunk at once with the batch scorer instead of row by row.
+    """
+    results = []
+    parsed, validated, job_descriptions = [], [], []
+    for candidate_id, text, job_description in items:
+        try:
+            parsed_data = enhanced_parser.parse_text(text, job_description or "", score=False)
+            fields = dict(parsed_data)  # Match scores use the fields before validation rewrites them
+            parsed_data = finish_parsed_data(text, parsed_data)
+        except Exception as e:
+            logger.error(f"Resume parsing failed: {str(e)}", exc_info=True)
+            results.append({"ok": False, "status_code": 500, "error": f"Resume parsing failed: {str(e)}", "id": candidate_id})
+            continue
+        parsed_data.pop("raw_text", None)  # The stored text is unchanged, don't ship it back
+        parsed.append(fields)
+        validated.append(parsed_data)
+        job_descriptions.append(job_description or "")
+        results.append({"ok": True, "parsed_data": parsed_data, "id": candidate_id})
+
+    match_scores, overall_scores = score_candidates(parsed, validated, job_descriptions)
+    scored = (result for result in results if result["ok"])
+    for result, match_score, overall_score in zip(scored, match_scores.tolist(), overall_scores.tolist()):
+        result["parsed_data"]["match_score"] = match_score
+        result["overall_score"] = overall_score
+    return results
+
+def reparsed_fields(candidate: Candidate, parsed_data: dict, overall_score: int, job_description: str = "") -> dict:
+    """
+    Column values for a reparsed candidate; parsed contact details only replace empty ones.
+    The metadata records the match score, how it was computed and the job description used.
+    """
+    fields = {
+        "name": parsed_data.get("name") or candidate.name,
+        "email": parsed_data.get("email") or candidate.email,
+        "phone": parsed_data.get("phone") or candidate.phone,
+        "skills": json.dumps(parsed_data.get("skills", [])),
+        "experience_years": parsed_data.get("experience_years", 0),
+        "education": parsed_data.get("education", ""),
+        "match_score": parsed_data.get("match_score", 0),
+        "anonymized_text": parsed_data.get("anonymized_text")
+    }
+    if fields["anonymized_text"] is not None and any(
+        fields[label] != parsed_data.get(label) for label in ("name", "email", "phone")
+    ):
+        # Kept contact details the parser did not find this time (e.g. edited ones) are redacted too
+        fields["anonymized_text"] = anonymize_resume_text(
+            fields["anonymized_text"], fields["name"], fields["email"], fields["phone"]
+        )
+    if candidate.ai_metadata:
+        # A new dict, so the JSON column is seen as changed
+        fields["ai_metadata"] = {
+            **candidate.ai_metadata,
+            "reparsed_at": datetime.utcnow().isoformat(),
+            "match_score": fields["match_score"],
+            "match_method": parsed_data.get("match_method", "profile_quality"),
+            "job_description": job_description,
+            "overall_score": overall_score,
+            "parsing_confidence": parsed_data.get("confidence", 0.5)
+        }
+    return fields
+
+async def parse_upload(content: bytes, filename: str, job_description: str = "", wait_for_slot: bool = False) -> dict:
+    """
+    Parse uploaded file bytes through the content-hash cache. Repeat uploads reuse
+    the cached parser output, or at least the extracted text, before any
+    extraction or parsing work is scheduled.
+    """
+    job_description = job_description or ""
+    file_hash = content_hash(content)
+    
+    cached, text = parse_cache.lookup(file_hash, job_description)
+    if cached is not None:
+        parsed_data, overall_score = cached
+        outcome = {"ok": True, "text": parsed_data.get("raw_text", ""), "parsed_data": parsed_data,
+                   "overall_score": overall_score, "cache": "hit"}
+        await add_resume_embedding(outcome, file_hash, job_description)
+        return outcome
+    
+    if text is not None:
+        outcome = await run_off_loop(run_text_pipeline, text, job_description, wait_for_slot=wait_for_slot)
+        outcome["cache"] = "text"
+    else:
+        outcome = await run_off_loop(run_resume_pipeline, content, filename, job_description, wait_for_slot=wait_for_slot)
+        outcome["cache"] = "miss"
+    
+    if outcome["ok"]:
+        parse_cache.put_text(file_hash, outcome["text"])
+        parse_cache.put_parsed(file_hash, job_description, outcome["parsed_data"], outcome["overall_score"])
+        await add_resume_embedding(outcome, file_hash, job_description)
+    return outcome
+
+def encode_resume_text(text: str) -> np.ndarray:
+    return encode_resumes([text])[0]
+
+async def add_resume_embedding(
+    outcome: dict,
+    file_hash: str,
+    job_description: str = "",
+    embedding: Optional[np.ndarray] = None
+):
+    """
+    Attach the resume embedding (the given one, else cached or computed) to a parse
+    outcome and, when a job description is given, replace the placeholder match
+    score with the semantic similarity. Embedding failures are logged and never
+    fail the upload.
+    """
+    if not EMBEDDINGS_ENABLED or not outcome["ok"]:
+        return
+    
+    loop = asyncio.get_running_loop()
+    try:
+        if embedding is None:
+            embedding = parse_cache.get_embedding(file_hash)
+        if embedding is None:
+            embedding = await loop.run_in_executor(_embedding_executor, encode_resume_text, outcome["text"])
+            parse_cache.put_embedding(file_hash, embedding)
+        outcome["embedding"] = embedding
+        
+        if job_description and job_description.strip():
+            job_embedding = await loop.run_in_executor(_embedding_executor, encode_job_description, job_description)
+            outcome["overall_score"] = apply_semantic_match(outcome["parsed_data"], embedding, job_embedding)
+    except Exception as e:
+        logger.warning(f"Resume embedding failed, continuing without it: {str(e)}")
+
+def apply_semantic_match(parsed_data: dict, embedding: np.ndarray, job_embedding: np.ndarray) -> int:
+    """Replace the parser's placeholder match score with the resume/job similarity; returns the new overall score"""
+    parsed_data["match_score"] = round(float(similarity_to_score(float(job_embedding @ embedding))), 4)
+    parsed_data["match_method"] = "semantic_similarity"
+    return calculate_overall_score(parsed_data)
+
+def stored_embedding(candidate: Candidate) -> Optional[np.ndarray]:
+    """The candidate's resume vector, if it was computed by the current model"""
+    if candidate.resume_embedding is None or candidate.embedding_model != MODEL_NAME:
+        return None
+    return blob_to_embedding(candidate.resume_embedding)
+
 @router.post("/upload", response_model=CandidateResponse)
 async def upload_resume(
     file: UploadFile = File(...),
-    job_description: Optional[str] = Form(""),
-    db: Session = Depends(get_db)
+    job_description: Optional[str] = Form("")
 ):
     """Upload and parse resume with enhanced processing"""
     try:
         validate_file_type(file.filename)
         content = await file.read()
         
-        # Extract text from file
-        text = extract_text_from_file(content, file.filename)
-        
-        if not text.strip():
-            raise HTTPException(status_code=400, detail="Could not extract text from file")
-        
-        # Use enhanced parser
-        parsed_data = enhanced_parser.parse_text(text, job_description or "")
-        
-        # Validate and clean data
-        parsed_data = validate_candidate_data(parsed_data)
-        
-        # Calculate overall score
-        overall_score = calculate_overall_score(parsed_data)
-        
-        # Prepare AI metadata
-        ai_metadata = {
-            "original_filename": file.filename,
-            "file_size": len(content),
-            "skills_extracted": parsed_data.get("skills", []),
-            "experience_years": parsed_data.get("experience_years", 0),
-            "education_level": parsed_data.get("education", ""),
-            "match_score": parsed_data.get("match_score", 0),
-            "overall_score": overall_score,
-            "job_description": job_description,
-            "parsing_confidence": parsed_data.get("confidence", 0.5),
-            "extraction_method": "enhanced_nlp",
-            "processed_at": datetime.utcnow().isoformat()
-        }
-        
-        # Check for duplicate email
-        if parsed_data.get("email"):
-            existing = db.query(Candidate).filter(Candidate.email == parsed_data["email"]).first()
-            if existing:
-                raise HTTPException(
-                    status_code=409, 
-                    detail=f"Candidate with email {parsed_data['email']} already exists"
-                )
+        # Extraction and parsing run on the parsing executor, never on the event loop
+        outcome = await parse_upload(content, file.filename, job_description)
+        if not outcome["ok"]:
+            raise HTTPException(status_code=outcome["status_code"], detail=outcome["error"])
+        text, parsed_data, overall_score = outcome["text"], outcome["parsed_data"], outcome["overall_score"]
         
-        # Create candidate with enhanced data
-        db_candidate = Candidate(
-            name=parsed_data.get("name") or "Unknown Candidate",
-            email=parsed_data.get("email"),
-            phone=parsed_data.get("phone"),
-            resume_text=parsed_data.get("raw_text", text),
-            skills=json.dumps(parsed_data.get("skills", [])),
-            experience_years=parsed_data.get("experience_years", 0),
-            education=parsed_data.get("education", ""),
-            ai_metadata=ai_metadata,
-            match_score=parsed_data.get("match_score", 0),
-            created_at=datetime.utcnow()
+        db_candidate = await insert_candidate_record(
+            text, parsed_data, overall_score, file.filename, len(content), job_description,
+            outcome.get("embedding")
         )
         
-        db.add(db_candidate)
-        db.commit()
-        db.refresh(db_candidate)
-        
-        # Return response with enhanced data
-        response_data = {
-            "id": db_candidate.id,
-            "name": db_candidate.name,
-            "email": db_candidate.email,
-            "phone": db_candidate.phone,
-            "resume_text": db_candidate.resume_text,
-            "skills": json.loads(db_candidate.skills) if db_candidate.skills else [],
-            "experience_years": db_candidate.experience_years,
-            "education": db_candidate.education,
-            "ai_metadata": db_candidate.ai_metadata,
-            "match_score": db_candidate.match_score,
-            "created_at": db_candidate.created_at
-        }
-        
         logger.info(f"Successfully processed resume for {db_candidate.name} (ID: {db_candidate.id})")
-        return CandidateResponse(**response_data)
+        return candidate_to_response(db_candidate)
         
     except HTTPException as he:
         raise he
     except Exception as e:
-        db.rollback()
         logger.error(f"Resume upload error: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Resume upload failed: {str(e)}")
 
-@router.get("/candidates/", response_model=List[CandidateResponse])
+# --- BATCH UPLOAD ---
+def is_zip_file(filename: str) -> bool:
+    return filename.lower().endswith(".zip")
+
+def expand_batch_files(
+    filename: str,
+    content: bytes,
+    max_files: int = MAX_BATCH_FILES,
+    max_bytes: int = MAX_BATCH_UNZIPPED_BYTES
+) -> List[Tuple[str, bytes]]:
+    """
+    Return (filename, content) pairs, unpacking zip archives into their files. The
+    member count and the uncompressed sizes from the zip directory are checked
+    against max_files/max_bytes (413) before any member is decompressed. Members
+    that are not resumes are returned unread, with empty content.
+    """
+    if not is_zip_file(filename):
+        return [(filename, content)]
+    
+    try:
+        with zipfile.ZipFile(BytesIO(content)) as archive:
+            members = [
+                info for info in archive.infolist()
+                if not (info.is_dir() or os.path.basename(info.filename).startswith(".") or "__MACOSX" in info.filename)
+            ]
+            if len(members) > max_files:
+                raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BATCH_FILES} files")
+            resumes = {info.filename for info in members if re.search(r"\.(pdf|docx|txt)$", info.filename, re.IGNORECASE)}
+            unpacked = 0
+            for info in members:
+                if info.filename not in resumes:
+                    continue
+                if info.file_size > MAX_BATCH_FILE_BYTES:
+                    raise HTTPException(status_code=413, detail=f"{info.filename} in {filename} is too large")
+                unpacked += info.file_size
+            if unpacked > max_bytes:
+                raise HTTPException(
+                    status_code=413, detail=f"Batch unpacks to more than {MAX_BATCH_UNZIPPED_BYTES} bytes"
+                )
+            # zipfile stops reading a member at its declared size, so the checks above hold
+            return [
+                (os.path.basename(info.filename), archive.read(info) if info.filename in resumes else b"")
+                for info in members
+            ]
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail=f"{filename} is not a valid zip archive")
+
+def insert_candidates(db: Session, candidates: List[Candidate]) -> List[Optional[str]]:
+    """
+    Insert candidates (with skills links and stats delta) in one transaction. If the
+    group fails, each one is retried on its own, so a bad row only fails itself.
+    Returns an error message per candidate, None where it was inserted.
+    """
+    if not candidates:
+        return []
+    try:
+        db.add_all(candidates)
+        db.flush()
+        sync_candidate_skills(db, candidates)
+        apply_stats_delta(db, added=[candidate_contribution(candidate) for candidate in candidates])
+        db.commit()
+        return [None] * len(candidates)
+    except SQLAlchemyError as e:
+        db.rollback()
+        if len(candidates) == 1:
+            logger.error(f"Candidate insert failed: {str(e)}")
+            return [str(getattr(e, "orig", None) or e)]  # The driver's message, without the SQL
+        logger.warning(f"Batch insert of {len(candidates)} candidates failed, retrying one by one: {str(e)}")
+        for candidate in candidates:
+            candidate.id = None  # Assigned by the rolled-back flush
+        return [insert_candidates(db, [candidate])[0] for candidate in candidates]
+
+def existing_emails(emails: Set[str]) -> Set[str]:
+    """The given emails that already belong to a candidate"""
+    db = SessionLocal()
+    try:
+        return {row.email for row in db.query(Candidate.email).filter(Candidate.email.in_(emails))}
+    finally:
+        db.close()
+
+def insert_new_candidates(candidates: List[Candidate]) -> List[Optional[str]]:
+    """insert_candidates on a session of its own; the rows stay readable after it closes"""
+    db = SessionLocal(expire_on_commit=False)
+    try:
+        return insert_candidates(db, candidates)
+    finally:
+        db.close()
+
+@router.post("/candidates/upload-batch", response_model=BatchUploadResponse)
+async def upload_resume_batch(
+    files: List[UploadFile] = File(...),
+    job_description: Optional[str] = Form("")
+):
+    """Upload many resumes (or zip archives of resumes), parse them in parallel and insert in one transaction"""
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BATCH_FILES} files")
+    
+    batch = []
+    results: List[Optional[BatchFileResult]] = []
+    unzipped_budget = MAX_BATCH_UNZIPPED_BYTES
+    for upload in files:
+        content = await upload.read()
+        expanded = expand_batch_files(upload.filename, content, MAX_BATCH_FILES - len(results), unzipped_budget)
+        if is_zip_file(upload.filename):
+            unzipped_budget -= sum(len(file_content) for _, file_content in expanded)
+        for filename, file_content in expanded:
+            if not re.search(r"\.(pdf|docx|txt)$", filename, re.IGNORECASE):
+                results.append(BatchFileResult(filename=filename, status="failed", error="Only PDF, DOCX, and TXT files allowed"))
+            elif len(file_content) > MAX_BATCH_FILE_BYTES:
+                results.append(BatchFileResult(filename=filename, status="failed", error="File is too large"))
+            else:
+                batch.append((len(results), filename, file_content))
+                results.append(None)
+    
+    if len(results) > MAX_BATCH_FILES:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BATCH_FILES} files")
+    
+    # Fan extraction and parsing out to the parsing executor; batches wait for queue
+    # slots instead of being rejected
+    outcomes = await asyncio.gather(*(
+        parse_upload(file_content, filename, job_description, wait_for_slot=True)
+        for _, filename, file_content in batch
+    ))
+    
+    # Skip emails that already exist in the database or earlier in this batch
+    emails = {outcome["parsed_data"]["email"] for outcome in outcomes if outcome["ok"] and outcome["parsed_data"].get("email")}
+    seen_emails = await asyncio.to_thread(existing_emails, emails) if emails else set()
+    
+    pending = []
+    for (position, filename, file_content), outcome in zip(batch, outcomes):
+        if not outcome["ok"]:
+            results[position] = BatchFileResult(filename=filename, status="failed", error=outcome["error"])
+            continue
+        
+        parsed_data = outcome["parsed_data"]
+        email = parsed_data.get("email")
+        if email and email in seen_emails:
+            results[position] = BatchFileResult(
+                filename=filename,
+                status="duplicate",
+                name=parsed_data.get("name"),
+                error=f"Candidate with email {email} already exists"
+            )
+            continue
+        if email:
+            seen_emails.add(email)
+        
+        db_candidate = build_candidate(
+            outcome["text"], parsed_data, outcome["overall_score"], filename, len(file_content), job_description,
+            outcome.get("embedding")
+        )
+        pending.append((position, filename, db_candidate, outcome["overall_score"], outcome.get("embedding")))
+    
+    # Bulk insert every parsed candidate in a single transaction, off the event loop
+    errors = await asyncio.to_thread(insert_new_candidates, [db_candidate for _, _, db_candidate, _, _ in pending])
+    
+    created = 0
+    for (position, filename, db_candidate, overall_score, embedding), error in zip(pending, errors):
+        if error is not None:
+            results[position] = BatchFileResult(
+                filename=filename, status="failed", name=db_candidate.name, error=f"Insert failed: {error}"
+            )
+            continue
+        created += 1
+        if embedding is not None:
+            index_embedding(db_candidate.id, embedding)
+        results[position] = BatchFileResult(
+            filename=filename,
+            status="created",
+            candidate_id=db_candidate.id,
+            name=db_candidate.name,
+            overall_score=overall_score
+        )
+    
+    logger.info(f"Batch upload processed {len(results)} files, created {created} candidates")
+    return BatchUploadResponse(
+        total=len(results),
+        created=created,
+        failed=len(results) - created,
+        results=results
+    )
+
+@router.get("/candidates/", response_model=List[CandidateListItem], response_model_exclude_unset=True)
 def get_candidates(
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
     sort_by: str = "match_score",
@@ -283,89 +883,66 @@ def get_candidates(
     max_experience: Optional[int] = None,
     min_match_score: Optional[float] = None,
     skills_filter: Optional[str] = None,
+    skills_mode: str = "any",
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    view: str = "full",
+    anonymized: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Get candidates with advanced filtering and sorting"""
-    query = db.query(Candidate)
+    """
+    Get candidates with advanced filtering and sorting (skills_filter is comma-separated, skills_mode any/all).
+    Pass the X-Next-Cursor response header back as `cursor` for the next page; `view=summary`
+    or `fields=name,email,...` leaves heavy columns out of the SQL query. `anonymized=true`
+    returns the blind-screening view, reading the stored redacted text instead of resume_text.
+    """
+    if sort_by not in SORT_COLUMNS:
+        sort_by = "match_score"
+    order = "asc" if order == "asc" else "desc"
+    selected = select_list_fields(fields, view)
     
-    # Apply filters
-    if min_experience is not None:
-        query = query.filter(Candidate.experience_years >= min_experience)
+    # Only the selected columns (plus id and the sort key for the cursor) are loaded
+    load_columns = {"id", sort_by} | set(selected)
+    columns = [
+        Candidate.anonymized_text if anonymized and name == "resume_text" else LIST_FIELDS[name]
+        for name in load_columns
+    ]
+    query = db.query(Candidate).options(load_only(*columns))
     
-    if max_experience is not None:
-        query = query.filter(Candidate.experience_years <= max_experience)
+    # Apply filters
+    filters = {
+        "min_experience": min_experience,
+        "max_experience": max_experience,
+        "min_match_score": min_match_score,
+        "skills": skills_filter,
+        "skills_mode": skills_mode
+    }
+    query = apply_search_filters(query, db, {name: value for name, value in filters.items() if value is not None})
     
-    if min_match_score is not None:
-        query = query.filter(Candidate.match_score >= min_match_score)
+    # Keyset pagination: seek past the cursor row instead of counting off `skip` rows
+    if cursor:
+        candidates = fetch_keyset_page(query, sort_by, order, decode_cursor(cursor, sort_by, order), limit)
+    elif skip:
+        candidates = order_keyset(query, sort_by, order).offset(skip).limit(limit).all()
+    else:
+        candidates = fetch_keyset_page(query, sort_by, order, None, limit)
     
-    if skills_filter:
-        query = query.filter(Candidate.skills.ilike(f"%{skills_filter}%"))
+    cursor_after = next_cursor(candidates, limit, sort_by, order)
+    if cursor_after:
+        response.headers["X-Next-Cursor"] = cursor_after
+    if anonymized and "resume_text" in selected:
+        fill_missing_anonymized_text(db, candidates)
     
-    # Apply sorting
-    if sort_by == "match_score":
-        if order == "desc":
-            query = query.order_by(Candidate.match_score.desc())
-        else:
-            query = query.order_by(Candidate.match_score.asc())
-    elif sort_by == "created_at":
-        if order == "desc":
-            query = query.order_by(Candidate.created_at.desc())
-        else:
-            query = query.order_by(Candidate.created_at.asc())
-    elif sort_by == "experience_years":
-        if order == "desc":
-            query = query.order_by(Candidate.experience_years.desc())
-        else:
-            query = query.order_by(Candidate.experience_years.asc())
-    elif sort_by == "name":
-        if order == "desc":
-            query = query.order_by(Candidate.name.desc())
-        else:
-            query = query.order_by(Candidate.name.asc())
-    
-    candidates = query.offset(skip).limit(limit).all()
-    
-    result = []
-    for candidate in candidates:
-        candidate_data = {
-            "id": candidate.id,
-            "name": candidate.name,
-            "email": candidate.email,
-            "phone": candidate.phone,
-            "resume_text": candidate.resume_text,
-            "skills": json.loads(candidate.skills) if candidate.skills else [],
-            "experience_years": candidate.experience_years,
-            "education": candidate.education,
-            "ai_metadata": candidate.ai_metadata,
-            "match_score": candidate.match_score,
-            "created_at": candidate.created_at
-        }
-        result.append(CandidateResponse(**candidate_data))
-    
-    return result
+    return [candidate_list_item(candidate, selected, anonymized) for candidate in candidates]
 
 @router.get("/candidates/{candidate_id}", response_model=CandidateResponse)
-def get_candidate(candidate_id: int, db: Session = Depends(get_db)):
-    """Get specific candidate by ID"""
-    candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
+async def get_candidate(candidate_id: int, anonymized: bool = False, db: AsyncSession = Depends(get_async_db)):
+    """Get specific candidate by ID (anonymized=true for the blind-screening view)"""
+    candidate = await db.get(Candidate, candidate_id)
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
-    candidate_data = {
-        "id": candidate.id,
-        "name": candidate.name,
-        "email": candidate.email,
-        "phone": candidate.phone,
-        "resume_text": candidate.resume_text,
-        "skills": json.loads(candidate.skills) if candidate.skills else [],
-        "experience_years": candidate.experience_years,
-        "education": candidate.education,
-        "ai_metadata": candidate.ai_metadata,
-        "match_score": candidate.match_score,
-        "created_at": candidate.created_at
-    }
-    
-    return CandidateResponse(**candidate_data)
+    return candidate_to_response(candidate, anonymized)
 
 @router.put("/candidates/{candidate_id}", response_model=CandidateResponse)
 def update_candidate(
@@ -377,6 +954,7 @@ def update_candidate(
     candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
+    before = candidate_contribution(candidate)
     
     # Update fields
     if candidate_update.name is not None:
@@ -385,8 +963,15 @@ def update_candidate(
         candidate.email = candidate_update.email
     if candidate_update.phone is not None:
         candidate.phone = candidate_update.phone
+    if any(value is not None for value in (candidate_update.name, candidate_update.email, candidate_update.phone)):
+        # Redact the new contact details on top of the stored copy, so the old ones stay redacted too
+        candidate.anonymized_text = anonymize_resume_text(
+            candidate.anonymized_text if candidate.anonymized_text is not None else candidate.resume_text,
+            candidate.name, candidate.email, candidate.phone
+        )
     if candidate_update.skills is not None:
         candidate.skills = json.dumps(candidate_update.skills)
+        sync_candidate_skills(db, [candidate])
     if candidate_update.experience_years is not None:
         candidate.experience_years = candidate_update.experience_years
     if candidate_update.education is not None:
@@ -398,24 +983,11 @@ def update_candidate(
     if candidate.ai_metadata:
         candidate.ai_metadata["last_updated"] = datetime.utcnow().isoformat()
     
+    apply_stats_delta(db, added=[candidate_contribution(candidate)], removed=[before])
     db.commit()
     db.refresh(candidate)
     
-    candidate_data = {
-        "id": candidate.id,
-        "name": candidate.name,
-        "email": candidate.email,
-        "phone": candidate.phone,
-        "resume_text": candidate.resume_text,
-        "skills": json.loads(candidate.skills) if candidate.skills else [],
-        "experience_years": candidate.experience_years,
-        "education": candidate.education,
-        "ai_metadata": candidate.ai_metadata,
-        "match_score": candidate.match_score,
-        "created_at": candidate.created_at
-    }
-    
-    return CandidateResponse(**candidate_data)
+    return candidate_to_response(candidate)
 
 @router.delete("/candidates/{candidate_id}")
 def delete_candidate(candidate_id: int, db: Session = Depends(get_db)):
@@ -424,136 +996,226 @@ def delete_candidate(candidate_id: int, db: Session = Depends(get_db)):
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
+    delete_candidate_skills(db, [candidate_id])
+    apply_stats_delta(db, removed=[candidate_contribution(candidate)])
     db.delete(candidate)
     db.commit()
+    unindex_candidates([candidate_id])
     
     return {"message": f"Candidate {candidate_id} deleted successfully"}
 
 @router.post("/candidates/bulk-delete")
 def bulk_delete_candidates(request: BulkDeleteRequest, db: Session = Depends(get_db)):
     """Delete multiple candidates"""
+    delete_candidate_skills(db, request.candidate_ids)
+    deleted = db.query(Candidate).options(load_only(*STATS_COLUMNS)).filter(Candidate.id.in_(request.candidate_ids)).all()
+    apply_stats_delta(db, removed=[candidate_contribution(candidate) for candidate in deleted])
     deleted_count = db.query(Candidate).filter(Candidate.id.in_(request.candidate_ids)).delete(synchronize_session=False)
     db.commit()
+    unindex_candidates(request.candidate_ids)
     
     return {
         "message": f"Successfully deleted {deleted_count} candidates",
         "deleted_count": deleted_count
     }
 
+@router.post("/candidates/rank", response_model=RankResponse)
+def rank_candidates(request: RankRequest, db: Session = Depends(get_db)):
+    """Rank every candidate with a stored embedding against a job description"""
+    if not request.job_description.strip():
+        raise HTTPException(status_code=400, detail="job_description is required")
+    
+    try:
+        embedding_store.ensure_loaded(db)
+        job_embedding = encode_job_description(request.job_description)
+    except Exception as e:
+        logger.error(f"Ranking failed: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=503, detail=f"Semantic ranking unavailable: {str(e)}")
+    
+    # One matrix-vector product over all stored embeddings, then a partial sort
+    top = embedding_store.top_k(job_embedding, max(1, min(request.limit, 1000)))
+    return RankResponse(total_ranked=embedding_store.size, results=ranked_candidates(db, top))
+
+def ranked_candidates(db: Session, top: List[Tuple[int, float]]) -> List[RankedCandidate]:
+    """Load (candidate id, similarity) hits in one query, keeping their order"""
+    candidates = {
+        candidate.id: candidate
+        for candidate in db.query(Candidate).filter(Candidate.id.in_([candidate_id for candidate_id, _ in top]))
+    }
+    
+    results = []
+    for candidate_id, similarity in top:
+        candidate = candidates.get(candidate_id)
+        if candidate is None:
+            continue
+        results.append(RankedCandidate(
+            id=candidate.id,
+            name=candidate.name,
+            email=candidate.email,
+            skills=json.loads(candidate.skills) if candidate.skills else [],
+            experience_years=candidate.experience_years,
+            similarity=round(similarity, 4),
+            score=round(float(similarity_to_score(similarity)), 4)
+        ))
+    return results
+
+@router.post("/candidates/top-k", response_model=TopKResponse)
+def top_k_candidates(request: TopKRequest, db: Session = Depends(get_db)):
+    """Approximate top-K candidates for a job description via the IVF index, exactly reranked"""
+    if not request.job_description.strip():
+        raise HTTPException(status_code=400, detail="job_description is required")
+    
+    started = time.perf_counter()
+    try:
+        job_embedding = encode_job_description(request.job_description)
+        top = ann_index.search(
+            db,
+            job_embedding,
+            max(1, min(request.k, 1000)),
+            nprobe=request.nprobe,
+            rerank=request.rerank,
+            rerank_factor=request.rerank_factor
+        )
+    except Exception as e:
+        logger.error(f"Top-K retrieval failed: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=503, detail=f"Semantic retrieval unavailable: {str(e)}")
+    
+    results = ranked_candidates(db, top)
+    return TopKResponse(
+        indexed=ann_index.size,
+        nprobe=min(request.nprobe or ann_index.nprobe, max(1, ann_index.nlist)),
+        took_ms=round((time.perf_counter() - started) * 1000, 2),
+        results=results
+    )
+
+def build_search_query(db: Session, request: SearchRequest):
+    """The ordered /search query for a text (FTS or LIKE fallback) search, before paging"""
+    query = db.query(Candidate)
+    
+    # Full-text search over resume text and profile fields, BM25-ranked
+    ranked = False
+    if request.query and request.query.strip():
+        if fts_enabled():
+            match_query = build_match_query(request.query)
+            if match_query:
+                query = (
+                    query.join(fts_table, fts_table.c.rowid == Candidate.id)
+                    .filter(fts_match(match_query))
+                )
+                ranked = True
+        else:
+            pattern = f"%{request.query}%"
+            query = query.filter(or_(
+                Candidate.name.ilike(pattern),
+                Candidate.email.ilike(pattern),
+                Candidate.id.in_(candidates_with_skill(request.query)),
+                Candidate.education.ilike(pattern),
+                Candidate.resume_text.ilike(pattern)
+            ))
+    
+    # Apply additional filters
+    query = apply_search_filters(query, db, request.filters)
+    
+    # Apply sorting (relevance by default for text queries)
+    sort_by = request.sort_by or ("relevance" if ranked else "match_score")
+    if sort_by == "relevance" and ranked:
+        return query.order_by(bm25_rank if request.order != "asc" else bm25_rank.desc())
+    if sort_by == "created_at":
+        if request.order == "desc":
+            return query.order_by(Candidate.created_at.desc())
+        return query.order_by(Candidate.created_at.asc())
+    if request.order == "desc":
+        return query.order_by(Candidate.match_score.desc())
+    return query.order_by(Candidate.match_score.asc())
+
 @router.post("/search", response_model=List[CandidateResponse])
 def search_candidates(
     request: SearchRequest,
     skip: int = 0,
     limit: int = 50,
+    anonymized: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Advanced search with multiple criteria"""
-    query = db.query(Candidate)
+    """Advanced search with multiple criteria (anonymized=true for the blind-screening view)"""
+    if request.semantic and request.query:
+        return semantic_search(request, skip, limit, db, anonymized)
     
-    # Text search across multiple fields
-    if request.query:
-        search_filter = db.or_(
-            Candidate.name.ilike(f"%{request.query}%"),
-            Candidate.email.ilike(f"%{request.query}%"),
-            Candidate.skills.ilike(f"%{request.query}%"),
-            Candidate.education.ilike(f"%{request.query}%")
-        )
-        query = query.filter(search_filter)
+    query = build_search_query(db, request)
     
-    # Apply additional filters
-    if request.filters:
-        if "min_experience" in request.filters:
-            query = query.filter(Candidate.experience_years >= request.filters["min_experience"])
-        if "max_experience" in request.filters:
-            query = query.filter(Candidate.experience_years <= request.filters["max_experience"])
-        if "min_match_score" in request.filters:
-            query = query.filter(Candidate.match_score >= request.filters["min_match_score"])
-    
-    # Apply sorting
-    if request.sort_by == "match_score":
-        if request.order == "desc":
-            query = query.order_by(Candidate.match_score.desc())
-        else:
-            query = query.order_by(Candidate.match_score.asc())
-    elif request.sort_by == "created_at":
-        if request.order == "desc":
-            query = query.order_by(Candidate.created_at.desc())
-        else:
-            query = query.order_by(Candidate.created_at.asc())
-    
-    candidates = query.offset(skip).limit(limit).all()
-    
-    result = []
-    for candidate in candidates:
-        candidate_data = {
-            "id": candidate.id,
-            "name": candidate.name,
-            "email": candidate.email,
-            "phone": candidate.phone,
-            "resume_text": candidate.resume_text,
-            "skills": json.loads(candidate.skills) if candidate.skills else [],
-            "experience_years": candidate.experience_years,
-            "education": candidate.education,
-            "ai_metadata": candidate.ai_metadata,
-            "match_score": candidate.match_score,
-            "created_at": candidate.created_at
-        }
-        result.append(CandidateResponse(**candidate_data))
+    try:
+        candidates = query.offset(skip).limit(limit).all()
+    except OperationalError as e:
+        message = str(e.orig).lower()
+        if "fts5" in message or "syntax error" in message:
+            logger.warning(f"Full-text query rejected: {str(e)}")
+            raise HTTPException(status_code=400, detail=f"Invalid search query: {request.query}")
+        logger.error(f"Search failed: {str(e)}", exc_info=True)
+        if "locked" in message or "busy" in message:
+            raise HTTPException(status_code=503, detail="Database is busy, try again", headers={"Retry-After": "1"})
+        raise HTTPException(status_code=500, detail="Search failed")
     
-    return result
+    return [candidate_to_response(candidate, anonymized) for candidate in candidates]
+
+def apply_search_filters(query, db: Session, filters: Optional[dict]):
+    """min/max_experience, min_match_score and skills (list or comma string) with skills_mode any/all"""
+    if not filters:
+        return query
+    if "min_experience" in filters:
+        query = query.filter(Candidate.experience_years >= filters["min_experience"])
+    if "max_experience" in filters:
+        query = query.filter(Candidate.experience_years <= filters["max_experience"])
+    if "min_match_score" in filters:
+        query = query.filter(Candidate.match_score >= filters["min_match_score"])
+    if filters.get("skills"):
+        skills = filters["skills"]
+        skills = parse_skills_filter(",".join(skills) if isinstance(skills, list) else str(skills))
+        query = filter_by_skills(query, db, skills, filters.get("skills_mode", "any"))
+    return query
+
+def semantic_search(
+    request: SearchRequest, skip: int, limit: int, db: Session, anonymized: bool = False
+) -> List[CandidateResponse]:
+    """Candidates most similar to the query text, with the usual filters applied to the ANN shortlist"""
+    try:
+        query_embedding = encode_job_description(request.query)
+        # Over-fetch so that filtering the shortlist still leaves a full page
+        top = ann_index.search(db, query_embedding, max(1, min((skip + limit) * 4, 5000)), nprobe=request.nprobe)
+    except Exception as e:
+        logger.error(f"Semantic search failed: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=503, detail=f"Semantic search unavailable: {str(e)}")
+    
+    query = db.query(Candidate).filter(Candidate.id.in_([candidate_id for candidate_id, _ in top]))
+    query = apply_search_filters(query, db, request.filters)
+    
+    candidates = {candidate.id: candidate for candidate in query}
+    ranked = [candidates[candidate_id] for candidate_id, _ in top if candidate_id in candidates]
+    return [candidate_to_response(candidate, anonymized) for candidate in ranked[skip:skip + limit]]
 
 @router.get("/stats")
-def get_stats(db: Session = Depends(get_db)):
-    """Get comprehensive statistics"""
+async def get_stats(db: AsyncSession = Depends(get_async_db)):
+    """Get comprehensive statistics (materialized, maintained on every write)"""
     try:
-        total_candidates = db.query(Candidate).count()
-        high_match_candidates = db.query(Candidate).filter(Candidate.match_score >= 0.8).count()
-        experienced_candidates = db.query(Candidate).filter(Candidate.experience_years >= 5).count()
-        recent_candidates = db.query(Candidate).filter(
-            Candidate.created_at >= datetime.utcnow().replace(day=1)
-        ).count()
-        
-        avg_match_score = db.query(db.func.avg(Candidate.match_score)).scalar() or 0.0
-        avg_experience = db.query(db.func.avg(Candidate.experience_years)).scalar() or 0.0
-        
-        # Skills analysis
-        all_skills = []
-        candidates_with_skills = db.query(Candidate).filter(Candidate.skills.isnot(None)).all()
-        for candidate in candidates_with_skills:
-            try:
-                skills = json.loads(candidate.skills)
-                all_skills.extend(skills)
-            except:
-                continue
-        
-        skill_counts = {}
-        for skill in all_skills:
-            skill_counts[skill] = skill_counts.get(skill, 0) + 1
-        
-        top_skills = sorted(skill_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-        
-        return {
-            "total_candidates": total_candidates,
-            "high_match_candidates": high_match_candidates,
-            "experienced_candidates": experienced_candidates,
-            "recent_candidates": recent_candidates,
-            "average_match_score": round(avg_match_score, 2),
-            "average_experience": round(avg_experience, 1),
-            "top_skills": top_skills,
-            "candidates_with_email": db.query(Candidate).filter(Candidate.email.isnot(None)).count(),
-            "candidates_with_phone": db.query(Candidate).filter(Candidate.phone.isnot(None)).count(),
-            "candidates_with_education": db.query(Candidate).filter(Candidate.education.isnot(None)).count()
-        }
+        return await db.run_sync(read_stats)
     except Exception as e:
         logger.error(f"Stats retrieval failed: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to retrieve statistics")
 
+@router.post("/stats/rebuild")
+def rebuild_statistics(db: Session = Depends(get_db)):
+    """Recompute the materialized statistics from the candidates table"""
+    rebuild_stats(db)
+    return read_stats(db)
+
 @router.post("/reset")
 async def reset_candidates(db: Session = Depends(get_db)):
     """Reset all candidate data"""
     try:
+        delete_candidate_skills(db)
+        reset_stats(db)
         deleted_count = db.query(Candidate).delete(synchronize_session=False)
         db.commit()
+        embedding_store.clear()
+        ann_index.clear()
         
         logger.info(f"Database reset: {deleted_count} candidates deleted.")
         
@@ -580,19 +1242,24 @@ async def reset_candidates(db: Session = Depends(get_db)):
         )
 
 @router.get("/health")
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_async_db)):
     """Comprehensive health check"""
     try:
-        count = db.query(Candidate).count()
-        latest_candidate = db.query(Candidate).order_by(Candidate.created_at.desc()).first()
+        count = await db.scalar(select(func.count(Candidate.id)))
+        latest_upload = await db.scalar(select(func.max(Candidate.created_at)))
         
         return {
             "status": "healthy",
             "database": "connected",
+            "database_backend": db.bind.dialect.name,
             "total_candidates": count,
             "parser_status": "enhanced_parser_active",
-            "latest_upload": latest_candidate.created_at if latest_candidate else None,
+            "latest_upload": latest_upload,
             "api_version": "v1.0",
+            "parsing_executor": parsing_executor.metrics(),
+            "write_batcher": write_batcher.stats(),
+            "ann_index": ann_index.stats(),
+            "models": model_registry.stats(),
             "features": [
                 "enhanced_parsing",
                 "skills_extraction", 
@@ -609,107 +1276,114 @@ async def health_check(db: Session = Depends(get_db)):
             detail="Database connection failed"
         )
 
+@router.get("/metrics/parsing")
+def get_parsing_metrics():
+    """Parsing executor queue depth, wait time and throughput, plus parse cache hit rate"""
+    metrics = parsing_executor.metrics()
+    metrics["parse_cache"] = parse_cache.stats()
+    return metrics
+
+@router.get("/metrics/models")
+def get_model_metrics():
+    """Load status, load time and memory growth of each model in this API process"""
+    return model_registry.stats()
+
 @router.get("/export")
-async def export_candidates(
+def export_candidates(
     format: str = "json",
-    include_resume_text: bool = False,
-    db: Session = Depends(get_db)
+    include_resume_text: bool = False
 ):
-    """Export candidates data in various formats"""
-    try:
-        candidates = db.query(Candidate).all()
-        
-        export_data = []
-        for candidate in candidates:
-            data = {
-                "id": candidate.id,
-                "name": candidate.name,
-                "email": candidate.email,
-                "phone": candidate.phone,
-                "skills": json.loads(candidate.skills) if candidate.skills else [],
-                "experience_years": candidate.experience_years,
-                "education": candidate.education,
-                "match_score": candidate.match_score,
-                "created_at": candidate.created_at.isoformat() if candidate.created_at else None
-            }
-            
-            if include_resume_text:
-                data["resume_text"] = candidate.resume_text
-            
-            export_data.append(data)
-        
-        return {
-            "format": format,
-            "count": len(export_data),
-            "exported_at": datetime.utcnow().isoformat(),
-            "data": export_data
-        }
-        
-    except Exception as e:
-        logger.error(f"Export failed: {str(e)}")
+    """Stream candidate data as JSON, NDJSON, CSV or Parquet, one page of rows at a time"""
+    format = format.lower()
+    if format not in EXPORT_FORMATS:
         raise HTTPException(
-            status_code=500,
-            detail="Export operation failed"
+            status_code=400,
+            detail=f"Unsupported export format: {format}. Supported: {', '.join(EXPORT_FORMATS)}"
         )
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow (pip install pyarrow)")
+    
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f"candidates_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    return StreamingResponse(
+        stream_export(format, include_resume_text),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+def load_candidate(candidate_id: int) -> Optional[Candidate]:
+    """A detached Candidate row, for handlers that read it off the event loop"""
+    db = SessionLocal()
+    try:
+        return db.query(Candidate).filter(Candidate.id == candidate_id).first()
+    finally:
+        db.close()
+
+def save_reparsed_candidate(
+    candidate_id: int,
+    parsed_data: dict,
+    overall_score: int,
+    job_description: str,
+    new_embedding: Optional[np.ndarray] = None
+) -> Optional[Candidate]:
+    """Write a reparse result (skills links and stats delta included) in one transaction; None if the candidate is gone"""
+    db = SessionLocal(expire_on_commit=False)
+    try:
+        candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
+        if not candidate:
+            return None
+        before = candidate_contribution(candidate)
+        for field, value in reparsed_fields(candidate, parsed_data, overall_score, job_description).items():
+            setattr(candidate, field, value)
+        if new_embedding is not None:
+            candidate.resume_embedding = embedding_to_blob(new_embedding)
+            candidate.embedding_model = MODEL_NAME
+        sync_candidate_skills(db, [candidate])
+        apply_stats_delta(db, added=[candidate_contribution(candidate)], removed=[before])
+        db.commit()
+        db.refresh(candidate)
+        return candidate
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
 
 @router.post("/reparse/{candidate_id}")
 async def reparse_candidate(
     candidate_id: int,
-    job_description: Optional[str] = Form(""),
-    db: Session = Depends(get_db)
+    job_description: Optional[str] = Form("")
 ):
     """Reparse existing candidate with updated algorithms"""
-    candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
+    candidate = await asyncio.to_thread(load_candidate, candidate_id)
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
     try:
-        # Reparse using enhanced parser
-        parsed_data = enhanced_parser.parse_text(candidate.resume_text, job_description)
+        # Reparse using enhanced parser on the parsing executor
+        job_description = job_description or ""
+        text = candidate.resume_text or ""
+        parsed_data, overall_score = await run_off_loop(parse_resume_text, text, job_description)
         
-        # Validate and clean data
-        parsed_data = validate_candidate_data(parsed_data)
+        # Semantic match score as at upload, from the stored resume vector when it is current
+        embedding = stored_embedding(candidate)
+        outcome = {"ok": True, "text": text, "parsed_data": parsed_data, "overall_score": overall_score}
+        await add_resume_embedding(outcome, content_hash(text.encode("utf-8")), job_description, embedding)
+        new_embedding = outcome.get("embedding") if embedding is None else None
         
-        # Calculate new overall score
-        overall_score = calculate_overall_score(parsed_data)
-        
-        # Update candidate
-        candidate.name = parsed_data.get("name") or candidate.name
-        candidate.email = parsed_data.get("email") or candidate.email
-        candidate.phone = parsed_data.get("phone") or candidate.phone
-        candidate.skills = json.dumps(parsed_data.get("skills", []))
-        candidate.experience_years = parsed_data.get("experience_years", 0)
-        candidate.education = parsed_data.get("education", "")
-        candidate.match_score = parsed_data.get("match_score", 0)
-        
-        # Update AI metadata
-        if candidate.ai_metadata:
-            candidate.ai_metadata.update({
-                "reparsed_at": datetime.utcnow().isoformat(),
-                "overall_score": overall_score,
-                "parsing_confidence": parsed_data.get("confidence", 0.5)
-            })
-        
-        db.commit()
-        db.refresh(candidate)
-        
-        candidate_data = {
-            "id": candidate.id,
-            "name": candidate.name,
-            "email": candidate.email,
-            "phone": candidate.phone,
-            "resume_text": candidate.resume_text,
-            "skills": json.loads(candidate.skills) if candidate.skills else [],
-            "experience_years": candidate.experience_years,
-            "education": candidate.education,
-            "ai_metadata": candidate.ai_metadata,
-            "match_score": candidate.match_score,
-            "created_at": candidate.created_at
-        }
+        # Update candidate and AI metadata
+        candidate = await asyncio.to_thread(
+            save_reparsed_candidate, candidate_id, parsed_data, outcome["overall_score"], job_description, new_embedding
+        )
+        if not candidate:
+            raise HTTPException(status_code=404, detail="Candidate not found")
+        if new_embedding is not None:
+            index_embedding(candidate.id, new_embedding)
         
-        return CandidateResponse(**candidate_data)
+        return candidate_to_response(candidate)
         
+    except HTTPException as he:
+        raise he
     except Exception as e:
-        db.rollback()
         logger.error(f"Reparse failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Reparse failed: {str(e)}")
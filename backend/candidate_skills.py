@@ -0,0 +1,134 @@
+import json
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import false, func, select
+from sqlalchemy.orm import Query, Session
+
+from database import Candidate, CandidateSkill, Skill, upsert_insert
+
+def normalize_skill(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+def parse_skills_filter(value: Optional[str]) -> List[str]:
+    """'Python, Go' -> ['python', 'go'] (order kept, duplicates dropped)"""
+    if not value:
+        return []
+    return list(dict.fromkeys(normalize_skill(part) for part in value.split(",") if part.strip()))
+
+def get_or_create_skill_ids(db: Session, names: Iterable[str]) -> Dict[str, int]:
+    """
+    Map display names to skill ids, inserting unknown skills. The insert skips names
+    another writer added concurrently (ON CONFLICT DO NOTHING), then the ids are read back.
+    """
+    by_key: Dict[str, str] = {}
+    for name in names:
+        if name and name.strip():
+            by_key.setdefault(normalize_skill(name)[:100], name.strip()[:100])
+    if not by_key:
+        return {}
+
+    def lookup(keys: List[str]) -> Dict[str, int]:
+        return {
+            normalized_name: skill_id
+            for skill_id, normalized_name in db.query(Skill.id, Skill.normalized_name).filter(Skill.normalized_name.in_(keys))
+        }
+
+    skill_ids = lookup(list(by_key))
+    missing = sorted(key for key in by_key if key not in skill_ids)
+    if missing:
+        db.execute(
+            upsert_insert(db, Skill)
+            .values([{"name": by_key[key], "normalized_name": key} for key in missing])
+            .on_conflict_do_nothing(index_elements=[Skill.normalized_name])
+        )
+        skill_ids.update(lookup(missing))
+    return skill_ids
+
+def sync_candidate_skills(db: Session, candidates: Iterable[Candidate]):
+    """
+    Rewrite the candidate_skills rows of the given (flushed) candidates from their
+    skills JSON. Does not commit, so it joins the caller's transaction.
+    """
+    skills_by_candidate = {
+        candidate.id: json.loads(candidate.skills) if candidate.skills else []
+        for candidate in candidates
+    }
+    if not skills_by_candidate:
+        return
+
+    skill_ids = get_or_create_skill_ids(db, (name for names in skills_by_candidate.values() for name in names))
+    db.query(CandidateSkill).filter(
+        CandidateSkill.candidate_id.in_(list(skills_by_candidate))
+    ).delete(synchronize_session=False)
+
+    links = []
+    for candidate_id, names in skills_by_candidate.items():
+        ids = {skill_ids[normalize_skill(name)[:100]] for name in names if name and name.strip()}
+        links.extend({"candidate_id": candidate_id, "skill_id": skill_id} for skill_id in ids)
+    if links:
+        db.execute(CandidateSkill.__table__.insert(), links)
+
+def delete_candidate_skills(db: Session, candidate_ids: Optional[List[int]] = None):
+    """Drop association rows for deleted candidates (all rows when candidate_ids is None)"""
+    query = db.query(CandidateSkill)
+    if candidate_ids is not None:
+        query = query.filter(CandidateSkill.candidate_id.in_(candidate_ids))
+    query.delete(synchronize_session=False)
+
+def filter_by_skills(query: Query, db: Session, skills: List[str], mode: str = "any") -> Query:
+    """
+    Restrict a Candidate query to candidates with any (OR) or all (AND) of the
+    given normalized skill names, using the skill -> candidate index.
+    """
+    if not skills:
+        return query
+    skill_ids = [skill_id for (skill_id,) in db.query(Skill.id).filter(Skill.normalized_name.in_(skills))]
+    if mode == "all" and len(skill_ids) < len(skills):
+        return query.filter(false())  # An unknown skill can never be matched
+    if not skill_ids:
+        return query.filter(false())
+
+    matching = select(CandidateSkill.candidate_id).where(CandidateSkill.skill_id.in_(skill_ids))
+    if mode == "all":
+        matching = matching.group_by(CandidateSkill.candidate_id).having(
+            func.count(CandidateSkill.skill_id) == len(skill_ids)
+        )
+    else:
+        matching = matching.distinct()
+    return query.filter(Candidate.id.in_(matching))
+
+def candidates_with_skill(name: str):
+    """Subquery of candidate ids that have exactly this skill (case-insensitive)"""
+    return (
+        select(CandidateSkill.candidate_id)
+        .join(Skill, Skill.id == CandidateSkill.skill_id)
+        .where(Skill.normalized_name == normalize_skill(name))
+    )
+
+def backfill_candidate_skills(db: Session, batch_size: int = 500) -> int:
+    """Populate skills/candidate_skills from every candidate's skills JSON; returns candidates processed"""
+    processed = 0
+    last_id = 0
+    while True:
+        batch = (
+            db.query(Candidate)
+            .filter(Candidate.id > last_id)
+            .order_by(Candidate.id.asc())
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        sync_candidate_skills(db, batch)
+        db.commit()
+        processed += len(batch)
+        last_id = batch[-1].id
+    return processed
+
+def ensure_candidate_skills(db: Session) -> int:
+    """Backfill once when the tables are new but candidates already exist (databases created by init_db)"""
+    if db.query(CandidateSkill.candidate_id).first() is not None:
+        return 0
+    if db.query(Candidate.id).filter(Candidate.skills.isnot(None), Candidate.skills != "[]").first() is None:
+        return 0
+    return backfill_candidate_skills(db)
@@ -0,0 +1,110 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import logging
+import random
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from ai_processing import batch_scoring
+from ai_processing.batch_scoring import batch_match_scores, batch_overall_scores, columns_from_candidates
+from ai_processing.resume_parser import enhanced_parser
+from candidate_router import calculate_overall_score
+from database import Candidate, SessionLocal
+
+logging.basicConfig(level=logging.WARNING)
+
+NAMES = ["", "Unknown Candidate", "Cher", "Ada Lovelace", "Mary Ann Evans", "Jean Claude Van Damme", "A B C D E F"]
+EDUCATIONS = [
+    None, "", "   ", "BSc", "Bachelor of Science in Physics", "MBA, Wharton School", "PhD in Chemistry",
+    "State University", "High School Diploma 2010", "Bootcamp graduate, 2021", "Master of Arts"
+]
+SKILLS = [f"Skill {i}" for i in range(30)]
+# Contains 1/15, 2/15, ... and scores that put the overall score on an exact .5 before rounding
+EXPERIENCE = [0, 0.5, 1, 2.5, 3, 4.75, 5, 7, 8, 9.5, 10, 12, 15, 22]
+MATCH_SCORES = [0.0, 0.1, 0.2, 0.35, 0.5, 0.62, 0.75, 0.9, 0.95]
+
+def random_candidates(count: int, rng: random.Random) -> List[Dict]:
+    candidates = []
+    for _ in range(count):
+        name = rng.choice(NAMES)
+        candidates.append({
+            "name": name,
+            "email": rng.choice([None, "", f"{name.split()[0].lower() if name else 'x'}{rng.randint(0, 999)}@example.com"]),
+            "phone": rng.choice([None, "", "+1 415 555 0102"]),
+            "skills": rng.sample(SKILLS, rng.randint(0, len(SKILLS))),
+            "experience_years": rng.choice(EXPERIENCE + [round(rng.uniform(0, 25), 1)]),
+            "education": rng.choice(EDUCATIONS),
+            "match_score": rng.choice(MATCH_SCORES + [rng.random()])
+        })
+    return candidates
+
+def stored_candidates(limit: int = 5000) -> List[Dict]:
+    db = SessionLocal()
+    try:
+        rows = db.query(
+            Candidate.name, Candidate.email, Candidate.phone, Candidate.skills,
+            Candidate.experience_years, Candidate.education, Candidate.match_score
+        ).limit(limit).all()
+        return [row._asdict() for row in rows]
+    finally:
+        db.close()
+
+def compare(label: str, candidates: List[Dict]) -> int:
+    """Scalar and batch scores for the same candidates; returns the number of mismatches"""
+    scalar_inputs = [
+        {**candidate, "skills": batch_scoring._skills(candidate),
+         "experience_years": candidate.get("experience_years") or 0, "match_score": candidate.get("match_score") or 0.0}
+        for candidate in candidates
+    ]
+
+    started = time.perf_counter()
+    scalar_match = [enhanced_parser.calculate_enhanced_match_score(candidate) for candidate in scalar_inputs]
+    scalar_overall = [calculate_overall_score(candidate) for candidate in scalar_inputs]
+    scalar_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    columns = columns_from_candidates(candidates)
+    match_scores = batch_match_scores(columns)
+    overall_scores = batch_overall_scores(columns)
+    batch_seconds = time.perf_counter() - started
+
+    mismatches = int(np.count_nonzero(match_scores != np.asarray(scalar_match)))
+    mismatches += int(np.count_nonzero(overall_scores != np.asarray(scalar_overall)))
+    status = "✅" if not mismatches else "❌"
+    print(
+        f"{status} {label}: {len(candidates)} candidates, {mismatches} mismatches "
+        f"(scalar {scalar_seconds * 1000:.1f}ms, batch {batch_seconds * 1000:.1f}ms)"
+    )
+    return mismatches
+
+def check_batch_scoring(count: int = 20000) -> int:
+    """Batch scores must equal the scalar ones exactly, with the jitter on and off"""
+    failures = 0
+    rng = random.Random(20)
+    candidates = random_candidates(count, rng)
+    stored = stored_candidates()
+    amplitude = batch_scoring.JITTER_AMPLITUDE
+    try:
+        for jitter in (amplitude, 0.0):
+            batch_scoring.JITTER_AMPLITUDE = jitter
+            failures += compare(f"random, jitter {jitter}", candidates)
+            if stored:
+                failures += compare(f"stored, jitter {jitter}", stored)
+    finally:
+        batch_scoring.JITTER_AMPLITUDE = amplitude
+
+    # Same candidate, same seed: same score; title-casing the name does not move it
+    candidate = {"name": "ada lovelace", "email": "ada@example.com", "skills": ["Python"]}
+    first = enhanced_parser.calculate_enhanced_match_score(candidate)
+    second = enhanced_parser.calculate_enhanced_match_score({**candidate, "name": "Ada Lovelace"})
+    if first != second:
+        failures += 1
+        print(f"❌ Jitter changed between runs: {first} != {second}")
+    return failures
+
+if __name__ == "__main__":
+    sys.exit(1 if check_batch_scoring() else 0)
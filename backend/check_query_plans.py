@@ -0,0 +1,145 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import logging
+import re
+from typing import List, Tuple
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from database import SessionLocal, engine, get_async_engine, init_db
+from search_index import ensure_search_index
+from export_service import iter_candidate_pages
+from ingestion_jobs import queued_jobs_query
+from pagination import SORT_COLUMNS
+
+logging.basicConfig(level=logging.WARNING)
+
+# "SCAN candidates" with no index: every row is read. Index-order walks ("SCAN ... USING INDEX")
+# stop at the LIMIT, and SEARCH plans seek, so only bare scans count as regressions.
+FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+# Tables that are read whole on purpose
+ALLOWED_FULL_SCANS = {
+    "stats_counters": "a few dozen materialized counters, read in one go by /stats",
+    "reparse_runs": "one row per bulk reparse run",
+}
+
+LIST_FILTERS = [
+    {},
+    {"min_experience": 3},
+    {"min_experience": 2, "max_experience": 8},
+    {"min_match_score": 0.7},
+    {"skills_filter": "Python,Excel"},
+    {"skills_filter": "Python,Excel", "skills_mode": "all"},
+]
+
+SEARCHES = [
+    {"query": "python"},
+    {"query": "project manag*", "sort_by": "created_at"},
+    {"query": '"customer service"', "filters": {"min_experience": 2}},
+    {"query": "excel", "filters": {"skills": ["Excel"], "min_match_score": 0.5}},
+    {"filters": {"min_experience": 5}},
+    {"filters": {"skills": ["Python", "Sql"], "skills_mode": "all"}, "sort_by": "created_at", "order": "asc"},
+]
+
+class StatementRecorder:
+    """Collects every SELECT the API sends while a labelled request runs"""
+
+    def __init__(self):
+        self.label = ""
+        self.statements: List[Tuple[str, str, tuple]] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            self.statements.append((self.label, statement, tuple(parameters or ())))
+
+def run_router_queries(recorder: StatementRecorder):
+    client = TestClient(__import__("main").app)  # No lifespan: background workers stay off
+
+    def call(label: str, method: str, path: str, **kwargs):
+        recorder.label = label
+        response = client.request(method, path, **kwargs)
+        if response.status_code >= 500:
+            raise RuntimeError(f"{label} returned {response.status_code}: {response.text[:200]}")
+        return response
+
+    for sort_by in SORT_COLUMNS:
+        for order in ("desc", "asc"):
+            for filters in LIST_FILTERS:
+                params = {"sort_by": sort_by, "order": order, "limit": 5, "view": "summary", **filters}
+                label = "GET /candidates/ " + " ".join(f"{name}={value}" for name, value in params.items())
+                response = call(label, "GET", "/api/v1/candidates/", params=params)
+                cursor = response.headers.get("X-Next-Cursor")
+                if cursor:
+                    call(label + " (next page)", "GET", "/api/v1/candidates/", params={**params, "cursor": cursor})
+    call("GET /candidates/ skip=10", "GET", "/api/v1/candidates/", params={"skip": 10, "limit": 5})
+    call("GET /candidates/ anonymized=true", "GET", "/api/v1/candidates/", params={"anonymized": "true", "limit": 5})
+
+    for body in SEARCHES:
+        call(f"POST /search {body}", "POST", "/api/v1/search", json=body, params={"limit": 10})
+
+    call("GET /candidates/{id}", "GET", "/api/v1/candidates/1")
+    call("GET /stats", "GET", "/api/v1/stats")
+    call("GET /health", "GET", "/api/v1/health")
+    call("GET /jobs/{id}", "GET", "/api/v1/jobs/00000000-0000-0000-0000-000000000000")
+    call("GET /reparse-runs", "GET", "/api/v1/reparse-runs")
+
+    recorder.label = "export page"
+    next(iter_candidate_pages(page_size=5), None)
+    recorder.label = "ingestion queue startup"
+    db = SessionLocal()
+    try:
+        queued_jobs_query(db).all()
+    finally:
+        db.close()
+
+def check_query_plans() -> int:
+    """EXPLAIN QUERY PLAN every captured statement; returns the number of regressions"""
+    if engine.dialect.name != "sqlite":
+        print("EXPLAIN QUERY PLAN checks need a SQLite DATABASE_URL")
+        return 0
+    init_db()
+    ensure_search_index(engine)
+
+    recorder = StatementRecorder()
+    event.listen(engine, "before_cursor_execute", recorder)
+    event.listen(get_async_engine().sync_engine, "before_cursor_execute", recorder)
+    try:
+        run_router_queries(recorder)
+    finally:
+        event.remove(engine, "before_cursor_execute", recorder)
+        event.remove(get_async_engine().sync_engine, "before_cursor_execute", recorder)
+
+    failures = 0
+    seen = set()
+    with engine.connect() as connection:
+        for label, statement, parameters in recorder.statements:
+            if (statement, parameters) in seen:
+                continue
+            if " WHERE 0 = 1" in statement:
+                continue  # Constant-false filter (unknown skill): SQLite returns before reading a row
+            seen.add((statement, parameters))
+            plan = [row[3] for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+            scans = [
+                match.group(1) for match in map(FULL_SCAN.match, plan)
+                if match and match.group(1) not in ALLOWED_FULL_SCANS
+            ]
+            if scans:
+                failures += 1
+                print(f"❌ {label}: full scan of {', '.join(scans)}")
+                print(f"   {' '.join(statement.split())}")
+                for line in plan:
+                    print(f"   | {line}")
+
+    print(f"Checked {len(seen)} distinct statements from {len({label for label, _, _ in recorder.statements})} requests")
+    if failures:
+        print(f"❌ {failures} statements regressed to a full table scan")
+    else:
+        print("✅ No full table scans")
+    return failures
+
+if __name__ == "__main__":
+    sys.exit(1 if check_query_plans() else 0)
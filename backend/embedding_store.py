@@ -0,0 +1,115 @@
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from database import Candidate
+from ai_processing.matching_service import MODEL_NAME, blob_to_embedding
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingStore:
+    """
+    In-memory matrix of every candidate's resume embedding.
+
+    Rows live in one preallocated float32 matrix that grows by doubling, with an
+    id -> row map. Adds append, deletes move the last row into the hole, so
+    uploads and deletes stay O(1) and ranking is one matrix-vector product.
+    The matrix is loaded lazily from the resume_embedding column on first use.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._matrix: Optional[np.ndarray] = None
+        self._ids = np.empty(0, dtype=np.int64)
+        self._rows: Dict[int, int] = {}
+        self._size = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def ensure_loaded(self, db: Session):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            rows = (
+                db.query(Candidate.id, Candidate.resume_embedding)
+                .filter(Candidate.resume_embedding.isnot(None), Candidate.embedding_model == MODEL_NAME)
+                .yield_per(1000)
+            )
+            for candidate_id, blob in rows:
+                self._add_locked(candidate_id, blob_to_embedding(blob))
+            self._loaded = True
+            logger.info(f"Loaded {self._size} resume embeddings")
+
+    def _add_locked(self, candidate_id: int, embedding: np.ndarray):
+        if self._matrix is None:
+            self._matrix = np.zeros((1024, embedding.shape[0]), dtype=np.float32)
+            self._ids = np.zeros(1024, dtype=np.int64)
+        if embedding.shape[0] != self._matrix.shape[1]:
+            logger.warning(f"Skipping embedding for candidate {candidate_id}: dimension {embedding.shape[0]}")
+            return
+
+        row = self._rows.get(candidate_id)
+        if row is None:
+            if self._size == self._matrix.shape[0]:
+                self._matrix = np.concatenate([self._matrix, np.zeros_like(self._matrix)])
+                self._ids = np.concatenate([self._ids, np.zeros_like(self._ids)])
+            row = self._size
+            self._size += 1
+            self._rows[candidate_id] = row
+            self._ids[row] = candidate_id
+        self._matrix[row] = embedding
+
+    def add(self, candidate_id: int, embedding: np.ndarray):
+        """Add or replace a candidate's vector (no-op until the store has been loaded)"""
+        with self._lock:
+            if self._loaded:
+                self._add_locked(candidate_id, np.asarray(embedding, dtype=np.float32))
+
+    def remove(self, candidate_ids: Iterable[int]):
+        with self._lock:
+            for candidate_id in candidate_ids:
+                row = self._rows.pop(candidate_id, None)
+                if row is None:
+                    continue
+                last = self._size - 1
+                if row != last:
+                    moved_id = int(self._ids[last])
+                    self._matrix[row] = self._matrix[last]
+                    self._ids[row] = moved_id
+                    self._rows[moved_id] = row
+                self._size -= 1
+
+    def clear(self):
+        with self._lock:
+            self._matrix = None
+            self._ids = np.empty(0, dtype=np.int64)
+            self._rows = {}
+            self._size = 0
+
+    def scores(self, query: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Cosine similarity of every stored resume to the query: (candidate ids, similarities)"""
+        with self._lock:
+            if self._size == 0:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            return self._ids[:self._size].copy(), self._matrix[:self._size] @ query
+
+    def top_k(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """The k most similar candidates as (candidate id, cosine similarity), best first"""
+        ids, similarities = self.scores(query)
+        if len(ids) == 0 or k <= 0:
+            return []
+        k = min(k, len(ids))
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top])]
+        return [(int(ids[i]), float(similarities[i])) for i in top]
+
+# Shared store for the API process
+embedding_store = EmbeddingStore()
@@ -0,0 +1,170 @@
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Iterator, List
+
+from database import Candidate, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+EXPORT_PAGE_SIZE = 500
+
+EXPORT_FORMATS = {
+    "json": ("application/json", "json"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+_BASE_COLUMNS = [
+    Candidate.id, Candidate.name, Candidate.email, Candidate.phone, Candidate.skills,
+    Candidate.experience_years, Candidate.education, Candidate.match_score, Candidate.created_at
+]
+
+def iter_candidate_pages(include_resume_text: bool = False, page_size: int = EXPORT_PAGE_SIZE) -> Iterator[List[Dict]]:
+    """
+    Yield export rows page by page using keyset pagination on the primary key.
+    Only the exported columns are selected, and the generator owns its session
+    because a StreamingResponse outlives the request's dependencies.
+    """
+    columns = _BASE_COLUMNS + ([Candidate.resume_text] if include_resume_text else [])
+    db = SessionLocal()
+    try:
+        last_id = 0
+        while True:
+            rows = (
+                db.query(*columns)
+                .filter(Candidate.id > last_id)
+                .order_by(Candidate.id.asc())
+                .limit(page_size)
+                .all()
+            )
+            if not rows:
+                break
+            page = []
+            for row in rows:
+                data = {
+                    "id": row.id,
+                    "name": row.name,
+                    "email": row.email,
+                    "phone": row.phone,
+                    "skills": json.loads(row.skills) if row.skills else [],
+                    "experience_years": row.experience_years,
+                    "education": row.education,
+                    "match_score": row.match_score,
+                    "created_at": row.created_at.isoformat() if row.created_at else None
+                }
+                if include_resume_text:
+                    data["resume_text"] = row.resume_text
+                page.append(data)
+            yield page
+            last_id = rows[-1].id
+            db.expunge_all()
+    finally:
+        db.close()
+
+def export_json(pages: Iterator[List[Dict]]) -> Iterator[bytes]:
+    """The legacy {"format", "exported_at", "data", "count"} envelope, streamed"""
+    yield f'{{"format": "json", "exported_at": "{datetime.utcnow().isoformat()}", "data": ['.encode("utf-8")
+    count = 0
+    for page in pages:
+        chunk = ",".join(json.dumps(row) for row in page)
+        yield (("," if count else "") + chunk).encode("utf-8")
+        count += len(page)
+    # The count is only known at the end, so it follows the data
+    yield f'], "count": {count}}}'.encode("utf-8")
+
+def export_ndjson(pages: Iterator[List[Dict]]) -> Iterator[bytes]:
+    for page in pages:
+        yield "".join(json.dumps(row) + "\n" for row in page).encode("utf-8")
+
+def export_csv(pages: Iterator[List[Dict]], include_resume_text: bool = False) -> Iterator[bytes]:
+    fieldnames = ["id", "name", "email", "phone", "skills", "experience_years", "education", "match_score", "created_at"]
+    if include_resume_text:
+        fieldnames.append("resume_text")
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+    writer.writeheader()
+    for page in pages:
+        for row in page:
+            writer.writerow(dict(row, skills="; ".join(row["skills"])))
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to the streaming generator"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def export_parquet(pages: Iterator[List[Dict]], include_resume_text: bool = False, compression: str = "zstd") -> Iterator[bytes]:
+    """Columnar export: one Parquet row group per page, flushed as it is written"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    fields = [
+        pa.field("id", pa.int64()),
+        pa.field("name", pa.string()),
+        pa.field("email", pa.string()),
+        pa.field("phone", pa.string()),
+        pa.field("skills", pa.list_(pa.string())),
+        pa.field("experience_years", pa.int32()),
+        pa.field("education", pa.string()),
+        pa.field("match_score", pa.float64()),
+        pa.field("created_at", pa.string()),
+    ]
+    if include_resume_text:
+        fields.append(pa.field("resume_text", pa.string()))
+    schema = pa.schema(fields)
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression=compression)
+    try:
+        for page in pages:
+            writer.write_table(pa.Table.from_pylist(page, schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+def stream_export(format: str, include_resume_text: bool = False) -> Iterator[bytes]:
+    pages = iter_candidate_pages(include_resume_text)
+    if format == "csv":
+        return export_csv(pages, include_resume_text)
+    if format == "ndjson":
+        return export_ndjson(pages)
+    if format == "parquet":
+        return export_parquet(pages, include_resume_text)
+    return export_json(pages)
@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from database import Candidate, IngestionJob, SessionLocal
+from candidate_router import parse_upload, insert_candidate_record
+from parse_cache import content_hash
+from job_leases import LEASE_SECONDS, WORKER_ID, Lease, claim, held_lease, requeue_expired
+
+logger = logging.getLogger(__name__)
+
+def queued_jobs_query(db: Session):
+    """Ids of queued jobs, oldest first (served by ix_ingestion_jobs_status_created_at)"""
+    return (
+        db.query(IngestionJob.id)
+        .filter(IngestionJob.status == "queued")
+        .order_by(IngestionJob.created_at.asc())
+    )
+
+class IngestionJobQueue:
+    """
+    Persistent resume ingestion queue.
+
+    Jobs are stored in the ingestion_jobs table together with the uploaded bytes,
+    so queued or interrupted work is picked up again after a restart. A fixed
+    number of asyncio workers pull job ids from an in-memory queue and hand the
+    CPU-bound parsing to the shared parsing executor.
+
+    Several API processes can share the table: a job is claimed with a conditional
+    UPDATE and leased to the claiming process, which renews the lease while it
+    works. Only jobs whose lease expired (their process died) are requeued.
+    """
+
+    def __init__(self, workers: int = 2, max_attempts: int = 3):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._reaper: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> "IngestionJobQueue":
+        return cls(
+            workers=int(os.getenv("INGESTION_WORKERS", "2")),
+            max_attempts=int(os.getenv("INGESTION_MAX_ATTEMPTS", "3"))
+        )
+
+    async def start(self):
+        """Requeue unfinished jobs from the database and start the workers"""
+        self._queue = asyncio.Queue()
+        db = SessionLocal()
+        try:
+            # Jobs left running by a process that stopped renewing their lease were interrupted
+            requeue_expired(db, IngestionJob)
+
+            pending = queued_jobs_query(db).all()
+            for (job_id,) in pending:
+                self._queue.put_nowait(job_id)
+            if pending:
+                logger.info(f"Requeued {len(pending)} unfinished ingestion jobs")
+        finally:
+            db.close()
+
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._reaper = asyncio.create_task(self._requeue_abandoned())
+        logger.info(f"Started {self.workers} ingestion workers")
+
+    async def stop(self):
+        tasks = self._tasks + ([self._reaper] if self._reaper else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._reaper = None
+
+    async def _requeue_abandoned(self):
+        """Pick up jobs of other processes that died while running them"""
+        while True:
+            await asyncio.sleep(LEASE_SECONDS)
+            try:
+                job_ids = await asyncio.to_thread(self._expired_jobs)
+            except Exception as e:
+                logger.error(f"Requeueing abandoned ingestion jobs failed: {str(e)}", exc_info=True)
+                continue
+            for job_id in job_ids:
+                self._queue.put_nowait(job_id)
+            if job_ids:
+                logger.warning(f"Requeued {len(job_ids)} ingestion jobs with an expired lease")
+
+    def _expired_jobs(self) -> List[str]:
+        db = SessionLocal()
+        try:
+            return requeue_expired(db, IngestionJob)
+        finally:
+            db.close()
+
+    async def submit(self, content: bytes, filename: str, job_description: str = "") -> tuple:
+        """
+        Persist a new job (off the event loop) and queue it. Returns (job, deduplicated):
+        resubmitting the same file and job description returns the existing job unless
+        it failed or completed into a candidate that has since been deleted.
+        """
+        if self._queue is None:
+            raise RuntimeError("Ingestion queue is not running")
+
+        job, deduplicated = await asyncio.to_thread(self._store, content, filename, job_description)
+        if not deduplicated:
+            self._queue.put_nowait(job.id)
+        return job, deduplicated
+
+    def _store(self, content: bytes, filename: str, job_description: str) -> tuple:
+        db = SessionLocal()
+        try:
+            return self._find_or_create(db, content, filename, job_description)
+        finally:
+            db.close()
+
+    def _find_or_create(self, db: Session, content: bytes, filename: str, job_description: str) -> tuple:
+        file_hash = content_hash(content)
+        existing = (
+            db.query(IngestionJob)
+            .filter(
+                IngestionJob.content_hash == file_hash,
+                IngestionJob.job_description == job_description,
+                IngestionJob.status != "failed",
+                or_(
+                    IngestionJob.status != "completed",
+                    db.query(Candidate.id).filter(Candidate.id == IngestionJob.candidate_id).exists()
+                )
+            )
+            .order_by(IngestionJob.created_at.desc())
+            .first()
+        )
+        if existing:
+            return existing, True
+
+        job = IngestionJob(
+            id=str(uuid.uuid4()),
+            status="queued",
+            filename=filename,
+            file_size=len(content),
+            content=content,
+            content_hash=file_hash,
+            job_description=job_description,
+            created_at=datetime.utcnow()
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job, False
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _worker(self, worker_id: int):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._process(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ingestion worker {worker_id} failed on job {job_id}: {str(e)}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job_id: str):
+        db = SessionLocal()
+        try:
+            # Another process (or a duplicate queue entry) may have claimed the job already
+            claimed = claim(db, IngestionJob, job_id, {
+                IngestionJob.attempts: func.coalesce(IngestionJob.attempts, 0) + 1,
+                IngestionJob.started_at: datetime.utcnow()
+            })
+            if not claimed:
+                return
+            job = db.query(IngestionJob).filter(IngestionJob.id == job_id).first()
+
+            try:
+                async with held_lease(IngestionJob, job_id) as lease:
+                    candidate = await self._ingest(job, lease)
+                if candidate is None:
+                    logger.warning(f"Ingestion job {job.id} was taken over by another process, dropping this attempt")
+                elif self._finish(db, job.id, "completed", candidate_id=candidate.id):
+                    logger.info(f"Ingestion job {job.id} created candidate {candidate.id}")
+                else:
+                    logger.warning(f"Ingestion job {job.id} was taken over while candidate {candidate.id} was being inserted")
+            except HTTPException as he:
+                # Parse and validation errors are permanent, retrying would give the same result
+                db.rollback()
+                self._finish(db, job.id, "failed", error=str(he.detail))
+            except Exception as e:
+                db.rollback()
+                if job.attempts < self.max_attempts:
+                    requeued = db.query(IngestionJob).filter(
+                        IngestionJob.id == job.id, IngestionJob.owner == WORKER_ID
+                    ).update(
+                        {IngestionJob.status: "queued", IngestionJob.owner: None, IngestionJob.lease_until: None,
+                         IngestionJob.error: str(e)},
+                        synchronize_session=False
+                    )
+                    db.commit()
+                    if requeued:
+                        self._queue.put_nowait(job.id)
+                        logger.warning(f"Ingestion job {job.id} attempt {job.attempts} failed, retrying: {str(e)}")
+                else:
+                    self._finish(db, job.id, "failed", error=str(e))
+        finally:
+            db.close()
+
+    async def _ingest(self, job: IngestionJob, lease: Lease):
+        """The new candidate, or None if the job's lease was lost before it could be inserted"""
+        outcome = await parse_upload(job.content, job.filename, job.job_description, wait_for_slot=True)
+        if not outcome["ok"]:
+            raise HTTPException(status_code=outcome["status_code"], detail=outcome["error"])
+        if not await lease.confirm():
+            return None
+
+        return await insert_candidate_record(
+            outcome["text"],
+            outcome["parsed_data"],
+            outcome["overall_score"],
+            job.filename,
+            job.file_size,
+            job.job_description,
+            outcome.get("embedding")
+        )
+
+    def _finish(self, db: Session, job_id: str, status: str, candidate_id: Optional[int] = None, error: Optional[str] = None) -> bool:
+        """Record the job's outcome with one conditional UPDATE; False if another process holds the job now"""
+        finished = db.query(IngestionJob).filter(IngestionJob.id == job_id, IngestionJob.owner == WORKER_ID).update({
+            IngestionJob.status: status,
+            IngestionJob.candidate_id: candidate_id,
+            IngestionJob.error: error,
+            IngestionJob.owner: None,
+            IngestionJob.lease_until: None,
+            IngestionJob.content: None,  # The candidate row keeps the text, drop the raw upload
+            IngestionJob.finished_at: datetime.utcnow()
+        }, synchronize_session=False)
+        db.commit()
+        return finished == 1
+
+# Shared queue started from the main.py lifespan hook
+ingestion_queue = IngestionJobQueue.from_env()
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Identifies this process in the owner column of the rows it has claimed
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# A claimed row whose lease is not renewed within this many seconds is considered
+# abandoned (its process crashed or was restarted) and may be requeued
+LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "120"))
+
+def lease_expiry() -> datetime:
+    return datetime.utcnow() + timedelta(seconds=LEASE_SECONDS)
+
+def claim(db: Session, model, row_id: str, values: Optional[dict] = None) -> bool:
+    """
+    Move a queued row (IngestionJob, ReparseRun) to running under this process's
+    lease with one conditional UPDATE; False when another process claimed it first.
+    """
+    claimed = db.query(model).filter(model.id == row_id, model.status == "queued").update(
+        {model.status: "running", model.owner: WORKER_ID, model.lease_until: lease_expiry(), **(values or {})},
+        synchronize_session=False
+    )
+    db.commit()
+    return claimed == 1
+
+def requeue_expired(db: Session, model) -> List[str]:
+    """Put running rows whose lease has expired back in the queue; returns their ids"""
+    expired = or_(model.lease_until.is_(None), model.lease_until < datetime.utcnow())
+    row_ids = [row_id for (row_id,) in db.query(model.id).filter(model.status == "running", expired)]
+    if not row_ids:
+        return []
+    db.query(model).filter(model.id.in_(row_ids), model.status == "running", expired).update(
+        {model.status: "queued", model.owner: None, model.lease_until: None}, synchronize_session=False
+    )
+    db.commit()
+    return row_ids
+
+def renew(model, row_id: str) -> bool:
+    """
+    Extend this process's lease on a row; False if it is no longer ours (finished,
+    or requeued after the lease expired and possibly claimed by another process).
+    A paused row keeps its owner, so it stays ours.
+    """
+    db = SessionLocal()
+    try:
+        renewed = db.query(model).filter(model.id == row_id, model.owner == WORKER_ID).update(
+            {model.lease_until: lease_expiry()}, synchronize_session=False
+        )
+        db.commit()
+        return renewed == 1
+    finally:
+        db.close()
+
+class Lease:
+    """This process's lease on a claimed row; lost once another process may have taken the row over"""
+
+    def __init__(self, model, row_id: str):
+        self.model = model
+        self.row_id = row_id
+        self.lost = False
+
+    async def confirm(self) -> bool:
+        """Renew the lease now; False (for good) if the row is no longer ours and its work must not be written"""
+        if not self.lost and not await asyncio.to_thread(renew, self.model, self.row_id):
+            self.lost = True
+            logger.warning(f"Lost the lease on {self.model.__tablename__} {self.row_id} to another process")
+        return not self.lost
+
+@asynccontextmanager
+async def held_lease(model, row_id: str):
+    """
+    Renew the lease on a claimed row every third of LEASE_SECONDS while the block
+    runs. Yields the Lease: the block checks confirm() before writing its result.
+    """
+    lease = Lease(model, row_id)
+
+    async def heartbeat():
+        while True:
+            await asyncio.sleep(LEASE_SECONDS / 3)
+            try:
+                if not await lease.confirm():
+                    return
+            except Exception as e:
+                logger.warning(f"Renewing the lease on {model.__tablename__} {row_id} failed: {str(e)}")
+
+    task = asyncio.create_task(heartbeat())
+    try:
+        yield lease
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
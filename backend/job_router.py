@@ -0,0 +1,155 @@
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+import logging
+
+from database import IngestionJob, ReparseRun, get_async_db
+from candidate_router import get_db, validate_file_type
+from ingestion_jobs import ingestion_queue
+from reparse_runs import reparse_runner
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+class JobResponse(BaseModel):
+    id: str
+    status: str
+    filename: str
+    file_size: Optional[int] = None
+    candidate_id: Optional[int] = None
+    error: Optional[str] = None
+    attempts: Optional[int] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    deduplicated: bool = False
+
+    class Config:
+        from_attributes = True
+
+def job_to_response(job: IngestionJob, deduplicated: bool = False) -> JobResponse:
+    return JobResponse(
+        id=job.id,
+        status=job.status,
+        filename=job.filename,
+        file_size=job.file_size,
+        candidate_id=job.candidate_id,
+        error=job.error,
+        attempts=job.attempts,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        deduplicated=deduplicated
+    )
+
+@router.post("/jobs", response_model=JobResponse, status_code=202)
+async def create_ingestion_job(
+    file: UploadFile = File(...),
+    job_description: Optional[str] = Form("")
+):
+    """Queue a resume for background ingestion and return its job id immediately"""
+    validate_file_type(file.filename)
+    content = await file.read()
+    if not content:
+        raise HTTPException(status_code=400, detail="Uploaded file is empty")
+
+    job, deduplicated = await ingestion_queue.submit(content, file.filename, job_description or "")
+    logger.info(f"Ingestion job {job.id} {'reused' if deduplicated else 'queued'} for {file.filename}")
+    return job_to_response(job, deduplicated)
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_ingestion_job(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Get the status of an ingestion job"""
+    job = await db.get(IngestionJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_to_response(job)
+
+class ReparseRunRequest(BaseModel):
+    # None rescores every candidate against the job description it was uploaded with
+    job_description: Optional[str] = None
+    batch_size: int = 200
+
+class ReparseRunResponse(BaseModel):
+    id: str
+    status: str
+    job_description: Optional[str] = None
+    batch_size: int
+    total: int = 0
+    processed: int = 0
+    failed: int = 0
+    last_candidate_id: int = 0
+    percent: float = 0.0
+    rate_per_second: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+def run_to_response(run: ReparseRun) -> ReparseRunResponse:
+    return ReparseRunResponse(
+        id=run.id,
+        status=run.status,
+        job_description=run.job_description,
+        batch_size=run.batch_size,
+        total=run.total or 0,
+        processed=run.processed or 0,
+        failed=run.failed or 0,
+        last_candidate_id=run.last_candidate_id or 0,
+        error=run.error,
+        created_at=run.created_at,
+        started_at=run.started_at,
+        updated_at=run.updated_at,
+        finished_at=run.finished_at,
+        **reparse_runner.progress(run)
+    )
+
+def get_reparse_run(run_id: str, db: Session) -> ReparseRun:
+    run = db.query(ReparseRun).filter(ReparseRun.id == run_id).first()
+    if not run:
+        raise HTTPException(status_code=404, detail="Reparse run not found")
+    return run
+
+@router.post("/reparse-runs", response_model=ReparseRunResponse, status_code=202)
+async def create_reparse_run(request: ReparseRunRequest, db: Session = Depends(get_db)):
+    """Start re-parsing and re-scoring every candidate in the background"""
+    if not 1 <= request.batch_size <= 5000:
+        raise HTTPException(status_code=400, detail="batch_size must be between 1 and 5000")
+    run = reparse_runner.submit(db, request.job_description, request.batch_size)
+    logger.info(f"Reparse run {run.id} queued for {run.total} candidates")
+    return run_to_response(run)
+
+@router.get("/reparse-runs", response_model=List[ReparseRunResponse])
+def list_reparse_runs(limit: int = 20, db: Session = Depends(get_db)):
+    """Most recent reparse runs first"""
+    runs = db.query(ReparseRun).order_by(ReparseRun.created_at.desc()).limit(min(limit, 100)).all()
+    return [run_to_response(run) for run in runs]
+
+@router.get("/reparse-runs/{run_id}", response_model=ReparseRunResponse)
+async def get_reparse_run_status(run_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Progress of a reparse run"""
+    run = await db.get(ReparseRun, run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Reparse run not found")
+    return run_to_response(run)
+
+@router.post("/reparse-runs/{run_id}/pause", response_model=ReparseRunResponse)
+async def pause_reparse_run(run_id: str, db: Session = Depends(get_db)):
+    """Stop after the batch in flight; the run can be resumed from its checkpoint"""
+    return run_to_response(reparse_runner.pause(db, get_reparse_run(run_id, db)))
+
+@router.post("/reparse-runs/{run_id}/resume", response_model=ReparseRunResponse)
+async def resume_reparse_run(run_id: str, db: Session = Depends(get_db)):
+    """Continue a paused or failed run after its last completed batch"""
+    return run_to_response(reparse_runner.resume(db, get_reparse_run(run_id, db)))
+
+@router.post("/reparse-runs/{run_id}/cancel", response_model=ReparseRunResponse)
+async def cancel_reparse_run(run_id: str, db: Session = Depends(get_db)):
+    """Stop a run for good; batches already written are kept"""
+    return run_to_response(reparse_runner.cancel(db, get_reparse_run(run_id, db)))
@@ -1,9 +1,21 @@
 from fastapi import FastAPI, HTTPException, File, UploadFile, Form, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from candidate_router import router as candidate_router, upload_resume, get_db
-from database import init_db
+from parsing_executor import parsing_executor
+from job_router import router as job_router
+from ingestion_jobs import ingestion_queue
+from reparse_runs import reparse_runner
+from write_batcher import write_batcher
+from ann_index import ann_index
+from ai_processing.model_registry import model_registry, parse_warmup_list
+from database import init_db, SessionLocal, engine, AsyncSessionLocal, dispose_async_engine
+from sqlalchemy import text
+from search_index import ensure_search_index
+from stats_service import ensure_stats, stats_rebuilder
+from candidate_skills import ensure_candidate_skills
 import logging
 import os
+import asyncio
 from contextlib import asynccontextmanager
 
 # Configure logging first
@@ -28,9 +40,26 @@ async def lifespan(app: FastAPI):
     try:
         logger.info("Database initialization started...")
         init_db()
+        db = SessionLocal()
+        try:
+            backfilled = ensure_candidate_skills(db)
+            if backfilled:
+                logger.info(f"Backfilled normalized skills for {backfilled} candidates")
+            ensure_stats(db)
+        finally:
+            db.close()
+        ensure_search_index(engine)
         logger.info("Database initialization complete.")
+        write_batcher.start()
+        await ingestion_queue.start()
+        await reparse_runner.start()
+        stats_rebuilder.start()
         logger.info("Resume parsing modules loading...")
-        # Pre-load any heavy AI models here if needed
+        # Pre-load heavy AI models named in MODEL_WARMUP ("all" or e.g. "spacy,sentence_encoder")
+        warmup = parse_warmup_list(os.getenv("MODEL_WARMUP"))
+        if warmup != []:
+            loaded = await asyncio.to_thread(model_registry.warm_up, warmup)
+            logger.info(f"Warmed up models: {', '.join(loaded) or 'none'}")
         logger.info("API startup complete.")
     except Exception as e:
         logger.error(f"Startup failed: {str(e)}")
@@ -40,6 +69,13 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down PIPPO Resume Analysis API...")
+    await ingestion_queue.stop()
+    await reparse_runner.stop()
+    await write_batcher.stop()
+    await stats_rebuilder.stop()
+    parsing_executor.shutdown()
+    ann_index.close()
+    await dispose_async_engine()
 
 # Create FastAPI app with enhanced configuration
 app = FastAPI(
@@ -63,6 +99,7 @@ app.add_middleware(
 
 # Include routers with prefix for better API organization
 app.include_router(candidate_router, prefix="/api/v1", tags=["candidates"])
+app.include_router(job_router, prefix="/api/v1", tags=["jobs"])
 
 # FIXED: Add the missing upload endpoints that your frontend expects
 @app.post("/api/v1/upload-resume/", tags=["candidates"])
@@ -101,13 +138,11 @@ def health_check():
     }
 
 @app.get("/health", tags=["health"])
-def detailed_health_check():
+async def detailed_health_check():
     try:
         # Test database connection
-        from database import SessionLocal
-        db = SessionLocal()
-        db.execute("SELECT 1")
-        db.close()
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("SELECT 1"))
         db_status = "healthy"
     except Exception as e:
         logger.error(f"Database health check failed: {str(e)}")
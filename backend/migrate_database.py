@@ -26,7 +26,9 @@ def migrate_database():
             ("experience_years", "INTEGER DEFAULT 0"),
             ("education", "TEXT"),
             ("match_score", "REAL DEFAULT 0.0"),
-            ("created_at", "DATETIME")
+            ("created_at", "DATETIME"),
+            ("resume_embedding", "BLOB"),
+            ("embedding_model", "VARCHAR(100)")
         ]
         
         for column_name, column_type in new_columns:
@@ -1,4 +1,5 @@
 # backend/migrations/env.py
+import os
 import sys
 from os.path import abspath, dirname
 
@@ -8,9 +9,13 @@ sys.path.insert(0, dirname(dirname(dirname(abspath(__file__)))))  # Changed to 3
 from logging.config import fileConfig
 from sqlalchemy import engine_from_config, pool
 from alembic import context
-from backend.database import Base  # Keep this import
+from backend.database import Base, DATABASE_URL  # Keep this import
 
 config = context.config
+
+# Migrate the database the API is configured for (DATABASE_URL) rather than the alembic.ini default
+if os.getenv("DATABASE_URL"):
+    config.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
 fileConfig(config.config_file_name)
 target_metadata = Base.metadata
 
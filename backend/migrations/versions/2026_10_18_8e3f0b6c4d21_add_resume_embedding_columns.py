@@ -0,0 +1,31 @@
+"""Add resume embedding columns
+
+Revision ID: 8e3f0b6c4d21
+Revises: 5c1e7d2a9b40
+Create Date: 2026-10-18 11:04:27.931542
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3f0b6c4d21'
+down_revision: Union[str, None] = '5c1e7d2a9b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('candidates', sa.Column('resume_embedding', sa.LargeBinary(), nullable=True))
+    op.add_column('candidates', sa.Column('embedding_model', sa.String(length=100), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('candidates') as batch_op:
+        batch_op.drop_column('embedding_model')
+        batch_op.drop_column('resume_embedding')
@@ -0,0 +1,31 @@
+"""Add ingestion_jobs (status, created_at) index
+
+Revision ID: a9d3c6e2f417
+Revises: f1a7c3e5b920
+Create Date: 2026-10-18 23:58:09.412736
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d3c6e2f417'
+down_revision: Union[str, None] = 'f1a7c3e5b920'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Serves status lookups and the oldest-first queued scan; replaces the single-column status index
+    op.create_index('ix_ingestion_jobs_status_created_at', 'ingestion_jobs', ['status', 'created_at'], unique=False)
+    op.drop_index('ix_ingestion_jobs_status', table_name='ingestion_jobs')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_ingestion_jobs_status', 'ingestion_jobs', ['status'], unique=False)
+    op.drop_index('ix_ingestion_jobs_status_created_at', table_name='ingestion_jobs')
@@ -0,0 +1,29 @@
+"""Add candidates anonymized_text column
+
+Revision ID: b5e8f2a1c063
+Revises: a9d3c6e2f417
+Create Date: 2026-10-18 23:59:41.208315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e8f2a1c063'
+down_revision: Union[str, None] = 'a9d3c6e2f417'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('candidates', sa.Column('anonymized_text', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('candidates') as batch_op:
+        batch_op.drop_column('anonymized_text')
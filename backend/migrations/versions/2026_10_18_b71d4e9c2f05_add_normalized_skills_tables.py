@@ -0,0 +1,69 @@
+"""Add normalized skills tables
+
+Revision ID: b71d4e9c2f05
+Revises: 8e3f0b6c4d21
+Create Date: 2026-10-18 20:41:12.508377
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71d4e9c2f05'
+down_revision: Union[str, None] = '8e3f0b6c4d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    skills = op.create_table(
+        'skills',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('normalized_name', sa.String(length=100), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_skills_normalized_name'), 'skills', ['normalized_name'], unique=True)
+    candidate_skills = op.create_table(
+        'candidate_skills',
+        sa.Column('candidate_id', sa.Integer(), nullable=False),
+        sa.Column('skill_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['candidate_id'], ['candidates.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['skill_id'], ['skills.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('candidate_id', 'skill_id')
+    )
+    op.create_index('ix_candidate_skills_skill_candidate', 'candidate_skills', ['skill_id', 'candidate_id'], unique=False)
+
+    # Backfill from the JSON skills column
+    connection = op.get_bind()
+    skill_rows = {}
+    links = set()
+    rows = connection.execute(sa.text("SELECT id, skills FROM candidates WHERE skills IS NOT NULL")).fetchall()
+    for candidate_id, raw_skills in rows:
+        try:
+            names = json.loads(raw_skills) or []
+        except (TypeError, ValueError):
+            continue
+        for name in names:
+            if not isinstance(name, str) or not name.strip():
+                continue
+            key = " ".join(name.split()).casefold()[:100]
+            if key not in skill_rows:
+                skill_rows[key] = {'id': len(skill_rows) + 1, 'name': name.strip()[:100], 'normalized_name': key}
+            links.add((candidate_id, skill_rows[key]['id']))
+    if skill_rows:
+        op.bulk_insert(skills, list(skill_rows.values()))
+    if links:
+        op.bulk_insert(candidate_skills, [{'candidate_id': c, 'skill_id': s} for c, s in sorted(links)])
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_candidate_skills_skill_candidate', table_name='candidate_skills')
+    op.drop_table('candidate_skills')
+    op.drop_index(op.f('ix_skills_normalized_name'), table_name='skills')
+    op.drop_table('skills')
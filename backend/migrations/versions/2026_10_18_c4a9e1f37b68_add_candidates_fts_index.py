@@ -0,0 +1,62 @@
+"""Add candidates FTS5 full-text index
+
+Revision ID: c4a9e1f37b68
+Revises: b71d4e9c2f05
+Create Date: 2026-10-18 21:02:45.117903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a9e1f37b68'
+down_revision: Union[str, None] = 'b71d4e9c2f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Snapshot of search_index.FTS_DDL at the time of this revision
+FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS candidates_fts USING fts5(
+        name, email, skills, education, resume_text,
+        content='candidates', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS candidates_fts_insert AFTER INSERT ON candidates BEGIN
+        INSERT INTO candidates_fts(rowid, name, email, skills, education, resume_text) VALUES (new.id, new.name, new.email, new.skills, new.education, new.resume_text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS candidates_fts_delete AFTER DELETE ON candidates BEGIN
+        INSERT INTO candidates_fts(candidates_fts, rowid, name, email, skills, education, resume_text) VALUES ('delete', old.id, old.name, old.email, old.skills, old.education, old.resume_text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS candidates_fts_update AFTER UPDATE OF name, email, skills, education, resume_text ON candidates BEGIN
+        INSERT INTO candidates_fts(candidates_fts, rowid, name, email, skills, education, resume_text) VALUES ('delete', old.id, old.name, old.email, old.skills, old.education, old.resume_text);
+        INSERT INTO candidates_fts(rowid, name, email, skills, education, resume_text) VALUES (new.id, new.name, new.email, new.skills, new.education, new.resume_text);
+    END""",
+]
+
+FTS_DROP = [
+    "DROP TRIGGER IF EXISTS candidates_fts_update",
+    "DROP TRIGGER IF EXISTS candidates_fts_delete",
+    "DROP TRIGGER IF EXISTS candidates_fts_insert",
+    "DROP TABLE IF EXISTS candidates_fts",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # FTS5 is SQLite-only; other databases keep the LIKE search fallback
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in FTS_DDL:
+        op.execute(statement)
+    op.execute("INSERT INTO candidates_fts(candidates_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in FTS_DROP:
+        op.execute(statement)
@@ -0,0 +1,32 @@
+"""Add ingestion_jobs owner and lease_until columns
+
+Revision ID: c7d2e9f4a158
+Revises: b5e8f2a1c063
+Create Date: 2026-10-18 23:59:58.530174
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2e9f4a158'
+down_revision: Union[str, None] = 'b5e8f2a1c063'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Running jobs are leased by one API process; an expired lease means the job was abandoned
+    op.add_column('ingestion_jobs', sa.Column('owner', sa.String(length=100), nullable=True))
+    op.add_column('ingestion_jobs', sa.Column('lease_until', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('ingestion_jobs') as batch_op:
+        batch_op.drop_column('lease_until')
+        batch_op.drop_column('owner')
@@ -0,0 +1,44 @@
+"""Add materialized stats tables
+
+Revision ID: d2f6a8b3e914
+Revises: c4a9e1f37b68
+Create Date: 2026-10-18 21:37:05.660214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f6a8b3e914'
+down_revision: Union[str, None] = 'c4a9e1f37b68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The rows are (re)built by stats_service.ensure_stats on the next API start
+    op.create_table(
+        'stats_counters',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('value', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.create_table(
+        'stats_skill_counts',
+        sa.Column('normalized_name', sa.String(length=100), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('candidate_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('normalized_name')
+    )
+    op.create_index(op.f('ix_stats_skill_counts_candidate_count'), 'stats_skill_counts', ['candidate_count'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_stats_skill_counts_candidate_count'), table_name='stats_skill_counts')
+    op.drop_table('stats_skill_counts')
+    op.drop_table('stats_counters')
@@ -0,0 +1,32 @@
+"""Add reparse_runs owner and lease_until columns
+
+Revision ID: e4b8a1d6c392
+Revises: c7d2e9f4a158
+Create Date: 2026-10-18 23:59:59.104827
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b8a1d6c392'
+down_revision: Union[str, None] = 'c7d2e9f4a158'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A running run is leased by one API process, like ingestion jobs
+    op.add_column('reparse_runs', sa.Column('owner', sa.String(length=100), nullable=True))
+    op.add_column('reparse_runs', sa.Column('lease_until', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('reparse_runs') as batch_op:
+        batch_op.drop_column('lease_until')
+        batch_op.drop_column('owner')
@@ -0,0 +1,34 @@
+"""Add candidate sort key indexes for keyset pagination
+
+Revision ID: e83b5c0d7a12
+Revises: d2f6a8b3e914
+Create Date: 2026-10-18 22:05:51.348120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e83b5c0d7a12'
+down_revision: Union[str, None] = 'd2f6a8b3e914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_candidates_match_score_id', 'candidates', ['match_score', 'id'], unique=False)
+    op.create_index('ix_candidates_created_at_id', 'candidates', ['created_at', 'id'], unique=False)
+    op.create_index('ix_candidates_experience_years_id', 'candidates', ['experience_years', 'id'], unique=False)
+    op.create_index('ix_candidates_name_id', 'candidates', ['name', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_candidates_name_id', table_name='candidates')
+    op.drop_index('ix_candidates_experience_years_id', table_name='candidates')
+    op.drop_index('ix_candidates_created_at_id', table_name='candidates')
+    op.drop_index('ix_candidates_match_score_id', table_name='candidates')
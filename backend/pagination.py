@@ -0,0 +1,89 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+from database import Candidate
+
+# Sort keys usable with cursors; each is backed by an ix_candidates_<key>_id index
+SORT_COLUMNS = {
+    "match_score": Candidate.match_score,
+    "created_at": Candidate.created_at,
+    "experience_years": Candidate.experience_years,
+    "name": Candidate.name,
+}
+
+def encode_cursor(sort_by: str, order: str, value: Any, last_id: int) -> str:
+    if isinstance(value, datetime):
+        value = {"dt": value.isoformat()}
+    payload = json.dumps({"s": sort_by, "o": order, "v": value, "id": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, sort_by: str, order: str) -> dict:
+    """Parse a cursor, rejecting ones issued for a different sort with 400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        value = payload["v"]
+        if isinstance(value, dict) and "dt" in value:
+            value = datetime.fromisoformat(value["dt"])
+        last_id = int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if payload.get("s") != sort_by or payload.get("o") != order:
+        raise HTTPException(status_code=400, detail="Cursor does not match sort_by/order")
+    return {"value": value, "id": last_id}
+
+def order_keyset(query: Query, sort_by: str, order: str) -> Query:
+    """ORDER BY the sort key with id as tie-breaker, so every row has a unique position"""
+    column = SORT_COLUMNS[sort_by]
+    if order == "desc":
+        return query.order_by(column.desc(), Candidate.id.desc())
+    return query.order_by(column.asc(), Candidate.id.asc())
+
+def fetch_keyset_page(query: Query, sort_by: str, order: str, position: Optional[dict], limit: int) -> list:
+    """
+    The page after `position` ({"value", "id"} from decode_cursor, None for the
+    first page) in (sort key, id) order. Non-NULL keys use a row-value comparison
+    so the composite index can seek straight to the cursor. NULL keys are ordered
+    as the smallest values (SQLite's ordering) and fetched with a separate query
+    only when the page reaches them, because an OR on IS NULL would force a scan.
+    """
+    column = SORT_COLUMNS[sort_by]
+    ordered = order_keyset(query, sort_by, order)
+    # The NULL rows share one key value, so (key, id) order is id order and the same index serves it
+    null_query = order_keyset(query.filter(column.is_(None)), sort_by, order) if column.expression.nullable else None
+
+    if order == "desc":
+        if position is None:
+            rows = ordered.filter(column.isnot(None)).limit(limit).all()
+        elif position["value"] is None:
+            rows = []
+            null_query = null_query.filter(Candidate.id < position["id"]) if null_query is not None else None
+        else:
+            rows = ordered.filter(tuple_(column, Candidate.id) < tuple_(position["value"], position["id"])).limit(limit).all()
+        if len(rows) < limit and null_query is not None:
+            rows += null_query.limit(limit - len(rows)).all()
+        return rows
+
+    if position is not None and position["value"] is not None:
+        return ordered.filter(tuple_(column, Candidate.id) > tuple_(position["value"], position["id"])).limit(limit).all()
+    rows = []
+    if null_query is not None:
+        if position is not None:
+            null_query = null_query.filter(Candidate.id > position["id"])
+        rows = null_query.limit(limit).all()
+    if len(rows) < limit:
+        rows += ordered.filter(column.isnot(None)).limit(limit - len(rows)).all()
+    return rows
+
+def next_cursor(rows: list, limit: int, sort_by: str, order: str) -> Optional[str]:
+    """A cursor for the page after `rows`, or None when this was the last page"""
+    if len(rows) < limit or not rows:
+        return None
+    last = rows[-1]
+    return encode_cursor(sort_by, order, getattr(last, sort_by), last.id)
@@ -0,0 +1,135 @@
+import copy
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+def content_hash(content: bytes) -> str:
+    """SHA-256 of the uploaded file bytes, used as the cache key"""
+    return hashlib.sha256(content).hexdigest()
+
+def _entry_size(value: Any) -> int:
+    """Rough in-memory size of cached text and parser output (string payloads dominate)"""
+    if isinstance(value, str):
+        return len(value)
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sum(_entry_size(key) + _entry_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_entry_size(item) for item in value)
+    return 16
+
+class ParseCache:
+    """
+    Content-addressed LRU cache for extracted resume text and parser output.
+
+    Extracted text and resume embeddings are keyed by the file's SHA-256. Parser
+    output also depends on the job description, so it is keyed by (file hash,
+    job description hash).
+    Entries are evicted least-recently-used first once either max_entries or
+    max_bytes is exceeded. Hit/miss counters are per upload lookup: a full hit
+    reuses the parser output, a text hit only the extracted text.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.text_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "ParseCache":
+        return cls(
+            max_entries=int(os.getenv("PARSE_CACHE_MAX_ENTRIES", "1024")),
+            max_bytes=int(os.getenv("PARSE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def _get(self, key: tuple) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return copy.deepcopy(entry[0])
+
+    def _put(self, key: tuple, value: Any):
+        if not self.enabled:
+            return
+        size = _entry_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (copy.deepcopy(value), size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    @staticmethod
+    def _job_key(job_description: str) -> str:
+        return hashlib.sha256((job_description or "").encode("utf-8")).hexdigest()
+
+    def lookup(self, file_hash: str, job_description: str) -> Tuple[Optional[Tuple[dict, int]], Optional[str]]:
+        """
+        (parsed output, extracted text) for an upload, the text only looked up when
+        the parsed output is missing; counted as one hit, text hit or miss.
+        """
+        parsed = self._get(("parsed", file_hash, self._job_key(job_description)))
+        text = self._get(("text", file_hash)) if parsed is None else None
+        with self._lock:
+            if parsed is not None:
+                self.hits += 1
+            elif text is not None:
+                self.text_hits += 1
+            else:
+                self.misses += 1
+        return parsed, text
+
+    def put_text(self, file_hash: str, text: str):
+        self._put(("text", file_hash), text)
+
+    def put_parsed(self, file_hash: str, job_description: str, parsed_data: dict, overall_score: int):
+        self._put(("parsed", file_hash, self._job_key(job_description)), (parsed_data, overall_score))
+
+    def get_embedding(self, file_hash: str):
+        return self._get(("embedding", file_hash))
+
+    def put_embedding(self, file_hash: str, embedding):
+        self._put(("embedding", file_hash), embedding)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.text_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "text_hits": self.text_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+# Shared cache for the API process
+parse_cache = ParseCache.from_env()
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from ai_processing.model_registry import warm_up_parser_worker
+
+logger = logging.getLogger(__name__)
+
+# Sentinel so callers can pass queue_timeout=None to mean "wait forever"
+_DEFAULT_TIMEOUT = object()
+
+class ExecutorSaturated(Exception):
+    """Raised when the parsing queue is full and a job could not be admitted in time"""
+
+class ParsingExecutor:
+    """
+    Runs CPU-bound parsing work off the event loop with a bounded queue.
+
+    Jobs are admitted while fewer than max_workers + max_queue are in flight;
+    beyond that callers wait up to queue_timeout seconds and then get
+    ExecutorSaturated (backpressure). Admitted jobs wait in an asyncio-level
+    queue until a worker is free, so queue depth and wait time are measured
+    exactly, independent of the thread or process pool underneath.
+    """
+
+    def __init__(
+        self,
+        kind: str = "process",
+        max_workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        queue_timeout: Optional[float] = 30.0,
+        sample_size: int = 1000
+    ):
+        if kind not in ("process", "thread"):
+            raise ValueError(f"Unsupported executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 2
+        self.max_queue = max_queue if max_queue is not None else self.max_workers * 4
+        self.queue_timeout = queue_timeout
+
+        self._pool: Optional[Executor] = None
+        self._loop = None
+        self._admission = None
+        self._workers = None
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.queued = 0
+        self.running = 0
+        self.max_queue_depth = 0
+        self._wait_times = deque(maxlen=sample_size)
+        self._run_times = deque(maxlen=sample_size)
+
+    @classmethod
+    def from_env(cls) -> "ParsingExecutor":
+        """Build from PARSER_EXECUTOR, PARSER_WORKERS, PARSER_MAX_QUEUE and PARSER_QUEUE_TIMEOUT"""
+        max_queue = os.getenv("PARSER_MAX_QUEUE")
+        queue_timeout = os.getenv("PARSER_QUEUE_TIMEOUT", "30")
+        return cls(
+            kind=os.getenv("PARSER_EXECUTOR", "process").lower(),
+            max_workers=int(os.getenv("PARSER_WORKERS", str(os.cpu_count() or 2))),
+            max_queue=int(max_queue) if max_queue else None,
+            queue_timeout=float(queue_timeout) if queue_timeout else None
+        )
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=warm_up_parser_worker)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="parser")
+            logger.info(f"Started {self.kind} parsing pool with {self.max_workers} workers")
+        return self._pool
+
+    def _get_semaphores(self):
+        # asyncio primitives belong to one event loop, so rebuild them if the loop changed
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._admission = asyncio.Semaphore(self.max_workers + self.max_queue)
+            self._workers = asyncio.Semaphore(self.max_workers)
+        return self._admission, self._workers
+
+    async def run(self, func: Callable, *args, queue_timeout: Any = _DEFAULT_TIMEOUT) -> Any:
+        """
+        Run func(*args) in the pool. queue_timeout overrides the admission timeout
+        for this call; None waits for a slot indefinitely (used by batch uploads).
+        """
+        admission, workers = self._get_semaphores()
+        timeout = self.queue_timeout if queue_timeout is _DEFAULT_TIMEOUT else queue_timeout
+
+        try:
+            if timeout is None:
+                await admission.acquire()
+            else:
+                await asyncio.wait_for(admission.acquire(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise ExecutorSaturated(f"Parsing queue is full ({self.max_queue} waiting jobs)")
+
+        self.submitted += 1
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        queued_at = time.perf_counter()
+        dispatched = False
+        try:
+            async with workers:
+                dispatched = True
+                self.queued -= 1
+                self.running += 1
+                started_at = time.perf_counter()
+                self._wait_times.append(started_at - queued_at)
+                try:
+                    result = await asyncio.get_running_loop().run_in_executor(self._get_pool(), func, *args)
+                    self.completed += 1
+                    return result
+                except Exception:
+                    self.failed += 1
+                    raise
+                finally:
+                    self.running -= 1
+                    self._run_times.append(time.perf_counter() - started_at)
+        finally:
+            if not dispatched:
+                # Cancelled while still waiting for a worker
+                self.queued -= 1
+            admission.release()
+
+    def metrics(self) -> dict:
+        """Queue depth, throughput counters and wait/run time percentiles (milliseconds)"""
+        return {
+            "executor": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "queue_depth": self.queued,
+            "max_queue_depth": self.max_queue_depth,
+            "running": self.running,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "wait_time_ms": _summarize(self._wait_times),
+            "run_time_ms": _summarize(self._run_times)
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+def _summarize(samples) -> dict:
+    if not samples:
+        return {"avg": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    count = len(ordered)
+    return {
+        "avg": round(sum(ordered) / count * 1000, 2),
+        "p50": round(ordered[count // 2] * 1000, 2),
+        "p95": round(ordered[min(count - 1, int(count * 0.95))] * 1000, 2),
+        "max": round(ordered[-1] * 1000, 2)
+    }
+
+# Shared executor for all heavy parsing in the API
+parsing_executor = ParsingExecutor.from_env()
@@ -0,0 +1,374 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session, load_only
+
+from database import Candidate, ReparseRun, SessionLocal
+from candidate_router import (
+    EMBEDDINGS_ENABLED, run_text_batch, reparsed_fields, run_off_loop, apply_semantic_match, stored_embedding
+)
+from ai_processing.matching_service import encode_job_description
+from candidate_skills import sync_candidate_skills
+from parsing_executor import parsing_executor
+from job_leases import WORKER_ID, claim, held_lease, requeue_expired
+from stats_service import candidate_contribution, apply_stats_delta
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+
+# Columns read again inside the write transaction: the stats "before" values, the
+# fields reparsed_fields falls back to and the resume vector for semantic match scores
+REPARSE_COLUMNS = (
+    Candidate.name, Candidate.email, Candidate.phone, Candidate.skills, Candidate.experience_years,
+    Candidate.education, Candidate.match_score, Candidate.created_at, Candidate.ai_metadata,
+    Candidate.resume_embedding, Candidate.embedding_model
+)
+
+class ReparseRunner:
+    """
+    Re-parses and re-scores the whole candidate base in the background.
+
+    A run walks candidates in id order, batch_size rows at a time. Each batch is
+    split into chunks that are parsed in parallel on the shared parsing executor
+    (one worker call per chunk), then written back with one executemany UPDATE,
+    together with the skills links, the stats deltas and the run's checkpoint in
+    a single transaction. A run that is paused, or interrupted by a restart,
+    continues after its last committed batch.
+
+    With several API processes, a run is claimed by one of them with a conditional
+    UPDATE and leased to it (see job_leases.py); the others leave it alone unless
+    the lease expires, and a batch is only committed by the lease holder.
+
+    Throttling: at most `parallelism` chunks are in flight, so interactive uploads
+    keep a worker, and max_rate (candidates per second, 0 = unlimited) caps the
+    overall pace.
+    """
+
+    def __init__(self, chunk_size: int = 25, parallelism: Optional[int] = None, max_rate: float = 0.0):
+        self.chunk_size = chunk_size
+        self.parallelism = parallelism or max(1, parsing_executor.max_workers - 1)
+        self.max_rate = max_rate
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._progress: Dict[str, Tuple[float, int]] = {}  # run id -> (monotonic start, processed at start)
+
+    @classmethod
+    def from_env(cls) -> "ReparseRunner":
+        parallelism = os.getenv("REPARSE_PARALLELISM")
+        return cls(
+            chunk_size=int(os.getenv("REPARSE_CHUNK_SIZE", "25")),
+            parallelism=int(parallelism) if parallelism else None,
+            max_rate=float(os.getenv("REPARSE_MAX_RATE", "0"))
+        )
+
+    async def start(self):
+        """Continue queued runs and runs whose process stopped renewing their lease"""
+        db = SessionLocal()
+        try:
+            requeue_expired(db, ReparseRun)
+            run_ids = [run_id for (run_id,) in db.query(ReparseRun.id).filter(ReparseRun.status == "queued")]
+        finally:
+            db.close()
+        for run_id in run_ids:
+            self._launch(run_id)
+        if run_ids:
+            logger.info(f"Resuming {len(run_ids)} reparse runs")
+
+    async def stop(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = {}
+        # Hand our runs back to the queue, so the next start() need not wait for the lease to expire
+        await asyncio.to_thread(self._release)
+
+    def _release(self):
+        db = SessionLocal()
+        try:
+            db.query(ReparseRun).filter(ReparseRun.owner == WORKER_ID, ReparseRun.status == "running").update(
+                {ReparseRun.status: "queued", ReparseRun.owner: None, ReparseRun.lease_until: None},
+                synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def submit(self, db: Session, job_description: Optional[str] = None, batch_size: int = 200) -> ReparseRun:
+        """Create and start a run over every current candidate; only one run may be active"""
+        active = db.query(ReparseRun.id).filter(ReparseRun.status.in_(ACTIVE_STATUSES + ("paused",))).first()
+        if active:
+            raise HTTPException(status_code=409, detail=f"Reparse run {active.id} is already in progress")
+
+        total, max_id = db.query(func.count(Candidate.id), func.max(Candidate.id)).one()
+        run = ReparseRun(
+            id=str(uuid.uuid4()),
+            status="queued",
+            job_description=job_description,
+            batch_size=batch_size,
+            total=total,
+            max_candidate_id=max_id or 0,
+            last_candidate_id=0,
+            processed=0,
+            failed=0,
+            created_at=datetime.utcnow()
+        )
+        db.add(run)
+        db.commit()
+        db.refresh(run)
+        self._launch(run.id)
+        return run
+
+    def pause(self, db: Session, run: ReparseRun) -> ReparseRun:
+        return self._transition(db, run, ACTIVE_STATUSES, "paused")
+
+    def resume(self, db: Session, run: ReparseRun) -> ReparseRun:
+        run = self._transition(db, run, ("paused", "failed"), "queued")
+        self._launch(run.id)
+        return run
+
+    def cancel(self, db: Session, run: ReparseRun) -> ReparseRun:
+        run = self._transition(db, run, ACTIVE_STATUSES + ("paused",), "cancelled")
+        run.finished_at = datetime.utcnow()
+        db.commit()
+        return run
+
+    def _transition(self, db: Session, run: ReparseRun, allowed: tuple, status: str) -> ReparseRun:
+        # The worker sees the new status at its next batch boundary
+        if run.status not in allowed:
+            raise HTTPException(status_code=409, detail=f"Cannot {status} a run that is {run.status}")
+        run.status = status
+        run.updated_at = datetime.utcnow()
+        db.commit()
+        db.refresh(run)
+        return run
+
+    def progress(self, run: ReparseRun) -> dict:
+        """Percent done plus rate and ETA measured since this process started the run"""
+        total = run.total or 0
+        percent = round(min(run.processed / total, 1.0) * 100, 1) if total else 100.0
+        rate = None
+        eta = None
+        started = self._progress.get(run.id)
+        if started and run.status == "running":
+            elapsed = time.monotonic() - started[0]
+            done = run.processed - started[1]
+            if elapsed > 0 and done > 0:
+                rate = round(done / elapsed, 2)
+                eta = round(max(total - run.processed, 0) / rate, 1)
+        return {"percent": percent, "rate_per_second": rate, "eta_seconds": eta}
+
+    def _launch(self, run_id: str):
+        task = self._tasks.get(run_id)
+        if task is not None and not task.done():
+            return
+        self._tasks[run_id] = asyncio.create_task(self._run(run_id))
+
+    async def _run(self, run_id: str):
+        try:
+            await self._process(run_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Reparse run {run_id} failed: {str(e)}", exc_info=True)
+            await asyncio.to_thread(self._set_status, run_id, "failed", str(e))
+        finally:
+            self._tasks.pop(run_id, None)
+            self._progress.pop(run_id, None)
+
+    async def _process(self, run_id: str):
+        run = await asyncio.to_thread(self._begin, run_id)
+        if run is None:
+            return
+        job_description, batch_size = run
+        limiter = asyncio.Semaphore(self.parallelism)
+
+        async def parse_chunk(items):
+            async with limiter:
+                return await run_off_loop(run_text_batch, items, wait_for_slot=True)
+
+        async with held_lease(ReparseRun, run_id):
+            await self._walk(run_id, job_description, batch_size, parse_chunk)
+
+    async def _walk(self, run_id: str, job_description: Optional[str], batch_size: int, parse_chunk):
+        while True:
+            batch_started = time.monotonic()
+            batch = await asyncio.to_thread(self._load_batch, run_id, batch_size)
+            if batch is None:
+                logger.info(f"Reparse run {run_id} stopped before its next batch")
+                return
+            if not batch:
+                await asyncio.to_thread(self._set_status, run_id, "completed")
+                logger.info(f"Reparse run {run_id} completed")
+                return
+
+            items = [
+                (candidate_id, text, job_description if job_description is not None else (metadata or {}).get("job_description") or "")
+                for candidate_id, text, metadata in batch
+            ]
+            chunks = [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+            results = [result for chunk in await asyncio.gather(*(parse_chunk(chunk) for chunk in chunks)) for result in chunk]
+            job_descriptions = {candidate_id: job_description for candidate_id, _, job_description in items}
+            if not await asyncio.to_thread(self._write_batch, run_id, batch[-1][0], results, job_descriptions):
+                logger.warning(f"Reparse run {run_id} was taken over by another process, stopping")
+                return
+
+            if self.max_rate > 0:
+                remaining = len(batch) / self.max_rate - (time.monotonic() - batch_started)
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
+
+    def _begin(self, run_id: str) -> Optional[Tuple[Optional[str], int]]:
+        db = SessionLocal()
+        try:
+            claimed = claim(db, ReparseRun, run_id, {
+                ReparseRun.started_at: func.coalesce(ReparseRun.started_at, datetime.utcnow()),
+                ReparseRun.updated_at: datetime.utcnow()
+            })
+            if not claimed:
+                return None
+            run = db.query(ReparseRun).filter(ReparseRun.id == run_id).first()
+            self._progress[run_id] = (time.monotonic(), run.processed)
+            logger.info(f"Reparse run {run_id} running from candidate {run.last_candidate_id} ({run.processed}/{run.total} done)")
+            return run.job_description, run.batch_size
+        finally:
+            db.close()
+
+    def _load_batch(self, run_id: str, batch_size: int) -> Optional[List[tuple]]:
+        """The next (id, resume_text, ai_metadata) rows after the checkpoint, or None if the run was paused/cancelled"""
+        db = SessionLocal()
+        try:
+            run = db.query(ReparseRun).filter(ReparseRun.id == run_id).first()
+            if run and run.status == "queued":
+                # Paused and resumed again before this worker reached a batch boundary
+                if not claim(db, ReparseRun, run_id):
+                    return None
+                db.refresh(run)
+            if not run or run.status != "running" or run.owner != WORKER_ID:
+                return None
+            return [
+                tuple(row) for row in db.query(Candidate.id, Candidate.resume_text, Candidate.ai_metadata)
+                .filter(Candidate.id > run.last_candidate_id, Candidate.id <= run.max_candidate_id)
+                .order_by(Candidate.id.asc())
+                .limit(batch_size)
+                .all()
+            ]
+        finally:
+            db.close()
+
+    @staticmethod
+    def _job_embeddings(job_descriptions: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Encoded job descriptions for the batch (cached by encode_job_description)"""
+        if not EMBEDDINGS_ENABLED:
+            return {}
+        embeddings = {}
+        for job_description in job_descriptions:
+            if not job_description.strip():
+                continue
+            try:
+                embeddings[job_description] = encode_job_description(job_description)
+            except Exception as e:
+                logger.warning(f"Encoding the job description failed, using profile match scores: {str(e)}")
+        return embeddings
+
+    def _write_batch(self, run_id: str, last_id: int, results: List[dict], job_descriptions: Dict[int, str]) -> bool:
+        """
+        Apply one batch of parse results and advance the checkpoint in a single
+        transaction; nothing is written (False) if this process no longer holds the run.
+        Candidates scored against a job description get the semantic match score from
+        their stored resume vector, as at upload.
+        """
+        job_embeddings = self._job_embeddings(
+            {job_descriptions[result["id"]] for result in results if result["ok"]}
+        )
+        db = SessionLocal()
+        try:
+            candidates = {
+                candidate.id: candidate
+                for candidate in db.query(Candidate).options(load_only(*REPARSE_COLUMNS))
+                .filter(Candidate.id.in_([result["id"] for result in results]))
+            }
+            updates = []
+            before = []
+            after = []
+            failed = 0
+            error = None
+            for result in results:
+                candidate = candidates.get(result["id"])
+                if candidate is None:
+                    continue  # Deleted while the batch was parsing
+                if not result["ok"]:
+                    failed += 1
+                    error = f"Candidate {result['id']}: {result['error']}"
+                    continue
+                job_description = job_descriptions[candidate.id]
+                parsed_data, overall_score = result["parsed_data"], result["overall_score"]
+                embedding = stored_embedding(candidate)
+                if embedding is not None and job_description in job_embeddings:
+                    overall_score = apply_semantic_match(parsed_data, embedding, job_embeddings[job_description])
+                fields = reparsed_fields(candidate, parsed_data, overall_score, job_description)
+                before.append(candidate_contribution(candidate))
+                reparsed = Candidate(id=candidate.id, created_at=candidate.created_at, **fields)
+                after.append(reparsed)
+                updates.append({"id": candidate.id, **fields})
+
+            if updates:
+                # Rows without ai_metadata would leave the key out; executemany needs uniform parameter sets
+                if any("ai_metadata" in values for values in updates):
+                    for values, reparsed in zip(updates, after):
+                        values.setdefault("ai_metadata", candidates[reparsed.id].ai_metadata)
+                db.execute(update(Candidate), updates)
+                sync_candidate_skills(db, after)
+                apply_stats_delta(db, added=[candidate_contribution(candidate) for candidate in after], removed=before)
+
+            checkpoint = {
+                ReparseRun.processed: func.coalesce(ReparseRun.processed, 0) + len(results),
+                ReparseRun.failed: func.coalesce(ReparseRun.failed, 0) + failed,
+                ReparseRun.last_candidate_id: last_id,
+                ReparseRun.updated_at: datetime.utcnow()
+            }
+            if error:
+                checkpoint[ReparseRun.error] = error
+            owned = db.query(ReparseRun).filter(ReparseRun.id == run_id, ReparseRun.owner == WORKER_ID).update(
+                checkpoint, synchronize_session=False
+            )
+            if not owned:
+                db.rollback()
+                return False
+            db.commit()
+            return True
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _set_status(self, run_id: str, status: str, error: Optional[str] = None):
+        db = SessionLocal()
+        try:
+            # Only a run this process holds can finish; a concurrent pause or cancel wins
+            values = {
+                ReparseRun.status: status, ReparseRun.owner: None, ReparseRun.lease_until: None,
+                ReparseRun.finished_at: datetime.utcnow(), ReparseRun.updated_at: datetime.utcnow()
+            }
+            if error:
+                values[ReparseRun.error] = error
+            db.query(ReparseRun).filter(
+                ReparseRun.id == run_id, ReparseRun.status.in_(ACTIVE_STATUSES), ReparseRun.owner == WORKER_ID
+            ).update(
+                values, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+# Shared runner started from the main.py lifespan hook
+reparse_runner = ReparseRunner.from_env()
@@ -0,0 +1,112 @@
+import logging
+import re
+from typing import List
+
+from sqlalchemy import column, literal_column, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "candidates_fts"
+FTS_COLUMNS = ("name", "email", "skills", "education", "resume_text")
+
+# BM25 column weights, in FTS_COLUMNS order: a hit in the name or skills outranks one in the resume body
+BM25_WEIGHTS = (10.0, 5.0, 4.0, 2.0, 1.0)
+
+_columns = ", ".join(FTS_COLUMNS)
+_new_values = ", ".join(f"new.{name}" for name in FTS_COLUMNS)
+_old_values = ", ".join(f"old.{name}" for name in FTS_COLUMNS)
+
+# External-content table: the index stores only tokens, the text stays in candidates.
+# Triggers keep it in sync; the update trigger only fires when an indexed column changes.
+FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {_columns},
+        content='candidates', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS candidates_fts_insert AFTER INSERT ON candidates BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS candidates_fts_delete AFTER DELETE ON candidates BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS candidates_fts_update AFTER UPDATE OF {_columns} ON candidates BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+        INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values});
+    END""",
+]
+
+FTS_DROP = [
+    "DROP TRIGGER IF EXISTS candidates_fts_update",
+    "DROP TRIGGER IF EXISTS candidates_fts_delete",
+    "DROP TRIGGER IF EXISTS candidates_fts_insert",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+fts_table = table(FTS_TABLE, column("rowid"))
+bm25_rank = literal_column(f"bm25({FTS_TABLE}, {', '.join(str(weight) for weight in BM25_WEIGHTS)})")
+
+_fts_enabled = False
+
+def fts_match(match_query: str):
+    """WHERE clause for an FTS5 query string produced by build_match_query"""
+    return text(f"{FTS_TABLE} MATCH :match_query").bindparams(match_query=match_query)
+
+def fts_enabled() -> bool:
+    return _fts_enabled
+
+def ensure_search_index(engine: Engine) -> bool:
+    """Create the FTS5 index and triggers if missing (SQLite only); returns whether FTS is usable"""
+    global _fts_enabled
+    if engine.dialect.name != "sqlite":
+        _fts_enabled = False
+        return False
+    try:
+        with engine.begin() as connection:
+            existed = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+            ).first() is not None
+            for statement in FTS_DDL:
+                connection.execute(text(statement))
+            if not existed:
+                connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+                logger.info("Built full-text search index")
+        _fts_enabled = True
+    except OperationalError as e:
+        # SQLite compiled without FTS5
+        logger.warning(f"Full-text search unavailable, falling back to LIKE search: {str(e)}")
+        _fts_enabled = False
+    return _fts_enabled
+
+def rebuild_search_index(engine: Engine):
+    with engine.begin() as connection:
+        connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+_QUERY_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+
+def build_match_query(query: str) -> str:
+    """
+    Translate a recruiter query into FTS5 syntax. "quoted text" is a phrase,
+    a trailing * is a prefix search, OR/NOT between terms are kept, and every
+    other term is quoted so punctuation (c++, node.js, emails) cannot break the
+    MATCH grammar. Terms are implicitly ANDed.
+    """
+    parts: List[str] = []
+    for phrase, word in _QUERY_TOKEN.findall(query):
+        if phrase:
+            if phrase.strip():
+                parts.append('"' + phrase.replace('"', '""') + '"')
+            continue
+        if word in ("OR", "NOT", "AND"):
+            if parts and parts[-1] not in ("OR", "NOT", "AND"):
+                parts.append(word)
+            continue
+        prefix = word.endswith("*")
+        term = word.rstrip("*").replace('"', '""')
+        if term:
+            parts.append(f'"{term}"' + ("*" if prefix else ""))
+    while parts and parts[-1] in ("OR", "NOT", "AND"):
+        parts.pop()
+    return " ".join(parts)
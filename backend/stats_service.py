@@ -0,0 +1,274 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database import Candidate, CandidateSkill, Skill, SkillCount, StatCounter, SessionLocal, lock_tables_for_write, upsert_insert
+from candidate_skills import normalize_skill
+
+logger = logging.getLogger(__name__)
+
+HIGH_MATCH_THRESHOLD = 0.8
+EXPERIENCED_YEARS = 5
+TOP_SKILLS = 10
+
+MATCH_SCORE_BUCKETS = [f"{bucket / 10:.1f}" for bucket in range(10)]
+EXPERIENCE_BUCKETS = ["0-1", "2-4", "5-9", "10+"]
+
+class StatsContribution(NamedTuple):
+    """What one candidate adds to the counters and to the per-skill counts"""
+    counters: Dict[str, float]
+    skills: Dict[str, str]  # normalized name -> display name
+
+def _match_score_bucket(score: float) -> str:
+    return MATCH_SCORE_BUCKETS[min(max(int(score * 10), 0), 9)]
+
+def _experience_bucket(years: int) -> str:
+    if years <= 1:
+        return "0-1"
+    if years <= 4:
+        return "2-4"
+    if years <= 9:
+        return "5-9"
+    return "10+"
+
+def _month_key(created_at: Optional[datetime]) -> str:
+    return f"created:{(created_at or datetime.utcnow()).strftime('%Y-%m')}"
+
+def candidate_contribution(candidate: Candidate) -> StatsContribution:
+    counters: Dict[str, float] = {"total_candidates": 1, _month_key(candidate.created_at): 1}
+    if candidate.match_score is not None:
+        counters["match_score_sum"] = candidate.match_score
+        counters["match_score_count"] = 1
+        counters[f"match_score:{_match_score_bucket(candidate.match_score)}"] = 1
+        if candidate.match_score >= HIGH_MATCH_THRESHOLD:
+            counters["high_match_candidates"] = 1
+    if candidate.experience_years is not None:
+        counters["experience_sum"] = candidate.experience_years
+        counters["experience_count"] = 1
+        counters[f"experience:{_experience_bucket(candidate.experience_years)}"] = 1
+        if candidate.experience_years >= EXPERIENCED_YEARS:
+            counters["experienced_candidates"] = 1
+    if candidate.email is not None:
+        counters["candidates_with_email"] = 1
+    if candidate.phone is not None:
+        counters["candidates_with_phone"] = 1
+    if candidate.education is not None:
+        counters["candidates_with_education"] = 1
+
+    skills: Dict[str, str] = {}
+    try:
+        names = json.loads(candidate.skills) if candidate.skills else []
+    except (TypeError, ValueError):
+        names = []
+    for name in names:
+        if isinstance(name, str) and name.strip():
+            skills.setdefault(normalize_skill(name)[:100], name.strip()[:100])
+    return StatsContribution(counters, skills)
+
+def apply_stats_delta(
+    db: Session,
+    added: Iterable[StatsContribution] = (),
+    removed: Iterable[StatsContribution] = ()
+):
+    """
+    Add/subtract candidate contributions from the materialized counters inside
+    the caller's transaction. Increments are done in SQL (value = value + delta)
+    and missing rows are created by the same upsert, so concurrent writers neither
+    lose updates nor collide inserting a new month or skill.
+    """
+    counter_deltas: Counter = Counter()
+    skill_deltas: Counter = Counter()
+    display_names: Dict[str, str] = {}
+    for sign, contributions in ((1, added), (-1, removed)):
+        for contribution in contributions:
+            for name, value in contribution.counters.items():
+                counter_deltas[name] += sign * value
+            for key, display in contribution.skills.items():
+                skill_deltas[key] += sign
+                display_names.setdefault(key, display)
+
+    # Rows in key order, so concurrent transactions lock them in the same order
+    counter_rows = [{"name": name, "value": delta} for name, delta in sorted(counter_deltas.items()) if delta != 0]
+    if counter_rows:
+        insert = upsert_insert(db, StatCounter)
+        db.execute(insert.values(counter_rows).on_conflict_do_update(
+            index_elements=[StatCounter.name],
+            set_={"value": StatCounter.value + insert.excluded.value}
+        ))
+
+    skill_rows = [
+        {"normalized_name": key, "name": display_names[key], "candidate_count": delta}
+        for key, delta in sorted(skill_deltas.items()) if delta > 0
+    ]
+    if skill_rows:
+        insert = upsert_insert(db, SkillCount)
+        db.execute(insert.values(skill_rows).on_conflict_do_update(
+            index_elements=[SkillCount.normalized_name],
+            set_={"candidate_count": SkillCount.candidate_count + insert.excluded.candidate_count}
+        ))
+    # A decrement only applies to an existing row (the rebuild corrects any that is missing)
+    for key, delta in sorted(skill_deltas.items()):
+        if delta < 0:
+            db.query(SkillCount).filter(SkillCount.normalized_name == key).update(
+                {SkillCount.candidate_count: SkillCount.candidate_count + delta}, synchronize_session=False
+            )
+    db.flush()
+
+def reset_stats(db: Session):
+    """Zero everything (used when all candidates are deleted); does not commit"""
+    db.query(StatCounter).delete(synchronize_session=False)
+    db.query(SkillCount).delete(synchronize_session=False)
+
+def rebuild_stats(db: Session):
+    """
+    Recompute every counter with aggregate queries and replace the materialized rows.
+    The stats tables are write-locked before the aggregates are read, so a delta
+    committed by a concurrent upload lands either in the aggregates or after the
+    replacement, never in between.
+    """
+    started = time.perf_counter()
+    counters: Dict[str, float] = {}
+    lock_tables_for_write(db, StatCounter, SkillCount)
+
+    total, match_sum, match_count, experience_sum, experience_count, high_match, experienced, with_email, with_phone, with_education = db.query(
+        func.count(Candidate.id),
+        func.coalesce(func.sum(Candidate.match_score), 0.0),
+        func.count(Candidate.match_score),
+        func.coalesce(func.sum(Candidate.experience_years), 0),
+        func.count(Candidate.experience_years),
+        func.count(Candidate.id).filter(Candidate.match_score >= HIGH_MATCH_THRESHOLD),
+        func.count(Candidate.id).filter(Candidate.experience_years >= EXPERIENCED_YEARS),
+        func.count(Candidate.email),
+        func.count(Candidate.phone),
+        func.count(Candidate.education)
+    ).one()
+    counters.update({
+        "total_candidates": total,
+        "match_score_sum": match_sum,
+        "match_score_count": match_count,
+        "experience_sum": experience_sum,
+        "experience_count": experience_count,
+        "high_match_candidates": high_match,
+        "experienced_candidates": experienced,
+        "candidates_with_email": with_email,
+        "candidates_with_phone": with_phone,
+        "candidates_with_education": with_education
+    })
+
+    # Histograms and monthly counts in one streaming pass (portable across databases)
+    rows = db.query(Candidate.match_score, Candidate.experience_years, Candidate.created_at).yield_per(1000)
+    for match_score, experience_years, created_at in rows:
+        month = _month_key(created_at)
+        counters[month] = counters.get(month, 0) + 1
+        if match_score is not None:
+            bucket = f"match_score:{_match_score_bucket(match_score)}"
+            counters[bucket] = counters.get(bucket, 0) + 1
+        if experience_years is not None:
+            bucket = f"experience:{_experience_bucket(experience_years)}"
+            counters[bucket] = counters.get(bucket, 0) + 1
+
+    skill_rows = (
+        db.query(Skill.normalized_name, Skill.name, func.count(CandidateSkill.candidate_id))
+        .join(CandidateSkill, CandidateSkill.skill_id == Skill.id)
+        .group_by(Skill.id)
+        .all()
+    )
+
+    reset_stats(db)
+    db.add_all([StatCounter(name=name, value=value) for name, value in counters.items()])
+    db.add_all([
+        SkillCount(normalized_name=normalized_name, name=name, candidate_count=count)
+        for normalized_name, name, count in skill_rows
+    ])
+    db.add(StatCounter(name="last_rebuild_at", value=time.time()))
+    db.commit()
+    logger.info(f"Rebuilt dashboard statistics for {total} candidates in {time.perf_counter() - started:.2f}s")
+
+def read_stats(db: Session) -> dict:
+    """The /stats payload from a fixed number of small reads, independent of candidate count"""
+    values = {name: value for name, value in db.query(StatCounter.name, StatCounter.value).filter(
+        ~StatCounter.name.like("created:%")
+    )}
+    current_month = _month_key(datetime.utcnow())
+    recent = db.query(StatCounter.value).filter(StatCounter.name == current_month).scalar() or 0
+    top_skills = (
+        db.query(SkillCount.name, SkillCount.candidate_count)
+        .filter(SkillCount.candidate_count > 0)
+        .order_by(SkillCount.candidate_count.desc())
+        .limit(TOP_SKILLS)
+        .all()
+    )
+
+    def count(name: str) -> int:
+        return int(round(values.get(name, 0)))
+
+    match_count = values.get("match_score_count", 0)
+    experience_count = values.get("experience_count", 0)
+    last_rebuild = values.get("last_rebuild_at")
+    return {
+        "total_candidates": count("total_candidates"),
+        "high_match_candidates": count("high_match_candidates"),
+        "experienced_candidates": count("experienced_candidates"),
+        "recent_candidates": int(round(recent)),
+        "average_match_score": round(values.get("match_score_sum", 0) / match_count, 2) if match_count else 0.0,
+        "average_experience": round(values.get("experience_sum", 0) / experience_count, 1) if experience_count else 0.0,
+        "top_skills": [(name, candidate_count) for name, candidate_count in top_skills],
+        "candidates_with_email": count("candidates_with_email"),
+        "candidates_with_phone": count("candidates_with_phone"),
+        "candidates_with_education": count("candidates_with_education"),
+        "match_score_histogram": {bucket: count(f"match_score:{bucket}") for bucket in MATCH_SCORE_BUCKETS},
+        "experience_histogram": {bucket: count(f"experience:{bucket}") for bucket in EXPERIENCE_BUCKETS},
+        "last_rebuild_at": datetime.utcfromtimestamp(last_rebuild).isoformat() if last_rebuild else None
+    }
+
+def ensure_stats(db: Session):
+    """Build the materialized stats on first start (or after the tables were added)"""
+    if db.query(StatCounter.name).filter(StatCounter.name == "last_rebuild_at").first() is None:
+        rebuild_stats(db)
+
+class StatsRebuilder:
+    """Periodically recomputes the materialized stats to correct any drift"""
+
+    def __init__(self, interval: float = 3600.0):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> "StatsRebuilder":
+        return cls(interval=float(os.getenv("STATS_REBUILD_INTERVAL", "3600")))
+
+    def start(self):
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self._rebuild)
+            except Exception as e:
+                logger.error(f"Stats rebuild failed: {str(e)}", exc_info=True)
+
+    def _rebuild(self):
+        db = SessionLocal()
+        try:
+            rebuild_stats(db)
+        finally:
+            db.close()
+
+# Shared rebuilder started from the main.py lifespan hook
+stats_rebuilder = StatsRebuilder.from_env()
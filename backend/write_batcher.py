@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import os
+from typing import List, Optional, Tuple, Union
+
+from fastapi import HTTPException
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+
+from database import Candidate, engine
+from candidate_skills import sync_candidate_skills
+from stats_service import candidate_contribution, apply_stats_delta
+
+logger = logging.getLogger(__name__)
+
+# Candidates written by the batcher are handed back to the request after the
+# session closes, so their loaded attributes must survive the commit
+WriteSession = sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)
+
+class WriteBatcher:
+    """
+    Group commit for candidate inserts.
+
+    Concurrent uploads each hand a built Candidate to insert(); a single writer
+    task collects whatever arrived within max_delay (and everything that queued
+    up while the previous transaction was committing), then inserts up to
+    max_batch of them in one transaction on a worker thread: one lock
+    acquisition and one fsync instead of one per upload. If the group
+    transaction fails, its candidates are retried one at a time so a single bad
+    row only fails its own request.
+    """
+
+    def __init__(self, max_batch: int = 64, max_delay: float = 0.002, enabled: bool = True):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.enabled = enabled
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.batches = 0
+        self.written = 0
+        self.max_batch_seen = 0
+
+    @classmethod
+    def from_env(cls) -> "WriteBatcher":
+        return cls(
+            max_batch=int(os.getenv("WRITE_BATCH_SIZE", "64")),
+            max_delay=float(os.getenv("WRITE_BATCH_DELAY_MS", "2")) / 1000,
+            enabled=os.getenv("WRITE_BATCHING", "true").lower() in ("1", "true", "yes")
+        )
+
+    def start(self):
+        if self.enabled:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Write whatever is still queued, then stop the writer"""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._queue = None
+
+    async def insert(self, candidate: Candidate) -> Candidate:
+        """
+        Insert a new candidate (with its skills links and stats delta) and return it
+        with its id. Raises HTTPException 409 for an email that already exists.
+        """
+        if self._task is None:
+            # Not started (scripts) or disabled: a transaction of one
+            outcome = (await asyncio.to_thread(self._write, [candidate]))[0]
+        else:
+            future = asyncio.get_running_loop().create_future()
+            await self._queue.put((candidate, future))
+            outcome = await future
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "batches": self.batches,
+            "written": self.written,
+            "avg_batch_size": round(self.written / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_seen,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0
+        }
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            if self.max_delay > 0:
+                await asyncio.sleep(self.max_delay)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                outcomes = await asyncio.to_thread(self._write, [candidate for candidate, _ in batch])
+            except Exception as e:
+                logger.error(f"Candidate write batch failed: {str(e)}", exc_info=True)
+                outcomes = [e] * len(batch)
+            for (_, future), outcome in zip(batch, outcomes):
+                if future.done():
+                    continue  # The request was cancelled while waiting
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
+
+    def _write(self, candidates: List[Candidate]) -> List[Union[Candidate, Exception]]:
+        """Insert the group in one transaction; returns a Candidate or an exception per input"""
+        db = WriteSession()
+        try:
+            outcomes, accepted = self._reject_duplicates(db, candidates)
+            if not accepted:
+                return outcomes
+            try:
+                db.add_all([candidate for _, candidate in accepted])
+                db.flush()
+                sync_candidate_skills(db, [candidate for _, candidate in accepted])
+                apply_stats_delta(db, added=[candidate_contribution(candidate) for _, candidate in accepted])
+                db.commit()
+            except SQLAlchemyError as e:
+                db.rollback()
+                if len(candidates) == 1:
+                    return [e]
+                logger.warning(f"Group insert of {len(candidates)} candidates failed, retrying one by one: {str(e)}")
+                for _, candidate in accepted:
+                    candidate.id = None  # Assigned by the rolled-back flush
+                for position, candidate in accepted:
+                    outcomes[position] = self._write([candidate])[0]
+                return outcomes
+
+            db.expunge_all()
+            for position, candidate in accepted:
+                outcomes[position] = candidate
+            self.batches += 1
+            self.written += len(accepted)
+            self.max_batch_seen = max(self.max_batch_seen, len(accepted))
+            return outcomes
+        finally:
+            db.close()
+
+    def _reject_duplicates(self, db, candidates: List[Candidate]) -> Tuple[list, List[Tuple[int, Candidate]]]:
+        """409 for emails already stored or claimed earlier in the same group"""
+        emails = {candidate.email for candidate in candidates if candidate.email}
+        seen = {row.email for row in db.query(Candidate.email).filter(Candidate.email.in_(emails))} if emails else set()
+        outcomes: list = [None] * len(candidates)
+        accepted = []
+        for position, candidate in enumerate(candidates):
+            if candidate.email and candidate.email in seen:
+                outcomes[position] = HTTPException(
+                    status_code=409,
+                    detail=f"Candidate with email {candidate.email} already exists"
+                )
+                continue
+            if candidate.email:
+                seen.add(candidate.email)
+            accepted.append((position, candidate))
+        return outcomes, accepted
+
+# Shared batcher started from the main.py lifespan hook
+write_batcher = WriteBatcher.from_env()
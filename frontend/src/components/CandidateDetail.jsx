@@ -11,14 +11,16 @@ const CandidateDetail = ({ candidateId, onClose, isAnonymized = false }) => {
     if (candidateId) {
       fetchCandidateDetail();
     }
-  }, [candidateId]);
+  }, [candidateId, isAnonymized]);
 
   const fetchCandidateDetail = async () => {
     try {
       setLoading(true);
       setError('');
       
-      const response = await fetch(`http://localhost:8000/api/v1/candidates/${candidateId}`);
+      // Anonymized view: the backend serves the stored redacted resume text
+      const query = isAnonymized ? '?anonymized=true' : '';
+      const response = await fetch(`http://localhost:8000/api/v1/candidates/${candidateId}${query}`);
       
       if (!response.ok) {
         throw new Error(`Failed to load candidate details: ${response.status}`);
@@ -6,7 +6,7 @@ const API_BASE_URL = 'http://localhost:8000/api/v1';
 class CandidateService {
   async fetchAllCandidates(limit = 100) {
     try {
-      const response = await fetch(`${API_BASE_URL}/candidates/?limit=${limit}`);
+      const response = await fetch(`${API_BASE_URL}/candidates/?limit=${limit}&view=summary`);
       
       if (!response.ok) {
         throw new Error(`HTTP ${response.status}: ${response.statusText}`);